@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add composite indexes for the hot query filters.
+Run this script after updating the models to create the indexes declared in
+__table_args__ on existing databases. Safe to run more than once.
+"""
+
+import os
+import sys
+from flask import Flask
+from flask_mysqldb import MySQL
+from dotenv import load_dotenv
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# (table, index name, columns) - must match the db.Index declarations in website/models.py
+INDEXES = [
+    ('grid_spaces', 'ix_grid_spaces_garden_active', ['GARDEN_ID', 'IS_ACTIVE']),
+    ('grid_spaces', 'ix_grid_spaces_plant_image_updated', ['PLANT_ID', 'IMAGE_PATH', 'LAST_UPDATED']),
+    ('activity_logs', 'ix_activity_logs_user_space_created', ['user_id', 'space_id', 'created_at']),
+    ('activity_logs', 'ix_activity_logs_user_action_date', ['user_id', 'action_date']),
+    ('learning_path_content', 'ix_learning_path_content_difficulty_type_active', ['path_difficulty', 'content_type', 'is_active']),
+    ('admin_notifications', 'ix_admin_notifications_active_expires_priority', ['is_active', 'expires_at', 'priority']),
+    ('user_subscriptions', 'ix_user_subscriptions_user_status', ['user_id', 'status']),
+    ('users', 'ix_users_created_id', ['created_at', 'id']),
+    ('users', 'ix_users_name_id', ['lastname', 'firstname', 'id']),
+]
+
+# Representative queries issued by the hot endpoints, checked with EXPLAIN
+HOT_QUERIES = [
+    ('get_grid_spaces', 'grid_spaces',
+     "SELECT * FROM grid_spaces WHERE GARDEN_ID = 1 AND IS_ACTIVE = 1"),
+    ('garden latest image', 'grid_spaces',
+     "SELECT IMAGE_PATH FROM grid_spaces WHERE PLANT_ID = 1 AND IMAGE_PATH IS NOT NULL ORDER BY LAST_UPDATED DESC LIMIT 1"),
+    ('get_plant_activity_logs', 'activity_logs',
+     "SELECT * FROM activity_logs WHERE user_id = 1 AND space_id = 1 ORDER BY created_at DESC"),
+    ('smart alerts completed actions', 'activity_logs',
+     "SELECT * FROM activity_logs WHERE user_id = 1 AND action_date >= CURDATE() - INTERVAL 30 DAY "
+     "ORDER BY action_date DESC"),
+    ('get_learning_path_content', 'learning_path_content',
+     "SELECT * FROM learning_path_content WHERE path_difficulty = 'Beginner' AND content_type = 'module' AND is_active = 1"),
+    ('notifications', 'admin_notifications',
+     "SELECT * FROM admin_notifications WHERE is_active = 1 AND (expires_at IS NULL OR expires_at > NOW())"),
+    ('active subscription lookup', 'user_subscriptions',
+     "SELECT * FROM user_subscriptions WHERE user_id = 1 AND status = 'active' LIMIT 1"),
+    ('admin user listing page', 'users',
+     "SELECT id, email, created_at FROM users WHERE created_at < NOW() OR (created_at = NOW() AND id < 100) "
+     "ORDER BY created_at DESC, id DESC LIMIT 101"),
+]
+
+def add_performance_indexes():
+    """Create missing composite indexes, then EXPLAIN the hot queries"""
+
+    # Load environment variables
+    load_dotenv()
+
+    # Create Flask app for database connection
+    app = Flask(__name__)
+
+    # MySQL Configuration from environment variables
+    app.config['MYSQL_HOST'] = os.getenv('MYSQL_HOST', 'localhost')
+    app.config['MYSQL_USER'] = os.getenv('MYSQL_USER', 'root')
+    app.config['MYSQL_PASSWORD'] = os.getenv('MYSQL_PASSWORD', '')
+    app.config['MYSQL_DB'] = os.getenv('MYSQL_DB', 'egrowtifydb')
+
+    mysql = MySQL(app)
+
+    try:
+        with app.app_context():
+            cursor = mysql.connection.cursor()
+
+            print("🔧 Adding composite indexes...")
+            for table, index_name, columns in INDEXES:
+                # Check if index already exists
+                cursor.execute("""
+                    SELECT COUNT(*)
+                    FROM INFORMATION_SCHEMA.STATISTICS
+                    WHERE TABLE_SCHEMA = %s
+                    AND TABLE_NAME = %s
+                    AND INDEX_NAME = %s
+                """, (app.config['MYSQL_DB'], table, index_name))
+
+                if cursor.fetchone()[0] > 0:
+                    print(f"ℹ️  {index_name} already exists on {table}")
+                    continue
+
+                column_list = ', '.join(f"`{column}`" for column in columns)
+                cursor.execute(f"CREATE INDEX `{index_name}` ON `{table}` ({column_list})")
+                mysql.connection.commit()
+                print(f"✅ Added {index_name} on {table} ({column_list})")
+
+            print("\n🔍 Checking index usage with EXPLAIN...")
+            missing = check_index_usage(cursor)
+            cursor.close()
+
+            if missing:
+                print(f"\n⚠️  {missing} hot quer{'y does' if missing == 1 else 'ies do'} not use an index yet. "
+                      "Small tables may still be scanned; re-check once the table has data (ANALYZE TABLE).")
+            else:
+                print("\n✅ All hot queries use an index")
+
+    except Exception as e:
+        print(f"Error adding performance indexes: {e}")
+        sys.exit(1)
+
+def check_index_usage(cursor):
+    """EXPLAIN each hot query and report the chosen index. Returns the number without one."""
+    missing = 0
+    for label, table, sql in HOT_QUERIES:
+        cursor.execute(f"EXPLAIN {sql}")
+        columns = [col[0].lower() for col in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        plan = next((row for row in rows if row.get('table') == table), rows[0] if rows else {})
+        key = plan.get('key')
+        if key:
+            print(f"✅ {label}: {table} uses {key} (type={plan.get('type')}, rows={plan.get('rows')})")
+        else:
+            missing += 1
+            print(f"❌ {label}: {table} full scan (type={plan.get('type')}, rows={plan.get('rows')})")
+    return missing
+
+if __name__ == '__main__':
+    add_performance_indexes()
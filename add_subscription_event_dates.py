@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add paid_at and cancelled_at to the user_subscriptions table.
+Run this script after updating the models. Existing rows are backfilled from the
+columns the dashboards used before (created_at for paid rows, updated_at for
+cancelled rows), so rollups already written stay consistent. Safe to run more than once.
+"""
+
+import os
+import sys
+from flask import Flask
+from flask_mysqldb import MySQL
+from dotenv import load_dotenv
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# (column, backfill condition, backfill source, index name) - must match website/models.py
+COLUMNS = [
+    ('paid_at', "payment_status = 'paid'", 'created_at', 'ix_user_subscriptions_paid_at'),
+    ('cancelled_at', "status = 'cancelled'", 'updated_at', 'ix_user_subscriptions_cancelled_at'),
+]
+
+def add_subscription_event_dates():
+    """Add, backfill and index the subscription event date columns"""
+
+    # Load environment variables
+    load_dotenv()
+
+    # Create Flask app for database connection
+    app = Flask(__name__)
+
+    # MySQL Configuration from environment variables
+    app.config['MYSQL_HOST'] = os.getenv('MYSQL_HOST', 'localhost')
+    app.config['MYSQL_USER'] = os.getenv('MYSQL_USER', 'root')
+    app.config['MYSQL_PASSWORD'] = os.getenv('MYSQL_PASSWORD', '')
+    app.config['MYSQL_DB'] = os.getenv('MYSQL_DB', 'egrowtifydb')
+
+    mysql = MySQL(app)
+
+    try:
+        with app.app_context():
+            cursor = mysql.connection.cursor()
+
+            for column, condition, source, index_name in COLUMNS:
+                cursor.execute("""
+                    SELECT COUNT(*)
+                    FROM INFORMATION_SCHEMA.COLUMNS
+                    WHERE TABLE_SCHEMA = %s
+                    AND TABLE_NAME = 'user_subscriptions'
+                    AND COLUMN_NAME = %s
+                """, (app.config['MYSQL_DB'], column))
+
+                if cursor.fetchone()[0] > 0:
+                    print(f"ℹ️  {column} column already exists")
+                else:
+                    cursor.execute(f"ALTER TABLE user_subscriptions ADD COLUMN {column} DATETIME NULL")
+                    print(f"✅ Added {column} column")
+
+                cursor.execute(f"""
+                    UPDATE user_subscriptions
+                    SET {column} = {source}
+                    WHERE {condition} AND {column} IS NULL
+                """)
+                print(f"✅ Backfilled {column} on {cursor.rowcount} row(s) from {source}")
+
+                cursor.execute("""
+                    SELECT COUNT(*)
+                    FROM INFORMATION_SCHEMA.STATISTICS
+                    WHERE TABLE_SCHEMA = %s
+                    AND TABLE_NAME = 'user_subscriptions'
+                    AND INDEX_NAME = %s
+                """, (app.config['MYSQL_DB'], index_name))
+
+                if cursor.fetchone()[0] == 0:
+                    cursor.execute(f"CREATE INDEX {index_name} ON user_subscriptions ({column})")
+                    print(f"✅ Created index {index_name}")
+
+            mysql.connection.commit()
+            cursor.close()
+            print("🎉 Subscription event dates are ready; the next rollup refresh uses them")
+
+    except Exception as e:
+        print(f"❌ Error adding subscription event dates: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    add_subscription_event_dates()
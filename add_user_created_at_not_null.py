@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Database migration script to make users.created_at NOT NULL.
+Run this script after updating the models. The admin user listings page by
+(created_at, id) and a NULL sign-up time compares as unknown, so those users
+would drop out of the listing; existing NULLs are backfilled from updated_at
+(the earliest time we know the account existed) or the current time.
+Safe to run more than once.
+"""
+
+import os
+import sys
+from flask import Flask
+from flask_mysqldb import MySQL
+from dotenv import load_dotenv
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def add_user_created_at_not_null():
+    """Backfill users.created_at and declare it NOT NULL, as website/models.py does"""
+
+    # Load environment variables
+    load_dotenv()
+
+    # Create Flask app for database connection
+    app = Flask(__name__)
+
+    # MySQL Configuration from environment variables
+    app.config['MYSQL_HOST'] = os.getenv('MYSQL_HOST', 'localhost')
+    app.config['MYSQL_USER'] = os.getenv('MYSQL_USER', 'root')
+    app.config['MYSQL_PASSWORD'] = os.getenv('MYSQL_PASSWORD', '')
+    app.config['MYSQL_DB'] = os.getenv('MYSQL_DB', 'egrowtifydb')
+
+    mysql = MySQL(app)
+
+    try:
+        with app.app_context():
+            cursor = mysql.connection.cursor()
+
+            cursor.execute("""
+                SELECT IS_NULLABLE
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = %s
+                AND TABLE_NAME = 'users'
+                AND COLUMN_NAME = 'created_at'
+            """, (app.config['MYSQL_DB'],))
+
+            if cursor.fetchone()[0] == 'NO':
+                print("ℹ️  users.created_at is already NOT NULL")
+            else:
+                cursor.execute("UPDATE users SET created_at = COALESCE(updated_at, NOW()) WHERE created_at IS NULL")
+                print(f"✅ Backfilled created_at on {cursor.rowcount} user(s)")
+
+                cursor.execute("ALTER TABLE users MODIFY created_at DATETIME NOT NULL")
+                print("✅ users.created_at is now NOT NULL")
+
+            mysql.connection.commit()
+            cursor.close()
+            print("🎉 Every user has a sign-up time; the admin listings page over all of them")
+
+    except Exception as e:
+        print(f"❌ Error making users.created_at NOT NULL: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    add_user_created_at_not_null()
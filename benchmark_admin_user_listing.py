@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the admin user listing
+Seeds an in-memory SQLite database with 100k users and reports how long one
+page takes at increasing depths with keyset pagination, compared with the
+same page through OFFSET and with loading every user as the old endpoint did.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from website.models import db, User
+from website import user_directory
+
+USER_COUNT = 100_000
+PAGE_SIZE = 100
+DEPTHS = [1, 10, 100, 500, 999]
+ROUNDS = 5
+COLUMNS = [User.email, User.firstname, User.lastname, User.role, User.is_active, User.subscribed, User.created_at]
+
+
+def create_benchmark_app():
+    """Create a throwaway Flask app bound to in-memory SQLite"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed_users():
+    started = datetime(2024, 1, 1)
+    with db.engine.begin() as connection:
+        for offset in range(0, USER_COUNT, 10_000):
+            connection.execute(User.__table__.insert(), [
+                {'email': f'user{i}@egrowtify.com', 'firstname': f'First{i % 977}', 'lastname': f'Last{i % 1499}',
+                 'contact': '0', 'password_hash': 'x' * 100, 'role': 'user', 'is_active': i % 5 != 0,
+                 'subscribed': i % 7 == 0, 'created_at': started + timedelta(minutes=i // 3)}
+                for i in range(offset, offset + 10_000)])
+
+
+def timed(fn):
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, sum(timings) / len(timings)
+
+
+def offset_page(sort, depth):
+    keyset = user_directory.SORTS[sort] + (User.id,)
+    query = db.select(User.id, *COLUMNS).order_by(*[column.desc() for column in keyset])
+    return db.session.execute(query.offset((depth - 1) * PAGE_SIZE).limit(PAGE_SIZE)).all()
+
+
+def run_benchmark():
+    app = create_benchmark_app()
+    with app.app_context():
+        db.create_all()
+        seed_users()
+
+        print("👥 Admin user listing benchmark")
+        print("=" * 60)
+        print(f"{USER_COUNT} users, {PAGE_SIZE} per page")
+
+        _, load_all_ms = timed(lambda: [u.full_name for u in User.query.all()])
+        db.session.expire_all()
+        print(f"Old endpoint (User.query.all()): {load_all_ms:.2f} ms per request\n")
+
+        for sort in ('created_at', 'name'):
+            # Walk to each depth once to collect its cursor, as a client paging through would
+            cursors, cursor = {1: None}, None
+            for page in range(1, max(DEPTHS)):
+                _, cursor = user_directory.page_users(COLUMNS, sort=sort, cursor=cursor, limit=PAGE_SIZE)
+                cursors[page + 1] = cursor
+
+            print(f"sort={sort}")
+            print(f"{'page':>8} {'keyset ms':>10} {'offset ms':>10}")
+            for depth in DEPTHS:
+                (users, _), keyset_ms = timed(lambda: user_directory.page_users(
+                    COLUMNS, sort=sort, cursor=cursors[depth], limit=PAGE_SIZE))
+                rows, offset_ms = timed(lambda: offset_page(sort, depth))
+                assert [u['id'] for u in users] == [row.id for row in rows]
+                print(f"{depth:>8} {keyset_ms:>10.2f} {offset_ms:>10.2f}")
+            print()
+
+        _, search_ms = timed(lambda: user_directory.page_users(COLUMNS, q='first12 last3', limit=PAGE_SIZE))
+        _, filter_ms = timed(lambda: user_directory.page_users(COLUMNS, active=True, subscribed=True, limit=PAGE_SIZE))
+        print(f"Search page: {search_ms:.2f} ms, filtered page: {filter_ms:.2f} ms")
+        print("\nKeyset page time should stay flat with depth while OFFSET grows.")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the color features used by the offline plant/soil fallbacks
+Compares the ad-hoc float32 statistics the heuristics used to compute with
+website.color_features.extract_features() and reports throughput in images/sec.
+
+Usage: python benchmark_color_features.py [seconds_per_approach]
+"""
+
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from PIL import Image
+
+from website.color_features import extract_features
+
+IMAGE_COUNT = 32
+IMAGE_SIZE = (224, 224)
+
+
+def ad_hoc_features(rgb, hsv):
+    """The statistics as ai_plant_recognition and soil_analysis computed them"""
+    arr = rgb.astype(np.float32)
+    purple_ratio = float(np.mean((arr[:, :, 0] > 100) & (arr[:, :, 1] < 100) & (arr[:, :, 2] > 100)))
+    gray = np.mean(arr, axis=2)
+    edge_density = float(np.mean((np.abs(np.gradient(gray)[0]) + np.abs(np.gradient(gray)[1])) > 30))
+    h = hsv[:, :, 0].astype(np.float32) * (360.0 / 255.0)
+    s = hsv[:, :, 1].astype(np.float32) / 255.0
+    v = hsv[:, :, 2].astype(np.float32) / 255.0
+    orange_ratio = float(np.mean((h >= 20) & (h <= 45) & (s >= 0.45) & (v >= 0.25)))
+    red, green, blue = arr[:, :, 0], arr[:, :, 1], arr[:, :, 2]
+    total = np.maximum(red + green + blue, 1.0)
+    green_ratio = float(np.mean(green / total))
+    red_ratio = float(np.mean(red / total))
+    averages = (float(np.mean(red)), float(np.mean(green)), float(np.mean(blue)))
+    return purple_ratio, edge_density, orange_ratio, green_ratio, red_ratio, averages
+
+
+def throughput(func, images, seconds):
+    processed = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for rgb, hsv in images:
+            func(rgb, hsv)
+        processed += len(images)
+    return processed / (time.perf_counter() - started)
+
+
+def run_benchmark():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    rng = np.random.default_rng(42)
+    images = []
+    for _ in range(IMAGE_COUNT):
+        img = Image.fromarray(rng.integers(0, 256, size=(IMAGE_SIZE[1], IMAGE_SIZE[0], 3), dtype=np.uint8))
+        images.append((np.asarray(img), np.asarray(img.convert('HSV'))))
+
+    print("🎨 Color feature extraction benchmark")
+    print("=" * 60)
+    print(f"{IMAGE_COUNT} images at {IMAGE_SIZE[0]}x{IMAGE_SIZE[1]}, {seconds:.1f}s per approach")
+
+    old_rate = throughput(ad_hoc_features, images, seconds)
+    new_rate = throughput(extract_features, images, seconds)
+    print(f"\n{'approach':>12} {'images/sec':>12}")
+    print(f"{'ad hoc':>12} {old_rate:>12.0f}")
+    print(f"{'extractor':>12} {new_rate:>12.0f}")
+    print(f"\n⚡ {new_rate / old_rate:.1f}x throughput (extractor also returns 32 histogram bins)")
+
+
+if __name__ == "__main__":
+    run_benchmark()
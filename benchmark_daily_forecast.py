@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the daily forecast summary
+Times three ways of getting daily figures out of a 40-step forecast: the
+per-request Python grouping loop the forecast endpoint used to run, one
+numpy summarize_forecast call (paid once per forecast refresh), and a cached
+get_daily_forecast lookup (what each request pays now).
+"""
+
+import os
+import sys
+import timeit
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website import weather
+from website.daily_forecast import summarize_forecast
+from test_daily_forecast import make_forecast
+
+NUMBER = 2000
+
+
+def python_grouping(forecast_data):
+    """The endpoint's previous per-request aggregation"""
+    daily_forecasts = []
+    current_date = None
+    daily_data = {}
+    for item in forecast_data['list']:
+        date = item['dt_txt'].split(' ')[0]
+        if date != current_date:
+            if current_date and daily_data:
+                daily_forecasts.append(daily_data)
+            current_date = date
+            daily_data = {'date': date, 'temperatures': [], 'humidity': [], 'conditions': [],
+                          'wind_speed': [], 'rain_probability': []}
+        daily_data['temperatures'].append(item['main']['temp'])
+        daily_data['humidity'].append(item['main']['humidity'])
+        daily_data['conditions'].append(item['weather'][0]['description'])
+        daily_data['wind_speed'].append(item['wind']['speed'])
+        daily_data['rain_probability'].append(item['rain'].get('3h', 0) if 'rain' in item else 0)
+    if daily_data:
+        daily_forecasts.append(daily_data)
+    return [(sum(d['temperatures']) / len(d['temperatures']), min(d['temperatures']), max(d['temperatures']),
+             sum(d['humidity']) / len(d['humidity']), sum(d['wind_speed']) / len(d['wind_speed']),
+             sum(d['rain_probability'])) for d in daily_forecasts]
+
+
+def run_benchmark():
+    forecast = make_forecast()
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return forecast
+
+    weather.clear_cache()
+    with mock.patch.object(weather.http_client, 'get', lambda url, params=None, **kwargs: Response()):
+        weather.get_daily_forecast(10.31, 123.89, 'key')
+        timings = {
+            'python loop per request': min(timeit.repeat(lambda: python_grouping(forecast), number=NUMBER, repeat=5)),
+            'numpy summary per refresh': min(timeit.repeat(lambda: summarize_forecast(forecast), number=NUMBER, repeat=5)),
+            'cached summary per request': min(timeit.repeat(lambda: weather.get_daily_forecast(10.31, 123.89, 'key'),
+                                                            number=NUMBER, repeat=5)),
+        }
+    weather.clear_cache()
+
+    print("🌦️ Daily forecast aggregation benchmark")
+    print("=" * 60)
+    print(f"{len(forecast['list'])} forecast steps, {len(summarize_forecast(forecast)['days'])} days")
+    for label, seconds in timings.items():
+        print(f"{label:>28}: {seconds / NUMBER * 1e6:8.1f} µs")
+    print(f"\n📊 Per-request cost: {timings['python loop per request'] / timings['cached summary per request']:.0f}x lower "
+          "than re-grouping the forecast on every request")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the rule-based enrichment engine
+Runs care inference + crop enrichment over a synthetic corpus of wiki-style
+descriptions and reports descriptions/sec for the precompiled rule table
+against a per-call reference that, like the old view code, looks regexes up
+by pattern string and walks the raw rule lists on every request. The old
+code also rebuilt the rule dicts on every call, which the reference does not
+charge, so the reported speedup is a lower bound. It then times the crop
+lookup alone as the rule table grows, against the old per-rule substring
+scan, and fails if the keyword table is slower at any size: small tables are
+scanned, larger ones go through the word index.
+"""
+
+import os
+import sys
+import re
+import json
+import time
+import random
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website.enrichment import get_rules, infer_care, crop_enrichment, RuleBook, DEFAULT_RULES_FILE
+
+CORPUS_SIZE = 5000
+ROUNDS = 5
+EXTRA_RULES = [0, 100, 500]
+FILLER = ("is a species of flowering plant native to tropical regions it grows as a perennial herb "
+          "with broad leaves and small white flowers cultivated widely in home gardens").split()
+
+
+def build_corpus(data):
+    rng = random.Random(11)
+    hints = ['full sun', 'partial shade', 'indirect light', 'drought tolerant', 'keep moist',
+             'avoid overwatering', 'well-drained', 'rich soil', 'sandy soil']
+    names = [k for rule in data['crop_rules'] for k in rule['keywords']] + ['ixora', 'bougainvillea', 'fern']
+    corpus = []
+    for _ in range(CORPUS_SIZE):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(40, 300))]
+        for hint in rng.sample(hints, rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), hint)
+        corpus.append((rng.choice(names).title(), ' '.join(words)))
+    return corpus
+
+
+def reference_enrich(data, name, text):
+    lower = text.lower()
+    care = {}
+    for aspect, rules in data['care_patterns'].items():
+        for rule in rules:
+            if re.search(rule['pattern'], lower):
+                care[aspect] = rule['value']
+                break
+    name = name.lower()
+    for rule in data['crop_rules']:
+        if any(k in name or k in lower for k in rule['keywords']):
+            return care, json.loads(json.dumps(rule['enrichment']))
+    return care, None
+
+
+def reference_crop_index(crop_rules, name, text):
+    name, text = name.lower(), text.lower()
+    for index, (keywords, _) in enumerate(crop_rules):
+        if any(k in name or k in text for k in keywords):
+            return index
+    return None
+
+
+def best_time(corpus, fn):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        for name, text in corpus:
+            fn(name, text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_scaling(data, corpus):
+    rng = random.Random(5)
+    print("\nCrop lookup only, as the rule table grows")
+    print(f"{'rules':>8} {'scan ms':>10} {'table ms':>10}")
+    for extra in EXTRA_RULES:
+        grown = dict(data, crop_rules=data['crop_rules'] + [
+            {'keywords': [''.join(rng.choice('bcdfghjklmnpqrstvwxz') for _ in range(7))], 'enrichment': {}}
+            for _ in range(extra)])
+        rules = RuleBook(grown)
+        lookup = lambda n, t: rules.crop_table.first(n.lower(), t.lower())
+        for name, text in corpus:
+            assert lookup(name, text) == reference_crop_index(rules.crop_rules, name, text)
+        scan = best_time(corpus, lambda n, t: reference_crop_index(rules.crop_rules, n, t))
+        indexed = best_time(corpus, lookup)
+        print(f"{len(rules.crop_rules):>8} {scan * 1000:>10.1f} {indexed * 1000:>10.1f}")
+        assert indexed < scan, f"the keyword table is slower than the substring scan at {len(rules.crop_rules)} rules"
+
+
+def run_benchmark():
+    with open(DEFAULT_RULES_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+    corpus = build_corpus(data)
+    get_rules()
+
+    print("🌱 Rule-based enrichment benchmark")
+    print("=" * 60)
+    print(f"{len(corpus)} descriptions, {sum(len(t) for _, t in corpus) // len(corpus)} chars on average")
+
+    for name, text in corpus:
+        assert reference_enrich(data, name, text) == (infer_care(text), crop_enrichment(name, None, text))
+
+    timings = {}
+    for label, enrich in (('reference', lambda n, t: reference_enrich(data, n, t)),
+                          ('rule table', lambda n, t: (infer_care(t), crop_enrichment(n, None, t)))):
+        timings[label] = best_time(corpus, enrich)
+        print(f"{label:>12}: {len(corpus) / timings[label]:>10,.0f} descriptions/sec")
+
+    print(f"\n📊 Speedup: {timings['reference'] / timings['rule table']:.1f}x (results identical)")
+    run_scaling(data, corpus)
+
+
+if __name__ == "__main__":
+    run_benchmark()
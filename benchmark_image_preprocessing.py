@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the plant photo preprocessing used by AI recognition
+Compares the old per-heuristic decoding (RGB 224px, HSV 224px and the 256px
+fallback, each from the full-size upload) with the decode-once pipeline.
+Each approach runs in its own process so peak memory (max RSS) is comparable.
+
+Usage: python benchmark_image_preprocessing.py [folder_of_photos]
+Without a folder, a set of 4032x3024 JPEGs (typical phone photos) is generated.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import resource
+import multiprocessing
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from PIL import Image
+
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+SYNTHETIC_PHOTOS = 5
+
+
+def old_pipeline(image_bytes):
+    """What ai_plant_recognition did before: three full decodes"""
+    import io
+    rgb = np.asarray(Image.open(io.BytesIO(image_bytes)).convert('RGB').resize((224, 224)), dtype=np.float32)
+    np.mean(rgb, axis=2)
+    np.asarray(Image.open(io.BytesIO(image_bytes)).convert('HSV').resize((224, 224)), dtype=np.uint8)
+    np.asarray(Image.open(io.BytesIO(image_bytes)).convert('RGB').resize((256, 256)), dtype=np.float32)
+
+
+def new_pipeline(image_bytes):
+    """Decode once, then derive the content hash and color features from it"""
+    from website.imaging import prepare_image
+    import hashlib
+    prepared = prepare_image(image_bytes)
+    hashlib.sha256(prepared.fingerprint_bytes()).hexdigest()
+    prepared.features
+
+
+def idle_pipeline(image_bytes):
+    pass
+
+
+def _run(pipeline_name, paths, queue):
+    pipeline = globals()[pipeline_name]
+    photos = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            photos.append(f.read())
+    if pipeline_name == 'new_pipeline':
+        import website.imaging  # noqa: F401 - import outside the timed loop
+    started = time.perf_counter()
+    for image_bytes in photos:
+        pipeline(image_bytes)
+    elapsed_ms = (time.perf_counter() - started) * 1000 / max(len(photos), 1)
+    queue.put((elapsed_ms, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def measure(pipeline_name, paths):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run, args=(pipeline_name, paths, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def synthetic_photos(folder):
+    """Noisy 12 MP JPEGs so the decoder does real work"""
+    rng = np.random.default_rng(42)
+    paths = []
+    for i in range(SYNTHETIC_PHOTOS):
+        base = rng.integers(0, 255, size=(378, 504, 3), dtype=np.uint8)
+        img = Image.fromarray(base).resize((4032, 3024))
+        path = os.path.join(folder, f"photo_{i}.jpg")
+        img.save(path, 'JPEG', quality=90)
+        paths.append(path)
+    return paths
+
+
+def run_benchmark():
+    if len(sys.argv) > 1:
+        folder = sys.argv[1]
+        paths = sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                       if name.lower().endswith(PHOTO_EXTENSIONS))
+        temp_dir = None
+    else:
+        temp_dir = tempfile.TemporaryDirectory()
+        paths = synthetic_photos(temp_dir.name)
+
+    if not paths:
+        print("❌ No photos found")
+        sys.exit(1)
+
+    with Image.open(paths[0]) as first:
+        print("🖼️ Image preprocessing benchmark")
+        print("=" * 60)
+        print(f"{len(paths)} photo(s), first is {first.size[0]}x{first.size[1]} {first.format}")
+
+    _, idle_rss = measure('idle_pipeline', paths)
+    print(f"\n{'pipeline':>14} {'avg ms/photo':>14} {'peak MB':>10} {'over idle MB':>14}")
+    for label, name in [('3x decode', 'old_pipeline'), ('decode once', 'new_pipeline')]:
+        elapsed_ms, peak_rss = measure(name, paths)
+        print(f"{label:>14} {elapsed_ms:>14.1f} {peak_rss:>10.1f} {peak_rss - idle_rss:>14.1f}")
+
+    if temp_dir:
+        temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    run_benchmark()
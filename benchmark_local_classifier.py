@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the local plant classifier tier
+Trains on 80% of a labelled photo set and reports, on the other 20%, top-1
+accuracy, how many photos each confidence threshold would answer locally (and
+how accurately), plus per-photo latency of decode + features + prediction.
+
+Usage: python benchmark_local_classifier.py [folder]
+The folder holds one sub-folder of photos per plant (folder/Tomato/*.jpg).
+Without a folder, synthetic photos with crop-like color distributions are used.
+"""
+
+import os
+import sys
+import io
+import time
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from PIL import Image
+
+from website.imaging import prepare_image
+from website.local_classifier import LocalPlantClassifier, evaluate, MIN_CONFIDENCE
+
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+THRESHOLDS = (0.5, 0.7, 0.85, 0.95)
+SYNTHETIC_CROPS = {  # leaf and fruit/flower colors (RGB) mixed with soil
+    'Tomato': [(60, 140, 50), (200, 40, 30)],
+    'Carrot': [(80, 160, 60), (235, 130, 30)],
+    'Eggplant': [(70, 120, 60), (90, 40, 110)],
+    'Lettuce': [(150, 200, 90), (120, 180, 80)],
+    'Sunflower': [(70, 130, 40), (240, 200, 30)],
+}
+SYNTHETIC_PER_CROP = 60
+
+
+def folder_photos(folder):
+    photos = []
+    for label in sorted(os.listdir(folder)):
+        label_dir = os.path.join(folder, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for name in sorted(os.listdir(label_dir)):
+            if name.lower().endswith(PHOTO_EXTENSIONS):
+                with open(os.path.join(label_dir, name), 'rb') as f:
+                    photos.append((f.read(), label))
+    return photos
+
+
+def synthetic_photos():
+    rng = np.random.default_rng(7)
+    photos = []
+    for label, (leaf, accent) in SYNTHETIC_CROPS.items():
+        for _ in range(SYNTHETIC_PER_CROP):
+            img = np.empty((96, 128, 3), dtype=np.float32)
+            img[:] = (110, 80, 55)  # soil
+            img[rng.random((96, 128)) < rng.uniform(0.3, 0.6)] = leaf
+            img[rng.random((96, 128)) < rng.uniform(0.0, 0.25)] = accent
+            img += rng.normal(0, 25, img.shape)
+            out = io.BytesIO()
+            Image.fromarray(np.clip(img, 0, 255).astype(np.uint8)).resize((1024, 768)).save(out, 'JPEG', quality=85)
+            photos.append((out.getvalue(), label))
+    return photos
+
+
+def run_benchmark():
+    photos = folder_photos(sys.argv[1]) if len(sys.argv) > 1 else synthetic_photos()
+    if len({label for _, label in photos}) < 2:
+        print("❌ Need photos of at least 2 plants")
+        sys.exit(1)
+
+    print("🌱 Local plant classifier benchmark")
+    print("=" * 60)
+    print(f"{len(photos)} photos of {len({label for _, label in photos})} plants")
+
+    vectors, labels, latencies = [], [], []
+    for image_bytes, label in photos:
+        started = time.perf_counter()
+        prepared = prepare_image(image_bytes)
+        if prepared is None:
+            continue
+        vectors.append(prepared.features.vector)
+        latencies.append(time.perf_counter() - started)
+        labels.append(label)
+    vectors = np.array(vectors)
+
+    order = np.random.default_rng(42).permutation(len(labels))
+    split = int(len(order) * 0.8)
+    train_idx, test_idx = order[:split], order[split:]
+    started = time.perf_counter()
+    model = LocalPlantClassifier.train(vectors[train_idx], [labels[i] for i in train_idx])
+    train_seconds = time.perf_counter() - started
+
+    predict_times = []
+    for i in test_idx:
+        started = time.perf_counter()
+        model.predict(vectors[i])
+        predict_times.append(time.perf_counter() - started)
+
+    test_labels = [labels[i] for i in test_idx]
+    print(f"\nTrained on {len(train_idx)} photos in {train_seconds:.2f}s, testing on {len(test_idx)}")
+    print(f"\n{'threshold':>10} {'answered locally':>18} {'local accuracy':>16}")
+    for threshold in THRESHOLDS:
+        scores = evaluate(model, vectors[test_idx], test_labels, threshold)
+        print(f"{threshold:>10.2f} {scores['coverage']:>17.1%} {scores['local_accuracy']:>16.1%}")
+    print(f"\nTop-1 accuracy (every photo answered locally): {evaluate(model, vectors[test_idx], test_labels)['accuracy']:.1%}")
+
+    rng = np.random.default_rng(3)
+    unfamiliar = [np.full((96, 128, 3), rng.integers(0, 256, 3), dtype=np.uint8) for _ in range(10)]
+    unfamiliar += [rng.integers(0, 256, (96, 128, 3), dtype=np.uint8) for _ in range(10)]
+    answered = 0
+    for arr in unfamiliar:
+        out = io.BytesIO()
+        Image.fromarray(arr).save(out, 'JPEG')
+        _, probability, familiar = model.predict(prepare_image(out.getvalue()).features.vector)
+        answered += familiar and probability >= MIN_CONFIDENCE
+    print(f"Unfamiliar photos (solid colors, noise) answered locally: {answered}/{len(unfamiliar)}")
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"\n⏱️ Decode + features: p50 {np.percentile(latencies_ms, 50):.1f} ms, p95 {np.percentile(latencies_ms, 95):.1f} ms")
+    print(f"⏱️ Prediction: p50 {np.percentile(np.array(predict_times) * 1e6, 50):.0f} µs")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the smart alerts engine
+Seeds an in-memory SQLite database with a growing number of 6x6 gardens and
+reports how many SQL queries and how much time one alert build takes.
+"""
+
+import os
+import sys
+import time
+import json
+from datetime import date, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import event
+from website.models import db, User, Plant, Garden, GridSpace, PlantTracking, ActivityLog
+from website.alerts import build_smart_alerts
+
+GARDEN_COUNTS = [1, 2, 4, 8, 16]
+ROUNDS = 5
+
+
+def create_benchmark_app():
+    """Create a throwaway Flask app bound to in-memory SQLite"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed_user(garden_count):
+    """Create a user with garden_count fully planted 6x6 gardens"""
+    today = date.today()
+    user = User(email=f'bench{garden_count}@egrowtify.com', firstname='Bench', lastname='User',
+                contact='0', password_hash='x', is_active=True)
+    db.session.add(user)
+    plants = [
+        Plant(name=name, type=plant_type, environment='outdoor', care_guide='-',
+              watering_frequency=3, fertilizing_frequency=14, pruning_frequency=30)
+        for name, plant_type in [('Tomato', 'vegetable'), ('Basil', 'herb'), ('Mango', 'fruit')]
+    ]
+    db.session.add_all(plants)
+    db.session.flush()
+
+    ai_analysis = json.dumps({'needs_water': True, 'needs_prune': True, 'confidence': 0.8, 'reasoning': 'Dry soil'})
+    for g in range(garden_count):
+        garden = Garden(user_id=user.id, name=f'Garden {g + 1}', garden_type='outdoor', grid_size='6x6')
+        db.session.add(garden)
+        db.session.flush()
+        for row in range(1, 7):
+            for col in range(1, 7):
+                plant = plants[(row + col) % len(plants)]
+                db.session.add(GridSpace(
+                    garden_id=garden.id,
+                    grid_position=f"{row},{col}",
+                    plant_id=plant.id,
+                    planting_date=today - timedelta(days=20),
+                    last_watered=today - timedelta(days=(row * col) % 6),
+                    care_suggestions=ai_analysis if (row + col) % 2 else '{}',
+                    is_active=True
+                ))
+        db.session.add(PlantTracking(garden_id=garden.id, plant_id=plants[0].id,
+                                     planting_date=today - timedelta(days=10)))
+        db.session.add(ActivityLog(user_id=user.id, garden_id=garden.id, plant_id=plants[0].id,
+                                   action='water', action_date=today))
+    db.session.commit()
+    return user.id
+
+
+def run_benchmark():
+    app = create_benchmark_app()
+    with app.app_context():
+        db.create_all()
+
+        query_count = [0]
+
+        def count_query(*args):
+            query_count[0] += 1
+
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+
+        print("🚨 Smart alerts benchmark")
+        print("=" * 60)
+        print(f"{'gardens':>8} {'spaces':>8} {'alerts':>8} {'queries':>8} {'avg ms':>10}")
+
+        for garden_count in GARDEN_COUNTS:
+            user_id = seed_user(garden_count)
+            db.session.expire_all()
+
+            timings = []
+            for _ in range(ROUNDS):
+                db.session.expire_all()
+                query_count[0] = 0
+                started = time.perf_counter()
+                alerts, _ = build_smart_alerts(user_id)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            print(f"{garden_count:>8} {garden_count * 36:>8} {len(alerts):>8} {query_count[0]:>8} {sum(timings) / len(timings):>10.2f}")
+
+        print("\nQuery count should stay flat as the number of gardens grows.")
+
+
+if __name__ == "__main__":
+    run_benchmark()
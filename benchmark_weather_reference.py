@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the static weather reference tables
+Compares the per-request cost of getting the plant tolerance and microclimate
+tables the old way (evaluating the dict/list literals inside the handler on
+every call) with the shared load-once tables, and reports the saving per
+request and the one-off load + validation cost at startup.
+"""
+
+import os
+import sys
+import json
+import time
+import timeit
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website.weather_reference import get_reference, load_reference, thaw, DEFAULT_REFERENCE_FILE
+
+NUMBER = 20000
+
+
+def literal_builder(data):
+    """A function that evaluates the tables as literals on each call, as the handlers used to"""
+    source = f"def build():\n    return {data['plants']!r}, {data['microclimate_zones']!r}\n"
+    namespace = {}
+    exec(compile(source, 'old_handler_literals', 'exec'), namespace)
+    return namespace['build']
+
+
+def run_benchmark():
+    with open(DEFAULT_REFERENCE_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+    build = literal_builder(data)
+    reference = get_reference()
+    assert build() == (thaw(reference.plants), thaw(reference.microclimate_zones))
+
+    print("🌦️ Weather reference table benchmark")
+    print("=" * 60)
+    started = time.perf_counter()
+    load_reference()
+    print(f"Startup load + validation: {(time.perf_counter() - started) * 1000:.2f} ms (once per process)")
+
+    per_call = {
+        'literal per request': min(timeit.repeat(build, number=NUMBER, repeat=5)) / NUMBER,
+        'shared tables': min(timeit.repeat(lambda: (get_reference().plants, get_reference().microclimate_zones),
+                                           number=NUMBER, repeat=5)) / NUMBER,
+    }
+    for label, seconds in per_call.items():
+        print(f"{label:>20}: {seconds * 1e6:8.2f} µs per request")
+    saved = per_call['literal per request'] - per_call['shared tables']
+    print(f"\n📊 Saving: {saved * 1e6:.2f} µs per request "
+          f"({per_call['literal per request'] / per_call['shared tables']:.0f}x less time spent on the tables)")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,10 +1,21 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
 from website import create_app
+from website.jobs import start_worker_pool
+from website.reports import start_report_pool
 import os
 
 app = create_app()
 
+# Hand the analyses and reports still queued to this web process's pools (thread mode).
+# Only the web server does this; cron scripts calling create_app() leave the queue alone.
+with app.app_context():
+    try:
+        start_worker_pool()
+        start_report_pool()
+    except Exception as worker_error:
+        print(f"⚠️ Analysis worker pool not started: {worker_error}")
+
 # CORS configuration - update with your production frontend URL
 allowed_origins = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
 CORS(app, origins=allowed_origins, supports_credentials=True)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Preload the geocode cache with every city used by a garden.
+Run once after deploying (and optionally from cron) so weather endpoints can
+skip the OpenWeatherMap geocoding call for known garden locations.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website import create_app
+from website.geocoding import preload_garden_cities
+
+def preload_geocode_cache():
+    app = create_app()
+
+    with app.app_context():
+        api_key = os.getenv('OPENWEATHER_API_KEY')
+        if not api_key:
+            print("❌ OPENWEATHER_API_KEY is not configured")
+            sys.exit(1)
+
+        try:
+            added = preload_garden_cities(api_key)
+            print(f"✅ Geocoded {added} new garden cit{'y' if added == 1 else 'ies'}")
+        except Exception as e:
+            print(f"❌ Error preloading geocode cache: {e}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    preload_geocode_cache()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Incremental refresh job for the admin dashboard rollups.
+Schedule this script every few minutes (e.g. */5 via cron) so dashboard
+endpoints read fresh per-day aggregates instead of recounting tables. The
+first run backfills every day; later runs only regroup the recent days.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website import create_app
+from website.rollups import refresh
+
+def refresh_rollups():
+    app = create_app()
+
+    with app.app_context():
+        try:
+            written = refresh()
+            print(f"✅ Refreshed dashboard rollups ({written} row(s) written)")
+        except Exception as e:
+            print(f"❌ Error refreshing dashboard rollups: {e}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    refresh_rollups()
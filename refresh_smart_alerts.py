@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Daily rollover job for materialized smart alerts.
+Schedule this script once a day (e.g. shortly after midnight via cron) so that
+users' alerts are rebuilt for the new calendar day before their first poll.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website import create_app
+from website.alerts import rollover_materialized_alerts
+
+def refresh_smart_alerts():
+    app = create_app()
+
+    with app.app_context():
+        try:
+            refreshed = rollover_materialized_alerts()
+            print(f"✅ Rebuilt smart alerts for {refreshed} user(s)")
+        except Exception as e:
+            print(f"❌ Error refreshing smart alerts: {e}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    refresh_smart_alerts()
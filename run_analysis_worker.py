@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Worker process for queued AI analysis jobs and admin report builds.
+Run this alongside the web server when ANALYSIS_WORKER_MODE=external so
+uploads only enqueue work and this process calls OpenAI and writes report
+files. Stop with Ctrl+C.
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website import create_app
+from website.models import db
+from website.jobs import run_pending_jobs, requeue_stale_jobs
+from website.reports import run_pending_reports, requeue_stale_reports
+
+POLL_INTERVAL_SECONDS = 1.0
+
+def run_analysis_worker():
+    app = create_app()
+
+    with app.app_context():
+        print("🤖 Analysis worker started, waiting for jobs...")
+        requeued = requeue_stale_jobs() + requeue_stale_reports()
+        if requeued:
+            print(f"🔁 Requeued {requeued} interrupted job(s)")
+
+        try:
+            while True:
+                try:
+                    if not run_pending_jobs() and not run_pending_reports(limit=1):
+                        time.sleep(POLL_INTERVAL_SECONDS)
+                except Exception as e:
+                    print(f"❌ Error processing analysis jobs: {e}")
+                    db.session.rollback()
+                    time.sleep(POLL_INTERVAL_SECONDS * 5)
+        except KeyboardInterrupt:
+            print("👋 Analysis worker stopped")
+
+if __name__ == '__main__':
+    run_analysis_worker()
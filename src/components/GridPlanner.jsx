@@ -4,6 +4,7 @@ import axios from 'axios'
 import toast from 'react-hot-toast'
 import { useAuth } from '../contexts/AuthContext'
 import { useNavigate } from 'react-router-dom'
+import { resizeImageForUpload } from '../utils/resizeImageForUpload'
 
 const GridPlanner = forwardRef(({ selectedGarden, onGardenUpdate, onPlantUpdate }, ref) => {
   const { isPremium } = useAuth()
@@ -1039,6 +1040,17 @@ const GridPlanner = forwardRef(({ selectedGarden, onGardenUpdate, onPlantUpdate
     return tomorrow.toLocaleDateString('en-US', { weekday: 'long', month: 'long', day: 'numeric' })
   }
 
+  // Poll a background AI analysis job until it finishes (or we stop waiting)
+  const waitForAnalysisJob = async (jobId) => {
+    for (let attempt = 0; attempt < 40; attempt++) {
+      await new Promise(resolve => setTimeout(resolve, 1500))
+      const { data } = await axios.get(`/garden/analysis-jobs/${jobId}`)
+      if (data.status === 'done') return data.care_suggestions
+      if (data.status === 'failed') return null
+    }
+    return null
+  }
+
   const handleImageUpload = async (e, space) => {
     const file = e.target.files[0]
     if (!file) return
@@ -1063,7 +1075,7 @@ const GridPlanner = forwardRef(({ selectedGarden, onGardenUpdate, onPlantUpdate
     
     try {
       const formData = new FormData()
-      formData.append('image', file)
+      formData.append('image', await resizeImageForUpload(file))
       formData.append('space_id', space.id)
 
       console.log('📤 Sending upload request...')
@@ -1076,7 +1088,11 @@ const GridPlanner = forwardRef(({ selectedGarden, onGardenUpdate, onPlantUpdate
       
       console.log('📥 Upload response:', response.data)
       
-      const { care_suggestions } = response.data
+      let { care_suggestions } = response.data
+      if (response.data.job_id) {
+        // Analysis runs in the background; wait for its result
+        care_suggestions = await waitForAnalysisJob(response.data.job_id)
+      }
       
       if (care_suggestions && care_suggestions.confidence > 0.1) {
         let suggestions = []
@@ -1098,7 +1114,7 @@ const GridPlanner = forwardRef(({ selectedGarden, onGardenUpdate, onPlantUpdate
         const updatedSpace = {
           ...selectedPlantSpace,
           image_path: response.data.image_path,
-          care_suggestions: response.data.care_suggestions,
+          care_suggestions: care_suggestions,
           last_updated: new Date().toISOString()
         }
         setSelectedPlantSpace(updatedSpace)
@@ -4,6 +4,7 @@ import axios from 'axios'
 import toast from 'react-hot-toast'
 import { useAuth } from '../contexts/AuthContext'
 import { useNavigate } from 'react-router-dom'
+import { resizeImageForUpload } from '../utils/resizeImageForUpload'
 
 // Plant image mapping for soil analysis recommendations - PHILIPPINE COMMON PLANTS
 const plantImages = {
@@ -517,7 +518,7 @@ const AIPlantRecognition = () => {
     setIsAnalyzing(true)
     try {
       const formData = new FormData()
-      formData.append('image', selectedImage)
+      formData.append('image', await resizeImageForUpload(selectedImage))
 
       const { data } = await axios.post('/api/ai-recognition', formData, {
         headers: { 'Content-Type': 'multipart/form-data' }
@@ -568,7 +569,7 @@ const AIPlantRecognition = () => {
     setIsAnalyzing(true)
     try {
       const formData = new FormData()
-      formData.append('image', selectedImage)
+      formData.append('image', await resizeImageForUpload(selectedImage))
 
       const { data } = await axios.post('/api/soil-analysis', formData, {
         headers: { 'Content-Type': 'multipart/form-data' }
@@ -5,6 +5,7 @@ import { Plus, Edit, Trash2, Leaf, MapPin, Calendar, Droplets, Sun, Scissors, Ca
 import axios from 'axios'
 import toast from 'react-hot-toast'
 import GridPlanner from '../components/GridPlanner'
+import { resizeImageForUpload } from '../utils/resizeImageForUpload'
 
 const Garden = () => {
   const { user, isPremium } = useAuth()
@@ -201,7 +202,7 @@ const Garden = () => {
 
     try {
       const formData = new FormData()
-      formData.append('image', file)
+      formData.append('image', await resizeImageForUpload(file))
 
       const response = await axios.post('/api/ai-recognition', formData, {
         headers: {
@@ -75,19 +75,18 @@ const AdminProfile = () => {
 
   const loadAdminStats = async () => {
     try {
-      const [statsResponse, usersResponse, feedbackResponse, subscriptionResponse] = await Promise.all([
+      // User totals come from /api/admin/stats: /admin/users returns only the first page
+      const [statsResponse, feedbackResponse, subscriptionResponse] = await Promise.all([
         axios.get('/api/admin/stats').catch(() => ({ data: {} })),
-        axios.get('/admin/users').catch(() => ({ data: { users: [] } })),
         axios.get('/admin/feedbacks').catch(() => ({ data: { feedbacks: [] } })),
         axios.get('/admin/subscriptions').catch(() => ({ data: { subscriptions: [] } }))
       ])
       
-      const totalUsers = usersResponse.data?.users?.length || usersResponse.data?.length || 0
       const totalFeedbacks = feedbackResponse.data?.feedbacks?.length || feedbackResponse.data?.feedback_list?.length || 0
       const activeSubscriptions = subscriptionResponse.data?.subscriptions?.filter(s => s.status === 'active')?.length || 0
       
       setAdminStats({
-        totalUsers: statsResponse.data.totalUsers || totalUsers,
+        totalUsers: statsResponse.data.totalUsers || 0,
         totalModules: statsResponse.data.totalModules || 0,
         systemUptime: '99.9%',
         lastLogin: user?.last_login ? new Date(user.last_login) : new Date(),
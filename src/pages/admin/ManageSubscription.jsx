@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react'
+import React, { useState, useEffect, useRef } from 'react'
 import { Link } from 'react-router-dom'
 import { 
   CreditCard, Users, TrendingUp, TrendingDown, DollarSign, Calendar,
@@ -14,6 +14,11 @@ import AdminHeader from '../../components/AdminHeader'
 import AdminStatsCard from '../../components/AdminStatsCard'
 import AdminFilters from '../../components/AdminFilters'
 
+const PAGE_SIZE = 100
+// Table columns the subscribers endpoint can sort by (keyset sorts), keyed by the column's field
+const SERVER_SORTS = { full_name: 'name', email: 'email', created_at: 'created_at' }
+const SUBSCRIBED_FILTERS = { subscribed: true, not_subscribed: false, premium: true, basic: false }
+
 const ManageSubscription = () => {
   const [subscriptionStats, setSubscriptionStats] = useState({
     totalSubscribers: 0,
@@ -26,8 +31,11 @@ const ManageSubscription = () => {
     totalRevenue: 0
   })
   const [subscribers, setSubscribers] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [searchTerm, setSearchTerm] = useState('')
+  const [debouncedSearch, setDebouncedSearch] = useState('')
   const [filterStatus, setFilterStatus] = useState('all')
   const [filterPlan, setFilterPlan] = useState('all')
   const [viewMode, setViewMode] = useState('table')
@@ -63,6 +71,62 @@ const ManageSubscription = () => {
     
     return () => clearInterval(interval)
   }, [])
+
+  const latestRequest = useRef(0)
+
+  // Search on the server once typing pauses
+  useEffect(() => {
+    const timeout = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300)
+    return () => clearTimeout(timeout)
+  }, [searchTerm])
+
+  useEffect(() => {
+    fetchSubscribers()
+  }, [debouncedSearch, filterStatus, filterPlan, sortBy, sortOrder])
+
+  // Search, filters and sort are applied by the backend, which returns one keyset
+  // page as {subscribers: [...], next_cursor, has_more}; a cursor appends the next page.
+  const fetchSubscribers = async (cursor = null) => {
+    const request = ++latestRequest.current
+    const byStatus = SUBSCRIBED_FILTERS[filterStatus]
+    const byPlan = SUBSCRIBED_FILTERS[filterPlan]
+    if (byStatus !== undefined && byPlan !== undefined && byStatus !== byPlan) {
+      // e.g. "Subscribed" on the Basic plan: nothing can match
+      setSubscribers([])
+      setNextCursor(null)
+      setSelectedSubscribers([])
+      return
+    }
+    const subscribed = byStatus ?? byPlan
+    try {
+      if (cursor) setLoadingMore(true)
+      const response = await axios.get('/api/admin/subscription/subscribers', {
+        params: {
+          q: debouncedSearch || undefined,
+          subscribed: subscribed === undefined ? 'all' : String(subscribed),
+          sort: SERVER_SORTS[sortBy],
+          order: sortOrder,
+          limit: PAGE_SIZE,
+          cursor: cursor || undefined
+        }
+      })
+      if (request !== latestRequest.current) return // a newer search or filter has been sent since
+      const page = Array.isArray(response.data) ? response.data : (response.data.subscribers || [])
+      setSubscribers(previous => cursor ? [...previous, ...page] : page)
+      setNextCursor(response.data.next_cursor || null)
+      if (!cursor) setSelectedSubscribers([])
+    } catch (error) {
+      console.error('Error fetching subscribers:', error)
+      toast.error('Failed to load subscribers')
+    } finally {
+      if (request === latestRequest.current) setLoadingMore(false)
+    }
+  }
+
+  const refreshSubscriptionData = () => {
+    fetchSubscriptionData()
+    fetchSubscribers()
+  }
   
   // Reset to first page when search or filter changes
   useEffect(() => {
@@ -116,14 +180,15 @@ const ManageSubscription = () => {
   const fetchSubscriptionData = async () => {
     try {
       setLoading(true)
-      // Fetch subscription statistics
-      const [statsRes, subscribersRes] = await Promise.all([
+      // Fetch subscription statistics, and user totals for the per-plan counts
+      const [statsRes, userStatsRes] = await Promise.all([
         axios.get('/api/admin/subscription/stats'),
-        axios.get('/api/admin/subscription/subscribers')
+        axios.get('/api/admin/stats').catch(() => ({ data: {} }))
       ])
       
       setSubscriptionStats(statsRes.data)
-      setSubscribers(subscribersRes.data)
+      const premiumUsers = userStatsRes.data.subscribedUsers || 0
+      const basicUsers = Math.max((userStatsRes.data.totalUsers || 0) - premiumUsers, 0)
       
       // Fetch recent subscription activities from API
       await fetchRecentActivity()
@@ -169,7 +234,7 @@ const ManageSubscription = () => {
               color: plan.plan_type === 'premium' ? 'bg-green-500' : 'bg-gray-500',
               borderColor: plan.plan_type === 'premium' ? 'border-green-200' : 'border-gray-200',
               bgColor: plan.plan_type === 'premium' ? 'bg-green-50' : 'bg-gray-50',
-              subscribers: subscribers.filter(s => s.subscribed === (plan.plan_type === 'premium')).length,
+              subscribers: plan.plan_type === 'premium' ? premiumUsers : basicUsers,
               popular: plan.plan_type === 'premium',
               ...plan
             }
@@ -191,7 +256,7 @@ const ManageSubscription = () => {
               color: 'bg-gray-500',
               borderColor: 'border-gray-200',
               bgColor: 'bg-gray-50',
-              subscribers: 150
+              subscribers: basicUsers
             },
             {
               id: 'premium',
@@ -207,7 +272,7 @@ const ManageSubscription = () => {
               color: 'bg-green-500',
               borderColor: 'border-green-200',
               bgColor: 'bg-green-50',
-              subscribers: 45,
+              subscribers: premiumUsers,
               popular: true
             }
           ])
@@ -228,7 +293,7 @@ const ManageSubscription = () => {
             color: 'bg-gray-500',
             borderColor: 'border-gray-200',
             bgColor: 'bg-gray-50',
-            subscribers: 150
+            subscribers: basicUsers
           },
           {
             id: 'premium',
@@ -244,7 +309,7 @@ const ManageSubscription = () => {
             color: 'bg-purple-500',
             borderColor: 'border-purple-200',
             bgColor: 'bg-purple-50',
-            subscribers: 45,
+            subscribers: premiumUsers,
             popular: true
           }
         ])
@@ -263,7 +328,7 @@ const ManageSubscription = () => {
         subscribed: !currentStatus
       })
       toast.success(`Subscription ${!currentStatus ? 'activated' : 'deactivated'} successfully`)
-      fetchSubscriptionData() // Refresh the data
+      refreshSubscriptionData()
     } catch (error) {
       console.error('Error updating subscription:', error)
       toast.error('Failed to update subscription')
@@ -272,6 +337,7 @@ const ManageSubscription = () => {
 
   // Utility Functions
   const handleSort = (field) => {
+    if (!SERVER_SORTS[field]) return
     if (sortBy === field) {
       setSortOrder(sortOrder === 'asc' ? 'desc' : 'asc')
     } else {
@@ -306,7 +372,7 @@ const ManageSubscription = () => {
       }
       setSelectedSubscribers([])
       setShowBulkActions(false)
-      fetchSubscriptionData()
+      refreshSubscriptionData()
     } catch (error) {
       console.error('Error performing bulk action:', error)
       toast.error('Failed to perform bulk action')
@@ -412,7 +478,7 @@ const ManageSubscription = () => {
   const exportSubscribers = () => {
     const csvContent = [
       ['Name', 'Email', 'Status', 'Plan', 'Start Date'].join(','),
-      ...filteredSubscribers.map(subscriber => {
+      ...subscribers.map(subscriber => {
         // Escape commas and quotes in CSV values
         const escapeCSV = (value) => {
           if (value === null || value === undefined) return ''
@@ -493,32 +559,6 @@ const ManageSubscription = () => {
     })
   }
 
-  const filteredSubscribers = subscribers.filter(subscriber => {
-    const matchesSearch = subscriber.full_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         subscriber.email?.toLowerCase().includes(searchTerm.toLowerCase())
-    const matchesStatus = filterStatus === 'all' || 
-                         (filterStatus === 'subscribed' && subscriber.subscribed) ||
-                         (filterStatus === 'not_subscribed' && !subscriber.subscribed)
-    const matchesPlan = filterPlan === 'all' ||
-                       (filterPlan === 'premium' && subscriber.subscribed) ||
-                       (filterPlan === 'basic' && !subscriber.subscribed)
-    return matchesSearch && matchesStatus && matchesPlan
-  }).sort((a, b) => {
-    let aValue = a[sortBy]
-    let bValue = b[sortBy]
-    
-    if (sortBy === 'created_at') {
-      aValue = new Date(aValue)
-      bValue = new Date(bValue)
-    }
-    
-    if (sortOrder === 'asc') {
-      return aValue > bValue ? 1 : -1
-    } else {
-      return aValue < bValue ? 1 : -1
-    }
-  })
-
   if (loading) {
     return (
       <div className="min-h-screen bg-gradient-to-br from-green-50 via-emerald-50 to-teal-50 flex items-center justify-center">
@@ -538,7 +578,7 @@ const ManageSubscription = () => {
         subtitle="Monitor and manage user subscriptions & billing"
         icon={CreditCard}
         iconColor="from-green-600 to-emerald-600"
-        onRefresh={fetchSubscriptionData}
+        onRefresh={refreshSubscriptionData}
         actions={[
           {
             text: "Export",
@@ -642,7 +682,7 @@ const ManageSubscription = () => {
           ]}
           currentViewMode={viewMode}
           onViewModeChange={setViewMode}
-          onRefresh={fetchSubscriptionData}
+          onRefresh={refreshSubscriptionData}
           showBulkActions={selectedSubscribers.length > 0}
           bulkActionsCount={selectedSubscribers.length}
           onBulkAction={handleBulkAction}
@@ -670,19 +710,19 @@ const ManageSubscription = () => {
           <div className="px-6 py-4 border-b border-gray-200">
             <div className="flex items-center justify-between">
               <h3 className="text-lg font-medium text-gray-900">
-                Subscribers ({filteredSubscribers.length})
+                Subscribers ({subscribers.length}{nextCursor ? '+' : ''})
               </h3>
               <div className="flex items-center space-x-2">
                 <input
                   type="checkbox"
                   onChange={(e) => {
                     if (e.target.checked) {
-                      setSelectedSubscribers(filteredSubscribers.map(sub => sub.id))
+                      setSelectedSubscribers(subscribers.map(sub => sub.id))
                     } else {
                       setSelectedSubscribers([])
                     }
                   }}
-                  checked={selectedSubscribers.length === filteredSubscribers.length && filteredSubscribers.length > 0}
+                  checked={selectedSubscribers.length === subscribers.length && subscribers.length > 0}
                   className="rounded border-gray-300 text-green-600 focus:ring-green-500"
                 />
                 <span className="text-sm text-gray-600">Select All</span>
@@ -709,16 +749,8 @@ const ManageSubscription = () => {
                         )}
                       </div>
                     </th>
-                    <th 
-                      className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider cursor-pointer hover:bg-gray-100"
-                      onClick={() => handleSort('subscribed')}
-                    >
-                      <div className="flex items-center">
-                        Subscription Status
-                        {sortBy === 'subscribed' && (
-                          sortOrder === 'asc' ? <ChevronUp className="h-4 w-4 ml-1" /> : <ChevronDown className="h-4 w-4 ml-1" />
-                        )}
-                      </div>
+                    <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                      Subscription Status
                     </th>
                     <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                       Plan
@@ -740,7 +772,7 @@ const ManageSubscription = () => {
                   </tr>
                 </thead>
                 <tbody className="bg-white divide-y divide-gray-200">
-                  {filteredSubscribers.map((subscriber) => (
+                  {subscribers.map((subscriber) => (
                     <tr key={subscriber.id} className="hover:bg-gray-50">
                       <td className="px-6 py-4 whitespace-nowrap">
                         <input
@@ -847,7 +879,7 @@ const ManageSubscription = () => {
           {viewMode === 'grid' && (
             <div className="p-6">
               <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                {filteredSubscribers.map((subscriber) => (
+                {subscribers.map((subscriber) => (
                   <div key={subscriber.id} className="bg-white/80 backdrop-blur-sm border border-gray-200 rounded-lg p-6 hover:shadow-md transition-shadow">
                     <div className="flex items-center justify-between mb-4">
                       <div className="flex items-center">
@@ -927,7 +959,7 @@ const ManageSubscription = () => {
 
           {viewMode === 'list' && (
             <div className="divide-y divide-gray-200">
-              {filteredSubscribers.map((subscriber) => (
+              {subscribers.map((subscriber) => (
                 <div key={subscriber.id} className="p-6 hover:bg-gray-50">
                   <div className="flex items-center justify-between">
                     <div className="flex items-center space-x-4">
@@ -994,6 +1026,19 @@ const ManageSubscription = () => {
               ))}
             </div>
           )}
+
+          {nextCursor && (
+            <div className="px-6 py-4 border-t border-gray-200 text-center">
+              <button
+                onClick={() => fetchSubscribers(nextCursor)}
+                disabled={loadingMore}
+                className="inline-flex items-center px-4 py-2 rounded-lg text-sm font-medium bg-gradient-to-r from-green-600 to-emerald-600 text-white hover:from-green-700 hover:to-emerald-700 disabled:opacity-50"
+              >
+                {loadingMore && <RefreshCw className="h-4 w-4 mr-2 animate-spin" />}
+                {loadingMore ? 'Loading...' : 'Load more subscribers'}
+              </button>
+            </div>
+          )}
         </div>
 
         {/* Enhanced Subscription Plans Management */}
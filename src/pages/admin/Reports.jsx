@@ -9,6 +9,24 @@ import {
 import axios from 'axios'
 import toast from 'react-hot-toast'
 
+const LOG_PAGE_SIZE = 1000
+
+// Every entry of one log in the date range: the API returns keyset pages, followed via next_cursor
+const fetchAllLogs = async (url, dateRange) => {
+  let logs = []
+  let total = 0
+  let cursor = null
+  do {
+    const response = await axios.get(url, {
+      params: { date_range: dateRange, limit: LOG_PAGE_SIZE, cursor: cursor || undefined }
+    })
+    logs = logs.concat(response.data.logs || [])
+    total = response.data.total ?? logs.length
+    cursor = response.data.next_cursor
+  } while (cursor)
+  return { logs, total }
+}
+
 const Reports = () => {
   const { user, isAdmin } = useAuth()
   const [loading, setLoading] = useState(true)
@@ -52,31 +70,23 @@ const Reports = () => {
     try {
       setLoading(true)
       
-      // Fetch activity logs
-      const activityResponse = await axios.get('/api/admin/activity-logs', {
-        params: { date_range: dateRange }
-      })
-      setActivityLogs(activityResponse.data.logs || [])
-
-      // Fetch history logs
-      const historyResponse = await axios.get('/api/admin/history-logs', {
-        params: { date_range: dateRange }
-      })
-      setHistoryLogs(historyResponse.data.logs || [])
-
-      // Fetch subscription logs
-      const subscriptionResponse = await axios.get('/api/admin/subscription-logs', {
-        params: { date_range: dateRange }
-      })
-      setSubscriptionLogs(subscriptionResponse.data.logs || [])
+      // Fetch every page of the activity, history and subscription logs
+      const [activity, history, subscription] = await Promise.all([
+        fetchAllLogs('/api/admin/activity-logs', dateRange),
+        fetchAllLogs('/api/admin/history-logs', dateRange),
+        fetchAllLogs('/api/admin/subscription-logs', dateRange)
+      ])
+      setActivityLogs(activity.logs)
+      setHistoryLogs(history.logs)
+      setSubscriptionLogs(subscription.logs)
 
-      // Calculate summary statistics from actual data
+      // Totals come from the API; the status split from the complete subscription log
       const calculatedStats = {
-        totalActivities: activityResponse.data.logs?.length || 0,
-        totalHistoryRecords: historyResponse.data.logs?.length || 0,
-        totalSubscriptions: subscriptionResponse.data.logs?.length || 0,
-        activeSubscriptions: subscriptionResponse.data.logs?.filter(log => log.status === 'active').length || 0,
-        cancelledSubscriptions: subscriptionResponse.data.logs?.filter(log => log.status === 'cancelled').length || 0
+        totalActivities: activity.total,
+        totalHistoryRecords: history.total,
+        totalSubscriptions: subscription.total,
+        activeSubscriptions: subscription.logs.filter(log => log.status === 'active').length,
+        cancelledSubscriptions: subscription.logs.filter(log => log.status === 'cancelled').length
       }
       setSummaryStats(calculatedStats)
 
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react'
+import React, { useState, useEffect, useRef } from 'react'
 import { 
   Users, UserPlus, Eye, Trash2, Search, Filter,
   ArrowLeft, Shield, Mail, Phone, Calendar, CheckCircle, XCircle,
@@ -12,10 +12,17 @@ import AdminHeader from '../../components/AdminHeader'
 import AdminStatsCard from '../../components/AdminStatsCard'
 import AdminFilters from '../../components/AdminFilters'
 
+const PAGE_SIZE = 100
+// Table columns the listing endpoint can sort by (keyset sorts), keyed by the column's field
+const SERVER_SORTS = { full_name: 'name', email: 'email', created_at: 'created_at' }
+
 const UserManagement = () => {
   const [users, setUsers] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [searchTerm, setSearchTerm] = useState('')
+  const [debouncedSearch, setDebouncedSearch] = useState('')
   const [filterRole, setFilterRole] = useState('all')
   const [filterStatus, setFilterStatus] = useState('all')
   const [filterSubscription, setFilterSubscription] = useState('all')
@@ -34,37 +41,76 @@ const UserManagement = () => {
     newThisMonth: 0
   })
 
+  const latestRequest = useRef(0)
+
   useEffect(() => {
-    fetchUsers()
+    fetchStats()
   }, [])
 
-  const fetchUsers = async () => {
+  // Search on the server once typing pauses
+  useEffect(() => {
+    const timeout = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300)
+    return () => clearTimeout(timeout)
+  }, [searchTerm])
+
+  useEffect(() => {
+    fetchUsers()
+  }, [debouncedSearch, filterRole, filterStatus, filterSubscription, sortBy, sortOrder])
+
+  // Totals for the whole table, not just the pages loaded so far
+  const fetchStats = async () => {
+    try {
+      const response = await axios.get('/api/admin/stats')
+      setStats({
+        total: response.data.totalUsers || 0,
+        active: response.data.activeUsers || 0,
+        premium: response.data.subscribedUsers || 0,
+        newThisMonth: response.data.signupsThisMonth || 0
+      })
+    } catch (error) {
+      console.error('Error fetching user stats:', error)
+    }
+  }
+
+  // Search, filters and sort are applied by the backend, which returns one keyset
+  // page as {users: [...], next_cursor, has_more}; a cursor appends the next page.
+  const fetchUsers = async (cursor = null) => {
+    const request = ++latestRequest.current
     try {
-      setLoading(true)
-      const response = await axios.get('/api/admin/users')
-      // Backend returns array directly, not wrapped in {users: [...]}
+      if (cursor) setLoadingMore(true)
+      const response = await axios.get('/api/admin/users', {
+        params: {
+          q: debouncedSearch || undefined,
+          role: filterRole,
+          status: filterStatus,
+          subscribed: filterSubscription,
+          sort: SERVER_SORTS[sortBy],
+          order: sortOrder,
+          limit: PAGE_SIZE,
+          cursor: cursor || undefined
+        }
+      })
+      if (request !== latestRequest.current) return // a newer search or filter has been sent since
       const userData = Array.isArray(response.data) ? response.data : (response.data.users || [])
-      setUsers(userData)
-      
-      // Calculate stats (exclude admins from premium count since they don't have subscriptions)
-      const now = new Date()
-      const thisMonth = new Date(now.getFullYear(), now.getMonth(), 1)
-      
-      const calculatedStats = {
-        total: userData.length,
-        active: userData.filter(user => user.is_active).length,
-        premium: userData.filter(user => user.subscribed && user.role !== 'admin').length, // Admins don't have subscriptions
-        newThisMonth: userData.filter(user => user.created_at && new Date(user.created_at) >= thisMonth).length
-      }
-      setStats(calculatedStats)
+      setUsers(previous => cursor ? [...previous, ...userData] : userData)
+      setNextCursor(response.data.next_cursor || null)
+      if (!cursor) setBulkActions([])
     } catch (error) {
       console.error('Error fetching users:', error)
       toast.error('Failed to load users')
     } finally {
-      setLoading(false)
+      if (request === latestRequest.current) {
+        setLoading(false)
+        setLoadingMore(false)
+      }
     }
   }
 
+  const refreshUsers = () => {
+    fetchUsers()
+    fetchStats()
+  }
+
   const handleDeleteUser = async (userId) => {
     if (!window.confirm('Are you sure you want to delete this user? This action cannot be undone.')) {
       return
@@ -73,7 +119,7 @@ const UserManagement = () => {
     try {
       const response = await axios.delete(`/api/admin/users/${userId}`)
       toast.success(response.data?.message || 'User deleted successfully')
-      fetchUsers() // Refresh the list
+      refreshUsers()
     } catch (error) {
       console.error('Error deleting user:', error)
       const errorMessage = error.response?.data?.error || error.message || 'Failed to delete user'
@@ -87,7 +133,7 @@ const UserManagement = () => {
         is_active: !currentStatus
       })
       toast.success(`User ${!currentStatus ? 'activated' : 'deactivated'} successfully`)
-      fetchUsers() // Refresh the list
+      refreshUsers()
     } catch (error) {
       console.error('Error updating user status:', error)
       toast.error('Failed to update user status')
@@ -104,6 +150,7 @@ const UserManagement = () => {
   }
 
   const handleSort = (field) => {
+    if (!SERVER_SORTS[field]) return
     if (sortBy === field) {
       setSortOrder(sortOrder === 'asc' ? 'desc' : 'asc')
     } else {
@@ -142,7 +189,7 @@ const UserManagement = () => {
       }
       setBulkActions([])
       setShowBulkActions(false)
-      fetchUsers()
+      refreshUsers()
     } catch (error) {
       console.error('Error performing bulk action:', error)
       toast.error('Failed to perform bulk action')
@@ -152,7 +199,7 @@ const UserManagement = () => {
   const exportUsers = () => {
     const csvContent = [
       ['Name', 'Email', 'Role', 'Status', 'Subscription', 'Created At'].join(','),
-      ...filteredUsers.map(user => [
+      ...users.map(user => [
         user.full_name,
         user.email,
         user.role,
@@ -172,34 +219,6 @@ const UserManagement = () => {
     toast.success('Users exported successfully')
   }
 
-  const filteredUsers = users.filter(user => {
-    const matchesSearch = user.full_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         user.email?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         user.username?.toLowerCase().includes(searchTerm.toLowerCase()) // Include username for admins
-    const matchesRole = filterRole === 'all' || user.role === filterRole
-    const matchesStatus = filterStatus === 'all' || 
-                         (filterStatus === 'active' && user.is_active) ||
-                         (filterStatus === 'inactive' && !user.is_active)
-    const matchesSubscription = filterSubscription === 'all' ||
-                               (filterSubscription === 'premium' && user.subscribed) ||
-                               (filterSubscription === 'basic' && !user.subscribed)
-    return matchesSearch && matchesRole && matchesStatus && matchesSubscription
-  }).sort((a, b) => {
-    let aValue = a[sortBy]
-    let bValue = b[sortBy]
-    
-    if (sortBy === 'created_at') {
-      aValue = new Date(aValue)
-      bValue = new Date(bValue)
-    }
-    
-    if (sortOrder === 'asc') {
-      return aValue > bValue ? 1 : -1
-    } else {
-      return aValue < bValue ? 1 : -1
-    }
-  })
-
   if (loading) {
     return (
       <div className="min-h-screen bg-gradient-to-br from-green-50 via-emerald-50 to-teal-50 flex items-center justify-center">
@@ -219,7 +238,7 @@ const UserManagement = () => {
         subtitle="Manage user accounts and permissions"
         icon={Users}
         iconColor="from-green-600 to-emerald-600"
-        onRefresh={fetchUsers}
+        onRefresh={refreshUsers}
         actions={[
           {
             text: "Create User",
@@ -258,7 +277,7 @@ const UserManagement = () => {
             shadowColor="hover:shadow-green-500/10"
             trend={true}
             trendIcon={CheckCircle}
-            trendText={`${Math.round((stats.active / stats.total) * 100)}% active`}
+            trendText={`${stats.total ? Math.round((stats.active / stats.total) * 100) : 0}% active`}
             trendColor="text-green-600"
           />
           
@@ -334,7 +353,7 @@ const UserManagement = () => {
           ]}
           currentViewMode={viewMode}
           onViewModeChange={setViewMode}
-          onRefresh={fetchUsers}
+          onRefresh={refreshUsers}
           actions={[
             {
               text: "Export",
@@ -377,7 +396,7 @@ const UserManagement = () => {
                   <Users className="h-5 w-5 text-green-600" />
                 </div>
                 <h3 className="text-lg font-semibold text-slate-900">
-                  Users ({filteredUsers.length})
+                  Users ({users.length}{nextCursor ? '+' : ''})
                 </h3>
               </div>
               <div className="flex items-center space-x-3">
@@ -385,12 +404,12 @@ const UserManagement = () => {
                   type="checkbox"
                   onChange={(e) => {
                     if (e.target.checked) {
-                      setBulkActions(filteredUsers.map(user => user.id))
+                      setBulkActions(users.map(user => user.id))
                     } else {
                       setBulkActions([])
                     }
                   }}
-                  checked={bulkActions.length === filteredUsers.length && filteredUsers.length > 0}
+                  checked={bulkActions.length === users.length && users.length > 0}
                   className="rounded border-slate-300 text-green-600 focus:ring-green-500"
                 />
                 <span className="text-sm text-slate-600 font-medium">Select All</span>
@@ -417,38 +436,14 @@ const UserManagement = () => {
                         )}
                       </div>
                     </th>
-                    <th 
-                      className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider cursor-pointer hover:bg-gray-100"
-                      onClick={() => handleSort('role')}
-                    >
-                      <div className="flex items-center">
-                        Role
-                        {sortBy === 'role' && (
-                          sortOrder === 'asc' ? <ChevronUp className="h-4 w-4 ml-1" /> : <ChevronDown className="h-4 w-4 ml-1" />
-                        )}
-                      </div>
+                    <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                      Role
                     </th>
-                    <th 
-                      className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider cursor-pointer hover:bg-gray-100"
-                      onClick={() => handleSort('is_active')}
-                    >
-                      <div className="flex items-center">
-                        Status
-                        {sortBy === 'is_active' && (
-                          sortOrder === 'asc' ? <ChevronUp className="h-4 w-4 ml-1" /> : <ChevronDown className="h-4 w-4 ml-1" />
-                        )}
-                      </div>
+                    <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                      Status
                     </th>
-                    <th 
-                      className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider cursor-pointer hover:bg-gray-100"
-                      onClick={() => handleSort('subscribed')}
-                    >
-                      <div className="flex items-center">
-                        Subscription
-                        {sortBy === 'subscribed' && (
-                          sortOrder === 'asc' ? <ChevronUp className="h-4 w-4 ml-1" /> : <ChevronDown className="h-4 w-4 ml-1" />
-                        )}
-                      </div>
+                    <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                      Subscription
                     </th>
                     <th 
                       className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider cursor-pointer hover:bg-gray-100"
@@ -467,7 +462,7 @@ const UserManagement = () => {
                   </tr>
                 </thead>
                 <tbody className="bg-white divide-y divide-gray-200">
-                  {filteredUsers.map((user) => (
+                  {users.map((user) => (
                     <tr key={user.id} className="hover:bg-gray-50">
                       <td className="px-6 py-4 whitespace-nowrap">
                         <input
@@ -603,7 +598,7 @@ const UserManagement = () => {
           {viewMode === 'grid' && (
             <div className="p-6">
               <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                {filteredUsers.map((user) => (
+                {users.map((user) => (
                   <div key={user.id} className="bg-white border border-gray-200 rounded-lg p-6 hover:shadow-md transition-shadow">
                     <div className="flex items-center justify-between mb-4">
                       <div className="flex items-center">
@@ -692,7 +687,7 @@ const UserManagement = () => {
 
           {viewMode === 'list' && (
             <div className="divide-y divide-gray-200">
-              {filteredUsers.map((user) => (
+              {users.map((user) => (
                 <div key={user.id} className="p-6 hover:bg-gray-50">
                   <div className="flex items-center justify-between">
                     <div className="flex items-center space-x-4">
@@ -765,6 +760,19 @@ const UserManagement = () => {
               ))}
             </div>
           )}
+
+          {nextCursor && (
+            <div className="px-6 py-4 border-t border-slate-200/60 text-center">
+              <button
+                onClick={() => fetchUsers(nextCursor)}
+                disabled={loadingMore}
+                className="inline-flex items-center px-4 py-2 rounded-lg text-sm font-medium bg-gradient-to-r from-green-600 to-emerald-600 text-white hover:from-green-700 hover:to-emerald-700 disabled:opacity-50"
+              >
+                {loadingMore && <RefreshCw className="h-4 w-4 mr-2 animate-spin" />}
+                {loadingMore ? 'Loading...' : 'Load more users'}
+              </button>
+            </div>
+          )}
         </div>
 
         {/* User Details Modal */}
@@ -0,0 +1,43 @@
+/**
+ * Shrink a photo in the browser before it is uploaded for AI analysis.
+ * Phone photos are often 4000px / 5-12 MB; the server only sends ~1500px
+ * upstream, so resizing here saves upload time on slow connections.
+ * Returns the original file if it is already small or cannot be decoded.
+ */
+
+const MAX_SIDE = 2048
+const JPEG_QUALITY = 0.9
+const SMALL_FILE_BYTES = 1024 * 1024
+
+export const resizeImageForUpload = async (file, maxSide = MAX_SIDE) => {
+  if (!file || !file.type?.startsWith('image/') || typeof createImageBitmap !== 'function') {
+    return file
+  }
+
+  try {
+    // 'from-image' applies the EXIF rotation, which is lost when re-encoding
+    const bitmap = await createImageBitmap(file, { imageOrientation: 'from-image' })
+    const scale = Math.min(1, maxSide / Math.max(bitmap.width, bitmap.height))
+    if (scale === 1 && file.size <= SMALL_FILE_BYTES) {
+      bitmap.close()
+      return file
+    }
+
+    const canvas = document.createElement('canvas')
+    canvas.width = Math.round(bitmap.width * scale)
+    canvas.height = Math.round(bitmap.height * scale)
+    canvas.getContext('2d').drawImage(bitmap, 0, 0, canvas.width, canvas.height)
+    bitmap.close()
+
+    const blob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', JPEG_QUALITY))
+    if (!blob || blob.size >= file.size) {
+      return file
+    }
+    const name = file.name ? file.name.replace(/\.[^.]+$/, '') + '.jpg' : 'photo.jpg'
+    console.log(`🖼️ Resized ${file.name}: ${Math.round(file.size / 1024)} KB -> ${Math.round(blob.size / 1024)} KB`)
+    return new File([blob], name, { type: 'image/jpeg' })
+  } catch (error) {
+    console.warn('⚠️ Could not resize image, uploading original:', error)
+    return file
+  }
+}
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Recovery job for interrupted AI analyses and report builds (thread mode).
+Schedule this script every few minutes (e.g. via cron) when
+ANALYSIS_WORKER_MODE=thread. It is the only place that requeues jobs and
+reports left running by a web worker that died. It then runs whatever is
+queued, because no web process polls the queue. With
+ANALYSIS_WORKER_MODE=external, run_analysis_worker.py does this instead.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website import create_app
+from website.jobs import requeue_stale_jobs, run_pending_jobs
+from website.reports import requeue_stale_reports, run_pending_reports
+
+def sweep_stale_work():
+    app = create_app()
+
+    with app.app_context():
+        try:
+            requeued = requeue_stale_jobs() + requeue_stale_reports()
+            ran = run_pending_jobs() + run_pending_reports()
+            print(f"✅ Requeued {requeued} interrupted job(s), ran {ran} queued job(s) and report(s)")
+        except Exception as e:
+            print(f"❌ Error sweeping stale jobs: {e}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    sweep_stale_work()
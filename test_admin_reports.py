@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test script for background admin report generation
+Queues users / AI usage / care activity reports through the admin endpoints
+on in-memory SQLite, builds them the way the worker does, and checks the
+CSV and XLSX files, the status and download endpoints, failure cleanup,
+that a build requeued while still running cannot overwrite the newer one,
+that thread mode builds on the reports pool (and picks up queued reports on
+start) and that building streams rows instead of loading the table.
+"""
+
+import os
+import sys
+import csv
+import time
+import threading
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask_login import login_user, FlaskLoginClient
+from website import login_manager
+from website import reports
+from website.models import db, Admin, User, AIUsageTracking, AdminReport
+from testing_support import create_test_app
+
+NOW = datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def seed(users=3000):
+    with db.engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [
+            {'email': f'u{i}@egrowtify.com', 'firstname': f'First{i}', 'lastname': 'Tester', 'contact': '0',
+             'password_hash': 'x', 'is_active': True, 'created_at': NOW - timedelta(days=i % 60)}
+            for i in range(1, users + 1)])
+        connection.execute(AIUsageTracking.__table__.insert(), [
+            {'user_id': 1 + i % users, 'usage_type': 'plant_analysis' if i % 2 else 'soil_analysis',
+             'cost': 20 if i % 3 == 0 else 0, 'is_free_usage': i % 3 != 0, 'created_at': NOW - timedelta(hours=i)}
+            for i in range(500)])
+    admin = Admin(username='admin', email='admin@egrowtify.com', password_hash='x', full_name='Admin')
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+def call(app, admin, view, path, method='GET', body=None, **kwargs):
+    with app.test_request_context(path, method=method, json=body):
+        login_user(admin)
+        response = view(**kwargs)
+        response, status = response if isinstance(response, tuple) else (response, response.status_code)
+        if response.mimetype == 'application/json':
+            return status, response.get_json()
+        response.direct_passthrough = False
+        return status, response.get_data()
+
+
+def test_report_lifecycle():
+    from website.views import admin_api_generate_report, admin_api_report_status, admin_api_download_report
+    app = create_test_app()
+    with tempfile.TemporaryDirectory() as directory, \
+            mock.patch.dict(os.environ, {'REPORTS_DIR': directory, 'ANALYSIS_WORKER_MODE': 'external'}):
+        with app.app_context():
+            db.create_all()
+            admin = seed()
+
+            status, data = call(app, admin, admin_api_generate_report, '/api/admin/reports/generate', 'POST',
+                                {'type': 'users', 'dateRange': '30d'})
+            assert status == 202 and data['report']['status'] == 'queued', data
+            report_id = data['report']['id']
+            status, _ = call(app, admin, admin_api_download_report, f'/x/{report_id}', report_id=report_id)
+            assert status == 409, "a queued report cannot be downloaded"
+
+            assert reports.run_pending_reports() == 1
+            status, data = call(app, admin, admin_api_report_status, f'/x/{report_id}', report_id=report_id)
+            report = data['report']
+            expected = User.query.filter(User.created_at > NOW - timedelta(days=30)).count()
+            assert report['status'] == 'done' and report['row_count'] == expected and report['size'].endswith('KB')
+            status, body = call(app, admin, admin_api_download_report, f'/x/{report_id}', report_id=report_id)
+            rows = list(csv.reader(body.decode().splitlines()))
+            assert status == 200 and rows[0][:2] == ['ID', 'Email'] and len(rows) == expected + 1
+            assert [int(r[0]) for r in rows[1:]] == sorted(int(r[0]) for r in rows[1:])
+            assert not [name for name in os.listdir(directory) if name.endswith('.part')]
+            print(f"✅ Users report queued, built by the worker and downloaded ({expected} rows)")
+
+            status, data = call(app, admin, admin_api_generate_report, '/api/admin/reports/generate', 'POST',
+                                {'type': 'ai-usage', 'format': 'xlsx', 'dateRange': 'all'})
+            assert reports.build_report(data['report']['id']) and not reports.build_report(data['report']['id'])
+            report = xlsx_report = db.session.get(AdminReport, data['report']['id'])
+            try:
+                from openpyxl import load_workbook
+                sheet = load_workbook(reports.report_path(report), read_only=True)['Report']
+                xlsx_rows = list(sheet.iter_rows(values_only=True))
+                assert report.status == 'done' and len(xlsx_rows) == 501 and xlsx_rows[1][2] == 'u1@egrowtify.com'
+                print("✅ XLSX report written with a write-only workbook (built exactly once)")
+            except ImportError:
+                assert report.status == 'failed' and 'openpyxl' in report.error
+                print("✅ XLSX report fails cleanly without openpyxl")
+
+            status, data = call(app, admin, admin_api_generate_report, '/api/admin/reports/generate', 'POST',
+                                {'type': 'payments'})
+            assert status == 400
+
+            status, data = call(app, admin, admin_api_generate_report, '/api/admin/reports/generate', 'POST',
+                                {'type': 'care-activity', 'dateRange': '7d'})
+            with mock.patch.object(reports, '_write_csv', side_effect=OSError('disk full')):
+                reports.build_report(data['report']['id'])
+            report = db.session.get(AdminReport, data['report']['id'])
+            assert report.status == 'failed' and report.error == 'disk full'
+            assert not [name for name in os.listdir(directory) if name.endswith('.part')]
+            assert app.url_map.bind('localhost').match('/api/admin/reports') == ('views.admin_api_list_reports', {})
+            login_manager.user_loader(lambda admin_id: db.session.get(Admin, int(admin_id)))
+            app.test_client_class = FlaskLoginClient
+            response = app.test_client(user=admin).get('/api/admin/reports')
+            data = response.get_json()
+            assert response.status_code == 200, data
+            assert [r['id'] for r in data['reports']] == [report.id, xlsx_report.id, report_id]
+            assert [r['status'] for r in data['reports']] == ['failed', xlsx_report.status, 'done']
+            print("✅ Failed builds are recorded and leave no partial file; GET /api/admin/reports lists newest first")
+
+            superseded = reports.create_report('users', 'csv', 'all', requested_by=None)
+            db.session.commit()
+            write_csv, temp_names = reports._write_csv, []
+
+            def requeued_mid_build(path, headers, rows):
+                temp_names.append(os.path.basename(path))
+                if len(temp_names) == 1:
+                    # The sweep takes this build for lost and another worker builds the report again
+                    AdminReport.query.filter_by(id=superseded.id).update(
+                        {'started_at': NOW - timedelta(seconds=reports.STALE_REPORT_SECONDS + 60)})
+                    db.session.commit()
+                    assert reports.requeue_stale_reports() == 1 and reports.build_report(superseded.id)
+                return write_csv(path, headers, rows)
+
+            with mock.patch.object(reports, '_write_csv', side_effect=requeued_mid_build):
+                assert reports.build_report(superseded.id)
+            db.session.expire_all()
+            report = db.session.get(AdminReport, superseded.id)
+            assert len(set(temp_names)) == 2, temp_names
+            assert report.status == 'done' and report.attempts == 2 and report.row_count == User.query.count()
+            assert reports.report_path(report) and os.path.getsize(reports.report_path(report)) == report.size_bytes
+            assert not [name for name in os.listdir(directory) if name.endswith('.part')]
+            print("✅ A build requeued while still running writes its own temporary file and leaves the report "
+                  "to the attempt that owns it")
+
+
+def wait_for(report_ids):
+    for _ in range(200):
+        db.session.expire_all()
+        if all(db.session.get(AdminReport, i).status in ('done', 'failed') for i in report_ids):
+            return
+        time.sleep(0.05)
+
+
+def test_thread_pool_and_streaming():
+    app = create_test_app()
+    with tempfile.TemporaryDirectory() as directory, \
+            mock.patch.dict(os.environ, {'REPORTS_DIR': directory, 'ANALYSIS_WORKER_MODE': 'thread'}):
+        with app.app_context():
+            db.create_all()
+            seed(users=20000)
+            report = reports.create_report('users', 'csv', 'all', requested_by=None)
+            db.session.commit()
+            threads, write_csv = [], reports._write_csv
+
+            def record_thread(*args):
+                threads.append(threading.current_thread().name)
+                return write_csv(*args)
+
+            with mock.patch.object(reports, '_write_csv', side_effect=record_thread):
+                reports.submit_report(report.id)
+                wait_for([report.id])
+            assert db.session.get(AdminReport, report.id).status == 'done'
+            assert threads and threads[0].startswith('reports'), threads
+            print("✅ Report built on the reports pool in thread mode, apart from the analysis pool")
+
+            queued = reports.create_report('ai-usage', 'csv', 'all', requested_by=None)
+            interrupted = reports.create_report('care-activity', 'csv', 'all', requested_by=None)
+            interrupted.status = 'running'
+            interrupted.started_at = NOW - timedelta(seconds=reports.STALE_REPORT_SECONDS + 60)
+            db.session.commit()
+            assert reports.start_report_pool() == 1
+            wait_for([queued.id])
+            assert [db.session.get(AdminReport, i).status for i in (queued.id, interrupted.id)] == ['done', 'running']
+            print("✅ Starting the reports pool builds queued reports and leaves running ones alone")
+            assert reports.requeue_stale_reports() == 1 and reports.run_pending_reports() == 1
+            assert db.session.get(AdminReport, interrupted.id).status == 'done'
+            print("✅ The stale-work sweep requeues and builds the interrupted report")
+
+            headers, query = reports.report_query('users', 'all')
+            tracemalloc.start()
+            reports._write_csv(os.path.join(directory, 'streamed.csv'), headers, reports._stream_rows(query))
+            streamed_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            tracemalloc.start()
+            loaded = [list(row) for row in db.session.execute(query).all()]
+            loaded_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert len(loaded) == 20000 and streamed_peak < loaded_peak / 3, (streamed_peak, loaded_peak)
+            print(f"✅ Streaming build peaked at {streamed_peak / 1e6:.1f} MB vs {loaded_peak / 1e6:.1f} MB "
+                  "for loading the table")
+
+
+if __name__ == "__main__":
+    test_report_lifecycle()
+    test_thread_pool_and_streaming()
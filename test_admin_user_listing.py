@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test script for the keyset-paginated admin user listings
+Seeds users (with duplicate names and sign-up times) and admins on in-memory
+SQLite, walks every page of each sort through the admin endpoints and checks
+the result against a Python sort, then checks search, filters, cursor
+validation, that only the listed columns are selected and that every user
+has the created_at the listing pages by.
+"""
+
+import os
+import sys
+import random
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask_login import login_user
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from website.models import db, Admin, User
+from website.cursors import encode_cursor
+from testing_support import create_test_app
+
+START = datetime(2025, 3, 1, 8, 0)
+
+
+def seed(users=700, seed=0):
+    rng = random.Random(seed)
+    with db.engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [
+            {'email': f'grower{i}@egrowtify.com', 'firstname': rng.choice(['Ana', 'Ben', 'Carla', 'Dan_']),
+             'lastname': rng.choice(['Cruz', 'Reyes', 'Santos', '100%']), 'contact': '0', 'password_hash': 'x',
+             'role': 'admin' if i % 97 == 0 else 'user', 'is_active': rng.random() < 0.8,
+             'subscribed': rng.random() < 0.3, 'created_at': START + timedelta(hours=rng.randint(0, 40))}
+            for i in range(users)])
+    admin = Admin(username='root', email='root@egrowtify.com', password_hash='x', full_name='Root Admin')
+    db.session.add_all([admin, Admin(username='ops', email='ops@egrowtify.com', password_hash='x',
+                                     full_name='Ops Crew', is_active=False)])
+    db.session.commit()
+    return admin
+
+
+def get(app, admin, view, **args):
+    with app.test_request_context('/?' + urlencode(args)):
+        login_user(admin)
+        response = view()
+    response, status = response if isinstance(response, tuple) else (response, response.status_code)
+    return status, response.get_json()
+
+
+def walk(app, admin, view, key, **args):
+    """Every row of a listing, following next_cursor, and the number of pages"""
+    rows, cursor, pages = [], None, 0
+    while True:
+        status, data = get(app, admin, view, **args, **({'cursor': cursor} if cursor else {}))
+        assert status == 200, data
+        rows += data[key]
+        pages += 1
+        cursor = data['next_cursor']
+        assert data['has_more'] == (cursor is not None)
+        if not cursor:
+            return rows, pages
+
+
+def test_pages_match_python_sort():
+    from website.views import admin_api_users, admin_api_subscription_subscribers, admin_users
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        admin = seed()
+        everyone = User.query.all()
+        sort_keys = {
+            'created_at': lambda u: (u.created_at, u.id),
+            'email': lambda u: (u.email, u.id),
+            'name': lambda u: (u.lastname, u.firstname, u.id),
+            'id': lambda u: (u.id,),
+        }
+        for sort, key in sort_keys.items():
+            for order in ('asc', 'desc'):
+                rows, pages = walk(app, admin, admin_users, 'users', sort=sort, order=order, limit=64)
+                expected = sorted(everyone, key=key, reverse=order == 'desc')
+                assert [r['id'] for r in rows] == [u.id for u in expected], (sort, order)
+                assert pages == 11
+        print("✅ Every sort and order pages through all users exactly once, in Python sort order")
+
+        _, data = get(app, admin, admin_users)
+        assert len(data['users']) == 100 and data['has_more'], "the default page is the screens' page size"
+
+        status, data = get(app, admin, admin_api_users, limit=50)
+        assert [u['role'] for u in data['users'][-2:]] == ['admin', 'admin'] and len(data['users']) == 52
+        assert data['users'][0]['full_name'] == f"{data['users'][0]['firstname']} {data['users'][0]['lastname']}"
+        _, data = get(app, admin, admin_api_users, limit=50, cursor=data['next_cursor'])
+        assert all(u.get('username') is None for u in data['users']), "admins only follow the first page"
+        print("✅ Admin accounts are listed after the first page of users")
+
+        rows, _ = walk(app, admin, admin_api_users, 'users', q='carla 100%', status='active', limit=30)
+        expected = {u.id for u in everyone if u.firstname == 'Carla' and u.lastname == '100%' and u.is_active}
+        assert {r['id'] for r in rows} == expected and expected
+        rows, _ = walk(app, admin, admin_api_users, 'users', q='dan_', role='admin', limit=30)
+        assert {r['id'] for r in rows} == {u.id for u in everyone if u.firstname == 'Dan_' and u.role == 'admin'}
+        _, data = get(app, admin, admin_api_users, q='root')
+        assert [u['email'] for u in data['users']] == ['root@egrowtify.com']
+        rows, _ = walk(app, admin, admin_api_subscription_subscribers, 'subscribers', subscribed='premium',
+                       sort='email', order='asc', limit=40)
+        assert [r['email'] for r in rows] == sorted(u.email for u in everyone if u.subscribed)
+        assert set(rows[0]) == {'id', 'email', 'firstname', 'lastname', 'full_name', 'subscribed', 'is_active',
+                                'created_at'}
+        print("✅ Search (with LIKE wildcards taken literally), role, status and subscription filters")
+
+
+def test_validation_and_projection():
+    from website.views import admin_api_users, admin_api_subscription_subscribers
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        admin = seed(users=30)
+
+        _, data = get(app, admin, admin_api_users, sort='email', limit=10)
+        assert get(app, admin, admin_api_users, sort='name', cursor=data['next_cursor'])[0] == 400
+        assert get(app, admin, admin_api_users, cursor='not-a-cursor')[0] == 400
+        log_cursor = encode_cursor([START, 1])
+        assert get(app, admin, admin_api_users, cursor=log_cursor)[1]['error'] == f"Invalid cursor: {log_cursor!r}"
+        assert get(app, admin, admin_api_users, sort='password_hash')[0] == 400
+        assert get(app, admin, admin_api_users, status='maybe')[0] == 400
+        assert get(app, admin, admin_api_users, limit='ten')[0] == 400
+        print("✅ Foreign cursors, unknown sorts and bad filters are rejected with 400")
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with app.test_request_context('/?limit=10'):
+            login_user(admin)
+            event.listen(db.engine, 'before_cursor_execute', count)
+            admin_api_subscription_subscribers()
+            event.remove(db.engine, 'before_cursor_execute', count)
+        listing = [s for s in statements if 'FROM users' in s]
+        assert len(listing) == 1 and 'password_hash' not in listing[0] and 'contact' not in listing[0]
+        assert 'LIMIT' in listing[0]
+        print("✅ One projected, LIMITed statement per page")
+
+
+def test_users_always_have_a_signup_time():
+    from website.views import admin_users
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        admin = seed(users=30)
+        db.session.add(User(email='late@egrowtify.com', firstname='Late', lastname='Comer', contact='0',
+                            password_hash='x'))
+        db.session.commit()
+        rows, _ = walk(app, admin, admin_users, 'users', sort='created_at', order='asc', limit=7)
+        assert len(rows) == 31 and rows[-1]['email'] == 'late@egrowtify.com'
+
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(User.__table__.insert(), {
+                    'email': 'nodate@egrowtify.com', 'firstname': 'No', 'lastname': 'Date', 'contact': '0',
+                    'password_hash': 'x', 'created_at': None})
+            assert False, "a user without created_at would never be listed by the created_at keyset"
+        except IntegrityError:
+            pass
+        print("✅ New users are stamped and users.created_at rejects NULL, so no one falls out of the listing")
+
+
+if __name__ == "__main__":
+    test_pages_match_python_sort()
+    test_validation_and_projection()
+    test_users_always_have_a_signup_time()
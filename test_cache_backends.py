@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared cache backends
+Checks LRU/TTL/byte-budget eviction of the local cache and runs the Redis
+backend against an in-process fake so no server is needed.
+"""
+
+import os
+import sys
+import time
+import fnmatch
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website.cache import LocalCache, RedisCache
+
+
+class FakeRedis:
+    """Minimal stand-in for redis.Redis covering the calls RedisCache makes"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        value, expires_at = self.store.get(key, (None, None))
+        if value is None or expires_at <= time.time():
+            self.store.pop(key, None)
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.store[key] = (value.encode('utf-8'), time.time() + (ex or 3600))
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def scan_iter(self, match='*'):
+        return [key for key in list(self.store) if fnmatch.fnmatch(key, match)]
+
+
+class BrokenRedis(FakeRedis):
+    def get(self, key):
+        raise ConnectionError("connection refused")
+
+
+def test_local_lru_eviction():
+    cache = LocalCache('test_lru', ttl=60, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'a' is now most recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None, "least recently used entry should be evicted"
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+    print("✅ Local cache evicts least recently used entries")
+
+
+def test_local_ttl_and_bytes():
+    cache = LocalCache('test_ttl', ttl=60, max_bytes=100)
+    cache.set('short', {'temp': 30}, ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get('short') is None, "expired entry should be a miss"
+    cache.set('big1', 'x' * 60)
+    cache.set('big2', 'y' * 60)
+    stats = cache.stats()
+    assert stats['entries'] == 1 and stats['bytes'] <= 100, stats
+    cache.set('huge', 'z' * 500)
+    assert cache.get('huge') is None, "values larger than the budget are not stored"
+    print(f"✅ Local cache expires entries and stays within its byte budget ({stats['bytes']} bytes)")
+
+
+def test_redis_shared_between_workers():
+    server = FakeRedis()
+    worker_a = RedisCache('weather', ttl=60, client=server)
+    worker_b = RedisCache('weather', ttl=60, client=server)
+    worker_a.set('current:10.31:123.89', {'main': {'temp': 31}})
+    assert worker_b.get('current:10.31:123.89') == {'main': {'temp': 31}}
+    assert worker_b.stats()['hits'] == 1
+
+    other_namespace = RedisCache('auth_status', ttl=5, client=server)
+    other_namespace.set('auth_status_1', {'authenticated': True})
+    worker_a.clear()
+    assert worker_b.get('current:10.31:123.89') is None
+    assert other_namespace.get('auth_status_1') == {'authenticated': True}, "clear() must stay within its namespace"
+    print("✅ Redis backend shares entries across workers and clears per namespace")
+
+
+def test_redis_errors_are_misses():
+    cache = RedisCache('weather', ttl=60, client=BrokenRedis())
+    assert cache.get('anything') is None
+    assert cache.stats()['errors'] == 1
+    print("✅ Redis outages degrade to cache misses")
+
+
+if __name__ == "__main__":
+    test_local_lru_eviction()
+    test_local_ttl_and_bytes()
+    test_redis_shared_between_workers()
+    test_redis_errors_are_misses()
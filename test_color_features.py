@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared color feature extractor
+Checks extract_features() against the straightforward NumPy formulas the
+recognition and soil fallbacks used before, on random and hand-built images.
+"""
+
+import os
+import sys
+import threading
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from PIL import Image
+
+from website.color_features import extract_features, FEATURE_NAMES, HUE_BINS
+
+
+def reference_features(img):
+    """The per-statistic float32 code the heuristics used to run"""
+    arr = np.asarray(img, dtype=np.float32)
+    red, green, blue = arr[:, :, 0], arr[:, :, 1], arr[:, :, 2]
+    total = np.maximum(red + green + blue, 1.0)
+    gray = np.mean(arr, axis=2)
+    edges = np.abs(np.gradient(gray)[0]) + np.abs(np.gradient(gray)[1])
+    hsv = np.asarray(img.convert('HSV'), dtype=np.uint8)
+    h = hsv[:, :, 0].astype(np.float32) * (360.0 / 255.0)
+    s = hsv[:, :, 1].astype(np.float32) / 255.0
+    v = hsv[:, :, 2].astype(np.float32) / 255.0
+    return {
+        'mean_red': float(np.mean(red)),
+        'mean_green': float(np.mean(green)),
+        'mean_blue': float(np.mean(blue)),
+        'green_ratio': float(np.mean(green / total)),
+        'red_ratio': float(np.mean(red / total)),
+        'purple_ratio': float(np.mean((red > 100) & (green < 100) & (blue > 100))),
+        'edge_density': float(np.mean(edges > 30)),
+        'orange_ratio': float(np.mean((h >= 20) & (h <= 45) & (s >= 0.45) & (v >= 0.25))),
+    }
+
+
+def features_of(img):
+    return extract_features(np.asarray(img), np.asarray(img.convert('HSV')))
+
+
+def random_image(seed, size=(224, 224)):
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, size=(size[1], size[0], 3), dtype=np.uint8))
+
+
+def test_matches_reference():
+    for seed in range(5):
+        img = random_image(seed)
+        features = features_of(img)
+        for name, expected in reference_features(img).items():
+            assert abs(features[name] - expected) < 1e-3, f"{name}: {features[name]} != {expected} (seed {seed})"
+    print(f"✅ Extractor matches the reference formulas ({len(FEATURE_NAMES)} features)")
+
+
+def test_known_colors():
+    orange = Image.new('RGB', (64, 64), (240, 140, 20))
+    purple = Image.new('RGB', (64, 64), (150, 40, 160))
+    leaf = Image.new('RGB', (64, 64), (40, 160, 40))
+    assert features_of(orange)['orange_ratio'] == 1.0
+    assert features_of(purple)['purple_ratio'] == 1.0
+    assert features_of(leaf)['green_ratio'] > 0.6
+    assert features_of(leaf)['edge_density'] == 0.0, "a flat image has no edges"
+
+    halves = np.zeros((64, 64, 3), dtype=np.uint8)
+    halves[:, 32:] = 255
+    assert features_of(Image.fromarray(halves))['edge_density'] == 2 / 64, "the two columns at the boundary are edges"
+    print("✅ Solid colors and a hard boundary give the expected masks and edge density")
+
+
+def test_histograms_are_normalized():
+    features = features_of(random_image(7, size=(100, 60)))
+    for channel in ('hue', 'sat', 'val'):
+        assert abs(float(features.histogram(channel).sum()) - 1.0) < 1e-5, channel
+    assert len(features.histogram('hue')) == HUE_BINS
+    assert set(features.to_dict()) == set(FEATURE_NAMES)
+    print("✅ HSV histograms sum to 1 for non-square images")
+
+
+def test_thread_safe_buffers():
+    images = [random_image(seed) for seed in range(8)]
+    expected = [features_of(img).vector.copy() for img in images]
+    mismatches = []
+
+    def worker():
+        for _ in range(20):
+            for img, vector in zip(images, expected):
+                if not np.array_equal(features_of(img).vector, vector):
+                    mismatches.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not mismatches, f"{len(mismatches)} results differed under concurrency"
+    print("✅ Scratch buffers are not shared between threads")
+
+
+if __name__ == "__main__":
+    test_matches_reference()
+    test_known_colors()
+    test_histograms_are_normalized()
+    test_thread_safe_buffers()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the daily forecast summary
+Checks the per-day figures against a plain Python aggregation and that the
+summary is computed once per forecast fetch and served from the cache after.
+"""
+
+import os
+import sys
+import random
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website import weather
+from website.daily_forecast import summarize_forecast
+
+
+def make_forecast(steps=40, seed=0):
+    rng = random.Random(seed)
+    items = []
+    for k in range(steps):
+        hour = 9 + 3 * k
+        item = {
+            'dt_txt': f"2025-06-{1 + hour // 24:02d} {hour % 24:02d}:00:00",
+            'main': {'temp': round(rng.uniform(22, 36), 2), 'humidity': rng.randint(40, 95)},
+            'wind': {'speed': round(rng.uniform(0, 12), 2)},
+            'weather': [{'description': rng.choice(['light rain', 'clear sky', 'few clouds'])}],
+        }
+        if rng.random() < 0.4:
+            item['rain'] = {'3h': round(rng.uniform(0, 4), 2)}
+        items.append(item)
+    return {'list': items}
+
+
+def test_matches_python_aggregation():
+    forecast = make_forecast()
+    days = summarize_forecast(forecast)['days']
+    assert [d['samples'] for d in days] == [5, 8, 8, 8, 8, 3], "first and last days are partial"
+    for day in days:
+        steps = [i for i in forecast['list'] if i['dt_txt'].startswith(day['date'])]
+        temps = [i['main']['temp'] for i in steps]
+        assert day['temp_min'] == min(temps) and day['temp_max'] == max(temps)
+        assert day['temp_mean'] == sum(temps) / len(temps)
+        assert day['humidity_mean'] == sum(i['main']['humidity'] for i in steps) / len(steps)
+        assert day['rain_total'] == sum(i.get('rain', {}).get('3h', 0) for i in steps)
+        assert day['conditions'] == list(dict.fromkeys(i['weather'][0]['description'] for i in steps))
+    assert summarize_forecast({'list': []}) == {'days': []}
+    print(f"✅ {len(days)} daily summaries match a plain Python aggregation")
+
+
+def test_summary_cached_per_fetch():
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return make_forecast(seed=1)
+
+    fetches = []
+    summaries = []
+
+    def get(url, params=None, **kwargs):
+        fetches.append(url)
+        return Response()
+
+    def counting_summarize(forecast):
+        summaries.append(1)
+        return summarize_forecast(forecast)
+
+    weather.clear_cache()
+    with mock.patch.object(weather.http_client, 'get', get), \
+            mock.patch.object(weather, 'summarize_forecast', counting_summarize):
+        first = weather.get_daily_forecast(10.31, 123.89, 'key')
+        for _ in range(5):
+            assert weather.get_daily_forecast(10.31, 123.89, 'key') == first
+        assert len(fetches) == 1 and len(summaries) == 1, (fetches, summaries)
+
+        # The summary was evicted but the forecast is still cached: rebuild it from the cached forecast
+        weather._cache.delete(weather._location_key('daily', 10.31, 123.89))
+        assert weather.get_daily_forecast(10.31, 123.89, 'key') == first
+        assert len(fetches) == 1 and len(summaries) == 2
+    weather.clear_cache()
+    print("✅ Daily summary is computed once per forecast fetch and served from the cache")
+
+
+if __name__ == "__main__":
+    test_matches_python_aggregation()
+    test_summary_cached_per_fetch()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the rule-based enrichment engine
+Covers care hints from wiki text, first-match crop rules, soil classes and
+curated plant lists, AI response phrase groups and loading an extended rule
+file.
+"""
+
+import os
+import sys
+import json
+import random
+import tempfile
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website import enrichment
+from website.enrichment import (
+    infer_care, crop_enrichment, classify_soil, recommended_plants, find_phrases, has_phrase,
+    load_rules, KeywordTable, DEFAULT_RULES_FILE
+)
+
+
+def test_infer_care():
+    care = infer_care("Grows best in FULL SUN and well-drained, fertile soil. Tolerates drought.")
+    assert care == {
+        'sunlight': 'Full sun',
+        'watering': 'Low; drought-tolerant once established',
+        'soil': 'Well-draining soil',
+    }, care
+    assert infer_care("Prefers partial shade; keep moist.")['sunlight'] == 'Partial shade'
+    assert infer_care('') == {} and infer_care(None) == {}
+    print("✅ Care hints are read from wiki descriptions, first pattern wins")
+
+
+def test_crop_enrichment():
+    tomato = crop_enrichment('Solanum lycopersicum', 'Tomato', '')
+    assert tomato and tomato['growth_stage']
+    assert crop_enrichment('', 'Bell pepper', '') == crop_enrichment('Capsicum annuum', None, '')
+    assert crop_enrichment('Unknownus plantus', 'Mystery', 'A rose relative') == crop_enrichment('Rosa', '', '')
+    assert crop_enrichment('Ixora coccinea', 'Ixora', 'A tropical shrub') is None
+    tomato['common_issues'].append('changed')
+    assert 'changed' not in crop_enrichment('tomato', '', '')['common_issues'], "callers must get a copy"
+    assert crop_enrichment('Lime', None, 'pairs well with carrots') == crop_enrichment('Carrot', None, ''), \
+        "the earliest matching rule wins, wherever its keyword is"
+    assert crop_enrichment('', 'Primrose', '') == crop_enrichment('Rosa', '', '')
+    print("✅ Crop rules match names and descriptions and hand out copies")
+
+
+def test_soil_classes_and_plants():
+    assert classify_soil('Clay-rich') == 'Clay Soil'
+    assert classify_soil('Silty loam') == 'Loam Soil', "earlier soil classes take priority"
+    assert classify_soil('SANDY') == 'Sandy Soil'
+    assert classify_soil(None) == 'Mixed Soil'
+    assert recommended_plants('Clay Soil', 'beginner')['vegetables']
+    assert recommended_plants('Clay Soil', None) is None
+    assert recommended_plants('Peat Soil', 'beginner') is None
+    print("✅ Soil classes and curated plant lists")
+
+
+def test_response_phrases():
+    response = "The fruit shows Brown spots and soft spots but no mold."
+    assert find_phrases('health_issues', response) == ['brown spots', 'soft spots']
+    assert has_phrase('no_problems', response)
+    assert not has_phrase('urgent', response)
+    assert has_phrase('negative_context', 'no signs of dehydration') and has_phrase('damage', 'no signs of dehydration')
+    assert has_phrase('negative_context', 'xno signs ofy') and not has_phrase('negative_context', 'no  signs of')
+    print("✅ AI response phrase groups")
+
+
+def test_keyword_table_matches_substring_scan():
+    with open(DEFAULT_RULES_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+    groups = [tuple(k.lower() for k in rule['keywords']) for rule in data['crop_rules']]
+    groups += [(phrase,) for phrases in data['response_phrases'].values() for phrase in phrases]
+    groups += [(' ',), ('no  rot',)]
+    pieces = [word for keywords in groups for keyword in keywords for word in keyword.split()]
+    rng = random.Random(7)
+    for min_keywords, cache_size in ((10 ** 6, 0), (0, 20000), (0, 0)):
+        with mock.patch.object(enrichment, 'INDEX_MIN_KEYWORDS', min_keywords), \
+                mock.patch.object(enrichment, 'WORD_CACHE_SIZE', cache_size):
+            table = KeywordTable(groups)
+        for _ in range(2000):
+            text = rng.choice(['', ' ', '  ']).join(
+                rng.choice(pieces)[rng.randint(0, 2):] + rng.choice(['', 'x']) for _ in range(rng.randint(0, 12)))
+            expected = {i for i, keywords in enumerate(groups) if any(k in text for k in keywords)}
+            assert table.matches(text) == expected, text
+            assert table.first(text) == (min(expected) if expected else None)
+            assert table.search(text) == bool(expected)
+    print("✅ Scanned and word-indexed keyword tables find exactly the groups a substring scan finds")
+
+
+def test_extended_rule_file():
+    with open(DEFAULT_RULES_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+    data['crop_rules'].insert(0, {'keywords': ['Moringa'], 'enrichment': {'growth_stage': 'Leafing'}})
+    data['soil_classes'].append({'keywords': ['peat'], 'soil_type': 'Peat Soil'})
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(data, f)
+    try:
+        rules = load_rules(f.name)
+        assert rules.crop_enrichment('moringa oleifera') == {'growth_stage': 'Leafing'}
+        assert rules.soil_type('dark peat') == 'Peat Soil'
+    finally:
+        os.remove(f.name)
+    print("✅ New rules can be added through the data file")
+
+
+if __name__ == "__main__":
+    test_infer_care()
+    test_crop_enrichment()
+    test_soil_classes_and_plants()
+    test_response_phrases()
+    test_keyword_table_matches_substring_scan()
+    test_extended_rule_file()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Regression test for the /garden listing query count
+Seeds an in-memory SQLite database and checks that listing a user's gardens
+issues the same number of queries no matter how many plants are tracked.
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask_login import login_user
+from sqlalchemy import event
+from website.models import db, User, Plant, Garden, GridSpace, PlantTracking
+from testing_support import create_test_app
+
+MAX_GARDEN_QUERIES = 4  # current user, gardens, trackings joined with plant/garden, latest images
+
+
+def seed_plants(user, plant_count):
+    """Add plant_count tracked plants (each with two grid space images) to a new garden"""
+    garden = Garden(user_id=user.id, name=f'Garden {plant_count}', garden_type='outdoor')
+    db.session.add(garden)
+    db.session.flush()
+    for i in range(plant_count):
+        plant = Plant(name=f'Plant {i}', type='vegetable', environment='outdoor', care_guide='-')
+        db.session.add(plant)
+        db.session.flush()
+        db.session.add(PlantTracking(garden_id=garden.id, plant_id=plant.id, planting_date=date.today()))
+        for age in (2, 1):
+            db.session.add(GridSpace(
+                garden_id=garden.id,
+                grid_position=f"{i},{age}",
+                plant_id=plant.id,
+                image_path=f"uploads/plants/space_{i}_{age}.jpeg",
+                last_updated=datetime.now(timezone.utc) - timedelta(days=age)
+            ))
+    db.session.commit()
+
+
+def count_garden_queries(app, user):
+    """Call the /garden view and return (query count, response json)"""
+    from website.views import garden
+
+    query_count = [0]
+
+    def count_query(*args):
+        query_count[0] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', count_query)
+    try:
+        with app.test_request_context('/garden'):
+            login_user(user)
+            db.session.expire_all()
+            query_count[0] = 0
+            response = garden()
+            return query_count[0], response.get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count_query)
+
+
+def test_garden_query_count():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user = User(email='garden@egrowtify.com', firstname='Garden', lastname='Tester',
+                    contact='0', password_hash='x', is_active=True)
+        db.session.add(user)
+        db.session.commit()
+
+        counts = []
+        for plant_count in (1, 10, 50):
+            seed_plants(user, plant_count)
+            queries, data = count_garden_queries(app, user)
+            counts.append(queries)
+            print(f"🌱 {len(data['plants'])} tracked plants -> {queries} queries")
+
+            # Every plant should report its most recently updated grid space image
+            for entry in data['plants']:
+                index = entry['plant']['name'].split()[-1]
+                assert entry['plant']['latest_image'] == f"uploads/plants/space_{index}_1.jpeg"
+
+        assert len(set(counts)) == 1, f"Query count grows with plant count: {counts}"
+        assert counts[0] <= MAX_GARDEN_QUERIES, f"Expected at most {MAX_GARDEN_QUERIES} queries, got {counts[0]}"
+        print("✅ /garden query count is constant")
+
+
+if __name__ == "__main__":
+    test_garden_query_count()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for the batch garden weather tolerance endpoint
+Seeds gardens in different cities on in-memory SQLite and checks that weather
+is fetched once per distinct city, every planted space is evaluated in one
+response, and the results agree with the single-plant tolerance checks.
+"""
+
+import os
+import sys
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask_login import login_user
+from website.models import db, User, Plant, Garden, GridSpace
+from website.weather_tolerance import assess
+from testing_support import create_test_app
+
+WEATHER = {
+    'cebu': {'main': {'temp': 33.5, 'humidity': 88}, 'wind': {'speed': 4.1}, 'weather': [{'description': 'light rain'}]},
+    'baguio': {'main': {'temp': 12, 'humidity': 65}, 'wind': {'speed': 22}, 'weather': [{'description': 'clear sky'}]},
+}
+
+
+def seed(user):
+    plants = {name: Plant(name=name, type='vegetable', environment='outdoor', care_guide='-')
+              for name in ('Cherry Tomato', 'Bell Pepper', 'Okra', 'Lettuce')}
+    db.session.add_all(plants.values())
+    gardens = [
+        Garden(user_id=user.id, name='Home', garden_type='outdoor', location_city='Cebu'),
+        Garden(user_id=user.id, name='Rooftop', garden_type='outdoor', location_city='cebu '),
+        Garden(user_id=user.id, name='Farm', garden_type='outdoor', location_city='Baguio'),
+        Garden(user_id=user.id, name='Unknown city', garden_type='outdoor', location_city='Atlantis'),
+    ]
+    db.session.add_all(gardens)
+    db.session.flush()
+    layout = [(0, 'Cherry Tomato'), (0, 'Okra'), (1, 'Bell Pepper'), (2, 'Lettuce'), (2, 'Cherry Tomato'), (3, 'Lettuce')]
+    for i, (garden_index, name) in enumerate(layout):
+        db.session.add(GridSpace(garden_id=gardens[garden_index].id, grid_position=f"{i},1", plant_id=plants[name].id))
+    db.session.add(GridSpace(garden_id=gardens[0].id, grid_position="9,9", plant_id=plants['Lettuce'].id, is_active=False))
+    db.session.commit()
+    return gardens
+
+
+def fake_city_weather(calls, unreachable=()):
+    def get_city_weather(city, api_key):
+        calls.append(city)
+        if city.strip().lower() in unreachable:
+            raise ConnectionError(f"timed out fetching {city}")
+        weather = WEATHER.get(city.strip().lower())
+        return (200, weather) if weather else (404, None)
+    return get_city_weather
+
+
+def call(app, user, query='', unreachable=()):
+    from website.views import get_garden_weather_tolerance
+    calls = []
+    with mock.patch('website.views.get_city_weather', fake_city_weather(calls, unreachable)), \
+            mock.patch.dict(os.environ, {'OPENWEATHER_API_KEY': 'test'}):
+        with app.test_request_context(f'/api/garden-weather-tolerance{query}'):
+            login_user(user)
+            response = get_garden_weather_tolerance()
+    response, status = response if isinstance(response, tuple) else (response, 200)
+    return status, response.get_json(), calls
+
+
+def test_batch_endpoint():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user = User(email='weather@egrowtify.com', firstname='Weather', lastname='Tester',
+                    contact='0', password_hash='x', is_active=True)
+        other = User(email='other@egrowtify.com', firstname='Other', lastname='Tester',
+                     contact='0', password_hash='x', is_active=True)
+        db.session.add_all([user, other])
+        db.session.commit()
+        gardens = seed(user)
+
+        status, data, calls = call(app, user)
+        assert status == 200 and data['success']
+        assert sorted(c.strip().lower() for c in calls) == ['atlantis', 'baguio', 'cebu'], calls
+        print(f"✅ {sum(len(g['plants']) for g in data['gardens'])} planted spaces, weather fetched for {len(calls)} cities")
+
+        home, rooftop, farm, unknown = data['gardens']
+        assert [p['plant_name'] for p in home['plants']] == ['Cherry Tomato', 'Okra'], "inactive spaces are skipped"
+        tomato, okra = home['plants']
+        expected = assess(['tomatoes'], 33.5, 88, 4.1, 'light rain')[0]
+        assert {k: tomato[k] for k in expected} == expected
+        assert tomato['status'] == 'Critical' and tomato['tolerance_profile'] == 'Tomatoes'
+        assert okra['status'] == 'Unknown' and okra['tolerance_profile'] is None
+        assert rooftop['plants'][0]['tolerance_profile'] == 'Peppers'
+        assert farm['current_weather']['temperature'] == 12
+        assert [p['warnings'] for p in farm['plants']][1] == assess(['tomatoes'], 12, 65, 22, 'clear sky')[0]['warnings']
+        assert unknown['error'] == 'City not found' and unknown['plants'][0]['status'] == 'Unknown'
+        print("✅ Batch results match the single-plant checks; unknown plants and cities are reported")
+
+        status, data, calls = call(app, user, f'?garden_id={gardens[2].id}')
+        assert status == 200 and [g['garden_name'] for g in data['gardens']] == ['Farm']
+        assert calls == ['Baguio']
+        status, _, _ = call(app, other, f'?garden_id={gardens[0].id}')
+        assert status == 404, "other users' gardens must not be readable"
+        print("✅ Single-garden filter and ownership check")
+
+        status, data, _ = call(app, user, unreachable=('baguio',))
+        home, _, farm, _ = data['gardens']
+        assert status == 200 and farm['error'] == 'Weather service unavailable: timed out fetching Baguio'
+        assert farm['current_weather'] is None and {p['status'] for p in farm['plants']} == {'Unknown'}
+        assert home['plants'][0]['status'] == 'Critical', "other cities are still assessed"
+        print("✅ A failing city is reported as its gardens' error instead of failing the batch")
+
+
+if __name__ == "__main__":
+    test_batch_endpoint()
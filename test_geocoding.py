@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test script for the geocoding cache table load
+Runs lookups on in-memory SQLite without the geocode_locations table and
+checks that the failed load leaves the request's session usable, is not
+retried on every lookup, and picks the table up once the retry window has
+passed.
+"""
+
+import os
+import sys
+import time
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website import geocoding
+from website.models import db, User, GeocodeLocation
+from testing_support import create_test_app
+
+CEBU = [{'name': 'Cebu City', 'country': 'PH', 'lat': 10.3, 'lon': 123.9}]
+
+
+def test_failed_table_load():
+    app = create_test_app()
+    upstream = mock.Mock(return_value=mock.Mock(status_code=200, json=lambda: CEBU))
+    with app.app_context(), \
+            mock.patch.object(geocoding, '_coordinates', {}), mock.patch.object(geocoding, '_misses', {}), \
+            mock.patch.object(geocoding, '_table_loaded', False), \
+            mock.patch.object(geocoding, '_table_failed_at', None), \
+            mock.patch('website.geocoding.http_client.get', upstream):
+        db.create_all()
+        GeocodeLocation.__table__.drop(db.engine)
+
+        db.session.add(User(email='grower@egrowtify.com', firstname='Grow', lastname='Er', contact='0',
+                            password_hash='x', is_active=True))
+        assert geocoding.lookup_coordinates('Cebu City', 'key') == (10.3, 123.9)
+        db.session.commit()
+        assert User.query.count() == 1
+        print("✅ A missing geocode table leaves the request's transaction usable")
+
+        failed_at = geocoding._table_failed_at
+        assert failed_at and not geocoding._table_loaded
+        GeocodeLocation.__table__.create(db.engine)
+        db.session.add(GeocodeLocation(city_key='manila', lat=14.6, lon=121.0))
+        db.session.commit()
+        with mock.patch.object(db.engine, 'connect') as connect:
+            geocoding._load_table()
+            assert not connect.called and geocoding._table_failed_at == failed_at
+        print("✅ The failed load is not retried on every lookup")
+
+        geocoding._table_failed_at = time.time() - geocoding._LOAD_RETRY_SECONDS - 1
+        upstream.reset_mock()
+        assert geocoding.lookup_coordinates('Manila', 'key') == (14.6, 121.0)
+        assert geocoding._table_loaded and not upstream.called
+        print("✅ The table is loaded once the retry window has passed")
+
+
+if __name__ == "__main__":
+    test_failed_table_load()
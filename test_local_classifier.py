@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the local plant classifier tier
+Trains on separable feature clusters, checks save/load, and that identify()
+only answers confident, familiar photos and stays off without a model file.
+"""
+
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from PIL import Image
+
+from website import local_classifier
+from website.color_features import FEATURE_NAMES
+from website.imaging import PreparedImage
+from website.local_classifier import LocalPlantClassifier
+
+
+def clustered_vectors(seed=0, per_class=40):
+    rng = np.random.default_rng(seed)
+    centers = {'Tomato': 0.0, 'Carrot': 3.0, 'Lettuce': -3.0}
+    vectors, labels = [], []
+    for label, center in centers.items():
+        vectors.append(rng.normal(center, 0.5, size=(per_class, len(FEATURE_NAMES))))
+        labels += [label] * per_class
+    return np.vstack(vectors).astype(np.float32), labels
+
+
+def test_train_save_load():
+    vectors, labels = clustered_vectors()
+    model = LocalPlantClassifier.train(vectors, labels)
+    assert local_classifier.evaluate(model, vectors, labels)['accuracy'] == 1.0
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'models', 'model.npz')
+        model.save(path)
+        loaded = LocalPlantClassifier.load(path)
+    assert loaded.labels == model.labels and loaded.samples == len(labels)
+    assert np.allclose(loaded.predict_proba(vectors), model.predict_proba(vectors))
+    print("✅ Trained model classifies its clusters and survives save/load")
+
+
+def test_unfamiliar_vectors_escalate():
+    vectors, labels = clustered_vectors()
+    model = LocalPlantClassifier.train(vectors, labels)
+    label, probability, familiar = model.predict(vectors[0])
+    assert label == 'Tomato' and familiar
+    _, probability, familiar = model.predict(np.full(len(FEATURE_NAMES), 40.0))
+    assert not familiar, "a vector far outside every cluster must not be answered locally"
+    print(f"✅ Far-away photos are flagged unfamiliar even at probability {probability:.2f}")
+
+
+def test_identify_uses_model_file():
+    vectors, labels = clustered_vectors()
+    prepared = PreparedImage(Image.new('RGB', (64, 64), (60, 140, 50)))
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'model.npz')
+        with mock.patch.dict(os.environ, {'LOCAL_CLASSIFIER_PATH': path}):
+            assert local_classifier.identify(prepared) is None, "no model file means no local answers"
+
+            # Train around this photo's own features so it is confidently familiar
+            own = prepared.features.vector
+            LocalPlantClassifier.train(np.vstack([vectors, own + np.random.default_rng(1).normal(0, 0.01, (40, len(own)))]),
+                                       labels + ['Basil'] * 40).save(path)
+            result = local_classifier.identify(prepared)
+            assert result and result['suggestions'][0]['plant_name'] == 'Basil', result
+
+            with mock.patch.dict(os.environ, {'LOCAL_CLASSIFIER_ENABLED': 'false'}):
+                assert local_classifier.identify(prepared) is None
+    print("✅ identify() answers from the model file and can be switched off")
+
+
+if __name__ == "__main__":
+    test_train_save_load()
+    test_unfamiliar_vectors_escalate()
+    test_identify_uses_model_file()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the paginated admin log APIs
+Seeds audit_logs on in-memory SQLite and checks that cursor pages cover a
+range exactly once (including entries sharing a timestamp), that the user,
+action, status and time filters run server-side, that total counts every
+match rather than the page, that history changes are found by the user who
+made them, and that format=ndjson streams the same entries.
+"""
+
+import os
+import sys
+import json
+from urllib.parse import quote
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask_login import login_user
+from website import log_store
+from website.models import db, Admin, AuditLog
+from testing_support import create_test_app
+
+
+def seed(count=2500):
+    """count activity entries; every 10 share one timestamp, so pages split ties"""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = []
+    for i in range(count):
+        entry = {'user_id': i % 5, 'action': 'user_login' if i % 3 else 'password_reset',
+                 'description': f'entry {i}', 'status': 'failed' if i % 7 == 0 else 'success'}
+        rows.append({'kind': 'activity', 'user_id': entry['user_id'], 'action': entry['action'],
+                     'status': entry['status'], 'created_at': now - timedelta(minutes=i // 10),
+                     'payload': json.dumps(entry)})
+    with db.engine.begin() as connection:
+        connection.execute(AuditLog.__table__.insert(), rows)
+    return rows
+
+
+def call(app, admin, query):
+    from website.views import admin_api_activity_logs
+    with app.test_request_context(f'/api/admin/activity-logs{query}'):
+        login_user(admin)
+        response = admin_api_activity_logs()
+        response, status = response if isinstance(response, tuple) else (response, 200)
+        if response.mimetype == 'application/x-ndjson':
+            return status, [json.loads(line) for line in response.response]
+        return status, response.get_json()
+
+
+def test_cursor_pages():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        rows = seed()
+
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            logs, cursor = log_store.page_logs('activity', cursor=cursor, limit=333)
+            seen.extend(logs)
+            pages += 1
+            if cursor is None:
+                break
+        ids = [log['id'] for log in seen]
+        assert len(ids) == len(rows) == len(set(ids)), "every entry exactly once"
+        stamps = [(log['timestamp'], log['id']) for log in seen]
+        assert stamps == sorted(stamps, reverse=True), "newest first across pages"
+        assert [log['id'] for log in log_store.iter_logs('activity', batch=333)] == ids
+        print(f"✅ {len(ids)} entries over {pages} cursor pages, no gaps or repeats across tied timestamps")
+
+        try:
+            log_store.page_logs('activity', cursor='not-a-cursor')
+            raise AssertionError("a bad cursor must be rejected")
+        except log_store.InvalidCursor:
+            pass
+
+
+def test_endpoint_filters_and_export():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        rows = seed()
+        admin = Admin(username='admin', email='admin@egrowtify.com', password_hash='x', full_name='Admin')
+        db.session.add(admin)
+        db.session.commit()
+
+        status, data = call(app, admin, '?date_range=90d&user_id=2&action=password_reset&status=failed&limit=20')
+        expected = [r for r in rows if r['user_id'] == 2 and r['action'] == 'password_reset' and r['status'] == 'failed']
+        assert status == 200 and data['has_more'] and len(data['logs']) == 20 and data['total'] == len(expected)
+        assert all(log['user_id'] == 2 and log['action'] == 'password_reset' and log['status'] == 'failed'
+                   for log in data['logs'])
+        status, rest = call(app, admin, f"?date_range=90d&user_id=2&action=password_reset&status=failed"
+                                        f"&limit=5000&cursor={data['next_cursor']}")
+        assert len(data['logs']) + len(rest['logs']) == len(expected) and rest['next_cursor'] is None
+        print(f"✅ user/action/status filters applied in the database ({len(expected)} matches over two pages)")
+
+        status, data = call(app, admin, '?date_range=1d')
+        assert len(data['logs']) == 100 and data['total'] == len(rows) and data['has_more']
+        status, exported = call(app, admin, '?date_range=1d&format=ndjson')
+        assert len(exported) == len(rows), "seeded entries all fall within the last day"
+        assert [log['id'] for log in exported[:100]] == [log['id'] for log in data['logs']]
+        print(f"✅ NDJSON export streams all {len(exported)} entries in the range")
+
+        since = (datetime.now(timezone.utc) - timedelta(minutes=5)).isoformat()
+        status, data = call(app, admin, f'?since={quote(since)}')
+        assert status == 200 and 0 < data['total'] <= 60
+        status, _ = call(app, admin, '?since=yesterday')
+        assert status == 400
+        status, _ = call(app, admin, '?cursor=bogus')
+        assert status == 400
+        status, data = call(app, admin, '?user_id=99')
+        assert status == 200 and data['logs'] == [], "filtered empty pages are not padded with sample data"
+        print("✅ since/until bounds, bad input rejected with 400")
+
+
+def test_history_user_filter():
+    from website.views import admin_api_history_logs
+    app = create_test_app()
+    with app.app_context(), mock.patch.dict(os.environ, {'LOG_STORE_MODE': 'sync'}):
+        db.create_all()
+        admin = Admin(username='admin', email='admin@egrowtify.com', password_hash='x', full_name='Admin')
+        db.session.add(admin)
+        db.session.commit()
+        log_store.log_history_change('garden', 1, 'UPDATE', {'grid_size': '6x6'}, {'grid_size': '3x3'},
+                                     changed_by='user_7', user_id=7)
+        log_store.log_history_change('garden', 2, 'UPDATE', {'grid_size': '6x6'}, {'grid_size': '3x3'},
+                                     changed_by=f'admin_{admin.id}')
+        with app.test_request_context('/api/admin/history-logs?user_id=7'):
+            login_user(admin)
+            data = admin_api_history_logs().get_json()
+        assert [log['record_id'] for log in data['logs']] == [1] and data['total'] == 1
+        print("✅ History changes are found by the user who made them")
+
+
+if __name__ == "__main__":
+    test_cursor_pages()
+    test_endpoint_filters_and_export()
+    test_history_user_filter()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the durable admin log store
+Checks that log calls only buffer, that a flush writes the buffer in one
+batched INSERT, that entries survive in the audit_logs table for time-range
+queries and grouped counts, and that a failed flush keeps entries for retry.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+from website import log_store
+from website.models import db, AuditLog
+from website.auth import log_history_change as auth_log_history_change
+from testing_support import create_test_app
+
+
+def count_inserts(statements):
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.startswith('INSERT INTO audit_logs'):
+            statements.append(statement)
+    return before_cursor_execute
+
+
+def test_buffered_batch_writes():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        inserts = []
+        listener = count_inserts(inserts)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        with app.test_request_context('/', headers={'User-Agent': 'test-agent'}):
+            for i in range(120):
+                log_store.log_activity(i % 7, f'User {i}', 'user_login', 'Logged in')
+            log_store.log_subscription_activity(3, 'User 3', 'subscription_created', 'Premium', 150.0, 'PHP', 'gcash', 'active')
+            log_store.log_subscription_activity(4, 'User 4', 'subscription_cancelled', 'Premium', 0, 'PHP', 'gcash', 'cancelled')
+            auth_log_history_change('users', 3, 'UPDATE', {'firstname': 'A'}, {'firstname': 'B'}, 'admin_1')
+            assert AuditLog.query.count() == 0, "logging must not write during the request"
+
+        assert log_store.flush() == 123
+        event.remove(db.engine, 'before_cursor_execute', listener)
+        assert len(inserts) == 1, f"expected one batched INSERT, got {len(inserts)}"
+        print("✅ 123 log calls buffered and written with one batched INSERT")
+
+        activity = log_store.query_logs('activity', limit=5)
+        assert len(activity) == 5 and activity[0]['id'] > activity[-1]['id'], "newest first"
+        assert activity[0]['user_agent'] == 'test-agent' and activity[0]['timestamp'].endswith('+00:00')
+        history = log_store.query_logs('history')
+        assert history[0]['field_changes'] == ['firstname'] and history[0]['changed_by'] == 'admin_1'
+
+        counts = log_store.count_logs()
+        assert counts['activity'] == 120 and counts['history'] == 1 and counts['subscription'] == 2
+        assert counts['subscription:active'] == 1 and counts['subscription:cancelled'] == 1
+
+        future = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(minutes=1)
+        assert log_store.query_logs('activity', since=future) == []
+        assert len(log_store.query_logs('activity', since=log_store.range_start('1d'))) == 120
+        print("✅ Time-range queries and grouped counts read from the audit_logs table")
+
+
+def test_failed_flush_keeps_entries():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        with app.test_request_context('/'):
+            log_store.log_activity(1, 'User 1', 'user_login', 'Logged in')
+        with mock.patch.object(AuditLog.__table__, 'insert', side_effect=RuntimeError('database is down')):
+            assert log_store.flush() == 0
+        assert AuditLog.query.count() == 0
+        assert log_store.flush() == 1, "entries from a failed flush are retried"
+        assert AuditLog.query.count() == 1
+    print("✅ Entries survive a failed flush and are written on the next one")
+
+
+if __name__ == "__main__":
+    test_buffered_batch_writes()
+    test_failed_flush_keeps_entries()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Test script for plant image analysis credits and job recovery
+Uploads plant images on in-memory SQLite with the analysis queued for an
+external worker, and checks that each upload reserves a credit when it is
+queued (so uploads beyond the allowance are refused before any job runs),
+that a finished analysis is charged exactly once, that failed analyses give
+the credit back (also on the direct HTTP fallback taken when the OpenAI
+client cannot be built), and that start_worker_pool() runs jobs left queued by a
+previous process. Interrupted jobs are left running for the single
+sweep to requeue.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask_login import login_user
+from website import jobs
+from website.models import db, User, Garden, GridSpace, AIAnalysisUsage, AIUsageTracking, AnalysisJob
+from testing_support import create_test_app
+
+CACHED_RESPONSE = json.dumps({"needs_water": True, "needs_fertilize": False, "needs_prune": False,
+                              "confidence": 0.9, "reasoning": "Leaves are drooping"})
+
+
+def seed(purchased_credits=0):
+    user = User(email='grower@egrowtify.com', firstname='Grow', lastname='Er', contact='0',
+                password_hash='x', is_active=True, subscribed=False)
+    db.session.add(user)
+    db.session.flush()
+    garden = Garden(user_id=user.id, name='Backyard', garden_type='outdoor', grid_size='3x3')
+    db.session.add(garden)
+    db.session.flush()
+    space = GridSpace(garden_id=garden.id, grid_position='1,1', is_active=True)
+    db.session.add_all([space, AIAnalysisUsage(user_id=user.id, free_analyses_used=0,
+                                               purchased_credits=purchased_credits)])
+    db.session.commit()
+    return user.id, space.id
+
+
+def upload(app, user_id, space_id):
+    from website.views import upload_plant_image
+    data = {'space_id': str(space_id), 'image': (io.BytesIO(b'not really a jpeg'), 'leaf.jpg', 'image/jpeg')}
+    with app.test_request_context('/garden/upload-plant-image', method='POST', data=data):
+        login_user(db.session.get(User, user_id))
+        response, status = upload_plant_image()
+        return status, response.get_json()
+
+
+def usage(user_id):
+    db.session.expire_all()
+    row = AIAnalysisUsage.query.filter_by(user_id=user_id).one()
+    return row.free_analyses_used, row.purchased_credits
+
+
+def test_credits_are_reserved_when_queued():
+    app = create_test_app()
+    with tempfile.TemporaryDirectory() as directory, \
+            mock.patch.dict(os.environ, {'OPENAI_API_KEY': 'sk-test', 'ANALYSIS_WORKER_MODE': 'external'}):
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            with app.app_context():
+                db.create_all()
+                user_id, space_id = seed(purchased_credits=1)
+
+                statuses = [upload(app, user_id, space_id)[0] for _ in range(6)]
+                assert statuses == [202, 202, 202, 202, 402, 402], statuses
+                assert usage(user_id) == (3, 0), "3 free analyses and the purchased credit are taken up front"
+                payloads = [json.loads(job.payload) for job in AnalysisJob.query.order_by(AnalysisJob.id)]
+                assert [p['credit'] for p in payloads] == ['free', 'free', 'free', 'purchased']
+                print("✅ Uploads beyond the allowance are refused before any analysis has run")
+
+                with mock.patch('website.views.get_ai_result', return_value=CACHED_RESPONSE), \
+                        mock.patch('website.views.store_ai_result'):
+                    assert jobs.run_job(1) and jobs.run_job(4)
+                assert usage(user_id) == (3, 0)
+                charges = AIUsageTracking.query.order_by(AIUsageTracking.id).all()
+                assert [(c.is_free_usage, float(c.cost)) for c in charges] == [(True, 0.0), (False, 20.0)]
+                print("✅ Finished analyses are charged once, against the reserved credit")
+
+                with mock.patch.dict(os.environ, {'OPENAI_API_KEY': ''}):
+                    assert jobs.run_job(2)
+                assert db.session.get(AnalysisJob, 2).status == 'done' and usage(user_id) == (2, 0)
+                db.session.delete(db.session.get(GridSpace, space_id))
+                db.session.commit()
+                assert jobs.run_job(3)
+                assert db.session.get(AnalysisJob, 3).status == 'failed' and usage(user_id) == (1, 0)
+                assert AIUsageTracking.query.count() == 2
+                print("✅ Analyses without a result and failed jobs refund their credit")
+        finally:
+            os.chdir(cwd)
+
+
+def test_proxies_fallback_charges_and_refunds():
+    app = create_test_app()
+    fallback_body = {'choices': [{'message': {'content': CACHED_RESPONSE}}]}
+    with tempfile.TemporaryDirectory() as directory, \
+            mock.patch.dict(os.environ, {'OPENAI_API_KEY': 'sk-test', 'ANALYSIS_WORKER_MODE': 'external'}):
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            with app.app_context():
+                db.create_all()
+                user_id, space_id = seed()
+                assert [upload(app, user_id, space_id)[0] for _ in range(2)] == [202, 202]
+                assert usage(user_id) == (2, 0)
+
+                with mock.patch('website.views.get_ai_result', return_value=None), \
+                        mock.patch('website.views.upstream_image_b64', return_value='aW1n'), \
+                        mock.patch('website.views.http_client.get_openai_client',
+                                   side_effect=TypeError("unexpected keyword argument 'proxies'")), \
+                        mock.patch('website.views.http_client.post') as post:
+                    post.return_value = mock.Mock(status_code=200, json=lambda: fallback_body)
+                    assert jobs.run_job(1)
+                    post.return_value = mock.Mock(status_code=500)
+                    assert jobs.run_job(2)
+
+                done = db.session.get(AnalysisJob, 1)
+                result = json.loads(done.result)
+                assert done.status == 'done' and result['image_path'] == json.loads(done.payload)['image_path']
+                assert result['care_suggestions']['reasoning'] == 'Leaves are drooping'
+                charges = AIUsageTracking.query.all()
+                assert [(c.is_free_usage, c.image_path) for c in charges] == [(True, result['image_path'])]
+                print("✅ The direct HTTP fallback charges the reserved credit and returns its result")
+
+                assert db.session.get(AnalysisJob, 2).status == 'done' and usage(user_id) == (1, 0)
+                print("✅ A failed direct HTTP fallback refunds the reserved credit")
+        finally:
+            os.chdir(cwd)
+
+
+def test_worker_pool_resumes_leftover_jobs():
+    app = create_test_app()
+    ran = []
+    jobs.register_handler('test_resume', lambda job: ran.append(job.id) or {'ok': True})
+    with mock.patch.dict(os.environ, {'ANALYSIS_WORKER_MODE': 'thread'}):
+        with app.app_context():
+            db.create_all()
+            user_id, _ = seed()
+            long_ago = datetime.now(timezone.utc) - timedelta(seconds=jobs.STALE_JOB_SECONDS + 60)
+            db.session.add_all([
+                AnalysisJob(job_type='test_resume', user_id=user_id, status='queued', payload='{}'),
+                AnalysisJob(job_type='test_resume', user_id=user_id, status='running', payload='{}',
+                            started_at=long_ago),
+                AnalysisJob(job_type='test_resume', user_id=user_id, status='running', payload='{}',
+                            started_at=datetime.now(timezone.utc)),
+            ])
+            db.session.commit()
+
+            assert jobs.start_worker_pool() == 1
+            for _ in range(100):
+                db.session.expire_all()
+                if db.session.get(AnalysisJob, 1).status == 'done':
+                    break
+                time.sleep(0.05)
+            statuses = [job.status for job in AnalysisJob.query.order_by(AnalysisJob.id)]
+            assert statuses == ['done', 'running', 'running'] and ran == [1], statuses
+            print("✅ Starting the worker pool runs queued jobs and leaves running ones to their worker")
+
+            assert jobs.requeue_stale_jobs() == 1 and jobs.run_pending_jobs() == 1
+            statuses = [job.status for job in AnalysisJob.query.order_by(AnalysisJob.id)]
+            assert statuses == ['done', 'done', 'running'] and sorted(ran) == [1, 2], statuses
+            print("✅ The stale-work sweep requeues and runs the interrupted job only")
+
+
+if __name__ == "__main__":
+    test_credits_are_reserved_when_queued()
+    test_proxies_fallback_charges_and_refunds()
+    test_worker_pool_resumes_leftover_jobs()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the plant name index
+Covers exact mappings, compound-name simplification priority, crop synonyms,
+forced names and loading an extended table from a separate data file.
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website.plant_names import (
+    best_common_name, simplify_name, is_crop_match, forced_name, load_index, DEFAULT_NAMES_FILE
+)
+
+
+def test_exact_and_compound_names():
+    assert best_common_name('Daucus carota', 'Daucus carota', []) == 'Carrot'
+    assert best_common_name('Something', 'Unknown sp.', ['Kalamansi']) == 'Calamansi'
+    assert best_common_name('Fragaria vesca', 'Fragaria vesca', ['woodland strawberry']) == 'Strawberry'
+    assert best_common_name('Prunus', '', ['peach tree']) == 'Peach'
+    assert best_common_name('Pisum', '', ['sweet pea']) == 'Pea', "'pea' must match as a whole word"
+    assert simplify_name('Orange Strawberry') == 'Strawberry', "earlier simple_names entries take priority"
+    assert simplify_name('Pineapple Sage') == 'Pineapple'
+    assert simplify_name('Hibiscus') == 'Hibiscus'
+    print("✅ Exact mappings and compound-name simplification")
+
+
+def test_fallbacks():
+    assert best_common_name('Ixora coccinea', 'Ixora coccinea', ['jungle geranium', 'flame of the woods']) == 'jungle geranium'
+    assert best_common_name('Ixora coccinea', '', []) == 'Ixora'
+    assert best_common_name(None, '', []) == 'Unknown'
+    print("✅ Unmapped plants fall back to a short common name or the genus")
+
+
+def test_crops_and_forced_names():
+    assert is_crop_match('Solanum lycopersicum', '', [])
+    assert is_crop_match('x', '', ['Bell pepper'])
+    assert not is_crop_match('Rosa', 'rosa chinensis', ['china rose'])
+    assert forced_name('Viburnum opulus guelder-rose') == 'Grape'
+    assert forced_name('Rosa chinensis') is None
+    print("✅ Crop synonyms and forced names")
+
+
+def test_extended_data_file():
+    with open(DEFAULT_NAMES_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+    data['common_names']['moringa oleifera'] = 'Malunggay'
+    data['simple_names'].append('okra')
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(data, f)
+    try:
+        index = load_index(f.name)
+        assert index.best_common_name('Moringa oleifera', 'Moringa oleifera', []) == 'Malunggay'
+        assert index.simple_name('Lady finger okra') == 'Okra'
+    finally:
+        os.remove(f.name)
+    print("✅ New names can be added through the data file")
+
+
+if __name__ == "__main__":
+    test_exact_and_compound_names()
+    test_fallbacks()
+    test_crops_and_forced_names()
+    test_extended_data_file()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Test script for the admin dashboard rollups
+Seeds signups, AI analyses, care actions, feedback, subscriptions and admin
+log entries over several days on in-memory SQLite and checks that refresh()
+backfills per-day aggregates matching a Python recount, that later refreshes
+only regroup recent days, that subscription events are counted once on the
+day they happened, that refreshes take the database lock, and that the
+dashboard endpoints read the rollups.
+"""
+
+import os
+import sys
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask_login import login_user
+from website import rollups
+from website.models import (
+    db, Admin, User, AIUsageTracking, ActivityLog, Feedback, SubscriptionPlan, UserSubscription, AuditLog
+)
+from testing_support import create_test_app
+
+NOW = datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def seed(days=20, seed=0):
+    rng = random.Random(seed)
+
+    def moment():
+        return NOW - timedelta(days=rng.randint(0, days - 1), minutes=rng.randint(0, 600))
+
+    plan = SubscriptionPlan(plan_name='Premium', plan_type='premium', price=150, grid_planner_size='6x6',
+                            free_ai_analyses=20, free_plant_analyses=10, free_soil_analyses=10)
+    users = [User(email=f'u{i}@egrowtify.com', firstname='U', lastname=str(i), contact='0', password_hash='x',
+                  is_active=rng.random() < 0.8, subscribed=rng.random() < 0.3, created_at=moment())
+             for i in range(120)]
+    db.session.add_all([plan, *users, Admin(username='root', email='root@egrowtify.com', password_hash='x', full_name='Root')])
+    db.session.flush()
+    for _ in range(400):
+        db.session.add(AIUsageTracking(user_id=rng.choice(users).id, usage_type=rng.choice(['plant_analysis', 'soil_analysis']),
+                                       cost=rng.choice([0, 20, 25]), is_free_usage=rng.random() < 0.5, created_at=moment()))
+        created = moment()
+        db.session.add(ActivityLog(user_id=rng.choice(users).id, action=rng.choice(['water', 'fertilize', 'prune']),
+                                   action_date=created.date(), created_at=created))
+    for _ in range(40):
+        db.session.add(Feedback(user_id=rng.choice(users).id, subject='s', message='m', created_at=moment(),
+                                status=rng.choice(['pending', 'resolved', 'in_progress'])))
+        created = moment()
+        db.session.add(UserSubscription(user_id=rng.choice(users).id, plan_id=plan.id, start_date=created,
+                                        status=rng.choice(['active', 'cancelled']), payment_status='paid',
+                                        total_paid=150, created_at=created, updated_at=created))
+    db.session.commit()
+
+
+def day_counts(rows, dimension=None):
+    return Counter((row.created_at.date(), getattr(row, dimension) if dimension else '') for row in rows)
+
+
+def stored(metric):
+    return {(day, dimension): value for day, name, dimension, value in rollups.daily([metric]) if name == metric}
+
+
+def test_backfill_and_incremental_refresh():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        seed()
+        rollups.refresh()
+
+        assert stored('signups') == dict(day_counts(User.query.all()))
+        assert stored('ai_analyses') == dict(day_counts(AIUsageTracking.query.all(), 'usage_type'))
+        assert stored('care_actions') == dict(day_counts(ActivityLog.query.all(), 'action'))
+        active = Counter(day for day, _ in {(row.created_at.date(), row.user_id)
+                                            for row in ActivityLog.query.all() + AIUsageTracking.query.all()})
+        assert stored('active_users') == {(day, ''): count for day, count in active.items()}
+        current = rollups.snapshot()
+        assert current['users']['total'] == 120 and current['admins'] == {'total': 1}
+        assert current['feedback_status'] == dict(Counter(f.status for f in Feedback.query.all()))
+        assert sum(rollups.totals(['subscription_revenue'])['subscription_revenue'].values()) == 40 * 150
+        print(f"✅ Backfill matches a Python recount over {len({d for d, _ in stored('signups')})} days")
+
+        # A late write inside the lookback window is picked up, older days are final
+        old_day = NOW - timedelta(days=10)
+        db.session.add_all([
+            User(email='new@egrowtify.com', firstname='N', lastname='U', contact='0', password_hash='x', created_at=NOW),
+            User(email='old@egrowtify.com', firstname='O', lastname='U', contact='0', password_hash='x', created_at=old_day),
+        ])
+        db.session.commit()
+        with mock.patch.object(rollups, '_utcnow', lambda: NOW):
+            rollups.refresh()
+        signups = stored('signups')
+        assert signups[(NOW.date(), '')] == day_counts(User.query.all())[(NOW.date(), '')]
+        assert signups.get((old_day.date(), ''), 0) == day_counts(User.query.all())[(old_day.date(), '')] - 1
+        assert rollups.snapshot()['users']['total'] == 122, "snapshot totals are always recomputed"
+        print("✅ Incremental refresh regroups only the recent days and rewrites today's snapshot")
+
+
+def test_subscription_events_keep_their_day():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        seed(seed=2)
+        plan = SubscriptionPlan.query.first()
+        user = User.query.first()
+        cancelled = UserSubscription(user_id=user.id, plan_id=plan.id, start_date=NOW - timedelta(days=5),
+                                     status='cancelled', payment_status='failed', total_paid=0,
+                                     created_at=NOW - timedelta(days=6), updated_at=NOW - timedelta(days=5))
+        pending = UserSubscription(user_id=user.id, plan_id=plan.id, start_date=NOW - timedelta(days=5),
+                                   status='active', payment_status='pending', total_paid=150,
+                                   created_at=NOW - timedelta(days=5))
+        db.session.add_all([cancelled, pending])
+        db.session.commit()
+        rollups.refresh()
+        cancellations = sum(rollups.totals(['cancellations'])['cancellations'].values())
+        revenue = sum(rollups.totals(['subscription_revenue'])['subscription_revenue'].values())
+
+        # A later edit moves updated_at but not the cancellation; the payment settles today
+        cancelled.end_date = NOW
+        pending.payment_status = 'paid'
+        db.session.commit()
+        assert cancelled.cancelled_at.date() == (NOW - timedelta(days=5)).date() and pending.paid_at.date() == NOW.date()
+        rollups.refresh()
+        assert sum(rollups.totals(['cancellations'])['cancellations'].values()) == cancellations
+        assert sum(rollups.totals(['subscription_revenue'])['subscription_revenue'].values()) == revenue + 150
+        print("✅ Cancellations keep their day after later edits, late settlements count on the day they settle")
+
+        this_month = NOW.date().replace(day=1)
+        expected = len({s.user_id for s in UserSubscription.query.all() if s.created_at.date() >= this_month})
+        assert stored('month_subscribers')[(this_month, '')] == expected
+        print("✅ Monthly subscribers are distinct over the whole month")
+
+
+def test_refresh_takes_database_lock():
+    class Connection:
+        def __init__(self, dialect, acquired=1):
+            self.dialect = mock.Mock()
+            self.dialect.name = dialect
+            self.acquired = acquired
+            self.log = []
+
+        def execute(self, statement, params=None):
+            self.log.append(str(statement))
+            return mock.Mock(scalar=lambda: self.acquired)
+
+        def commit(self):
+            self.log.append('COMMIT')
+
+        def rollback(self):
+            self.log.append('ROLLBACK')
+
+    for dialect, lock, unlock in (('mysql', 'GET_LOCK', 'RELEASE_LOCK'),
+                                  ('postgresql', 'pg_advisory_lock', 'pg_advisory_unlock')):
+        connection = Connection(dialect)
+        with rollups._refresh_lock(connection):
+            connection.log.append('REFRESH')
+        assert [lock in connection.log[0], *connection.log[1:3], unlock in connection.log[3], connection.log[4]] == \
+            [True, 'COMMIT', 'REFRESH', True, 'COMMIT'], connection.log
+
+    connection = Connection('mysql', acquired=0)
+    try:
+        with rollups._refresh_lock(connection):
+            raise AssertionError("refreshed without the lock")
+    except RuntimeError:
+        pass
+    assert connection.log[-1] == 'ROLLBACK'
+    print("✅ Refreshes hold a database lock (GET_LOCK / advisory lock) until their rows are committed")
+
+
+def test_dashboard_endpoints_read_rollups():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        seed(seed=1)
+        admin = Admin.query.first()
+        rollups._fresh_until = None  # the previous test's app refreshed a different database
+
+        from website.views import admin_api_stats, admin_dashboard, admin_api_reports_summary
+        with app.test_request_context('/api/admin/stats'):
+            login_user(admin)
+            data = admin_api_stats().get_json()
+        assert data['totalUsers'] == User.query.count() and data['totalAdmins'] == 1
+        assert sum(data['last7Days']['careActions'].values()) == ActivityLog.query.filter(
+            ActivityLog.created_at >= datetime.combine((NOW - timedelta(days=6)).date(), datetime.min.time())).count()
+        print("✅ First dashboard load refreshed the empty rollups inline")
+
+        db.session.add(User(email='late@egrowtify.com', firstname='L', lastname='U', contact='0', password_hash='x'))
+        db.session.commit()
+        with app.test_request_context('/admin/dashboard'):
+            login_user(admin)
+            data = admin_dashboard().get_json()
+        assert data['stats']['total_users'] == User.query.count() - 1, "fresh rollups are served as they are"
+
+        with mock.patch.object(rollups, 'ROLLUP_MAX_AGE', 0), mock.patch.object(rollups, '_fresh_until', None):
+            with app.test_request_context('/admin/dashboard'):
+                login_user(admin)
+                data = admin_dashboard().get_json()
+        assert data['stats']['total_users'] == User.query.count(), "stale rollups are refreshed before reading"
+        print("✅ Dashboard totals come from the rollups and are refreshed once stale")
+
+        db.session.add_all([AuditLog(kind='subscription', action='subscription_created', status='active',
+                                     created_at=NOW, payload='{}'),
+                            AuditLog(kind='activity', action='user_login', status='success',
+                                     created_at=NOW - timedelta(days=40), payload='{}')])
+        db.session.commit()
+        rollups.refresh()
+        with app.test_request_context('/api/admin/reports/summary?date_range=30d'):
+            login_user(admin)
+            data = admin_api_reports_summary().get_json()
+        assert data['totalSubscriptions'] == 1 and data['activeSubscriptions'] == 1 and data['totalActivities'] == 0
+        print("✅ Reports summary counts logged entries in the date range from the rollups")
+
+
+if __name__ == "__main__":
+    test_backfill_and_incremental_refresh()
+    test_subscription_events_keep_their_day()
+    test_refresh_takes_database_lock()
+    test_dashboard_endpoints_read_rollups()
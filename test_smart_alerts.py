@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the materialized smart alerts
+Seeds a premium user with a 4x4 garden on in-memory SQLite, checks that a poll
+reads the stored alerts plus a bounded window of completed actions, and that
+cancelling the subscription (which deletes spaces beyond 3x3) stops serving
+alerts for the deleted spaces, and that a poll racing another poll's first
+materialization reuses its marker instead of failing or duplicating alerts.
+"""
+
+import os
+import sys
+from datetime import date, timedelta
+from unittest import mock
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask_login import login_user
+from sqlalchemy import event
+from sqlalchemy.orm import Query
+from website import alerts
+from website.models import (db, User, Plant, Garden, GridSpace, ActivityLog, UserSubscription, SubscriptionPlan,
+                            AlertMaterialization, MaterializedAlert)
+from testing_support import create_test_app
+
+TODAY = date.today()
+
+
+def seed():
+    user = User(email='alerts@egrowtify.com', firstname='Alert', lastname='Tester', contact='0',
+                password_hash='x', is_active=True, subscribed=True)
+    plant = Plant(name='Tomato', type='vegetable', environment='outdoor', care_guide='-',
+                  watering_frequency=2, fertilizing_frequency=14, pruning_frequency=30)
+    plan = SubscriptionPlan(plan_name='Premium Plan', plan_type='premium', price=150, grid_planner_size='6x6',
+                            free_ai_analyses=20, free_plant_analyses=10, free_soil_analyses=10)
+    db.session.add_all([user, plant, plan])
+    db.session.flush()
+    garden = Garden(user_id=user.id, name='Backyard', garden_type='outdoor', grid_size='4x4')
+    db.session.add_all([garden, UserSubscription(user_id=user.id, plan_id=plan.id, start_date=TODAY,
+                                                 status='active', payment_status='paid', total_paid=150)])
+    db.session.flush()
+    for i in range(16):
+        db.session.add(GridSpace(garden_id=garden.id, grid_position=f"{i // 4 + 1},{i % 4 + 1}", plant_id=plant.id,
+                                 planting_date=TODAY - timedelta(days=40), last_watered=TODAY - timedelta(days=5),
+                                 care_suggestions='{}', is_active=True))
+    db.session.flush()
+    first_space = GridSpace.query.filter_by(garden_id=garden.id).order_by(GridSpace.id).first()
+    for days_ago in (0, 10, 60, 400):
+        db.session.add(ActivityLog(user_id=user.id, garden_id=garden.id, space_id=first_space.id, plant_id=plant.id,
+                                   action='fertilize', action_date=TODAY - timedelta(days=days_ago)))
+    db.session.commit()
+    return user.id
+
+
+def test_poll_reads_bounded_completions():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user_id = seed()
+        alerts.load_smart_alerts(user_id)  # first poll materializes
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count)
+        served, completed = alerts.load_smart_alerts(user_id)
+        event.remove(db.engine, 'before_cursor_execute', count)
+        assert len(statements) == 2, statements
+        assert sorted(c['action_date'] for c in completed) == [
+            (TODAY - timedelta(days=10)).isoformat(), TODAY.isoformat()], "only the last 30 days are returned"
+        assert served and served == alerts.build_smart_alerts(user_id)[0]
+        print(f"✅ A materialized poll is {len(statements)} indexed reads with {len(completed)} recent completions")
+
+
+def test_cancelled_subscription_drops_removed_spaces():
+    from website.views import user_cancel_subscription
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user_id = seed()
+        served, _ = alerts.load_smart_alerts(user_id)
+        before = {alert['space_id'] for alert in served if alert.get('space_id')}
+        assert len(before) == 16
+
+        with app.test_request_context('/api/subscription/cancel', method='POST'):
+            login_user(db.session.get(User, user_id))
+            user_cancel_subscription()
+
+        remaining = {space.id for space in GridSpace.query.all()}
+        served, _ = alerts.load_smart_alerts(user_id)
+        after = {int(alert['space_id']) for alert in served if alert.get('space_id')}
+        assert len(remaining) == 9 and after == remaining, (after, remaining)
+        print("✅ Cancelling the subscription rebuilds alerts without the removed grid spaces")
+
+
+def test_racing_first_polls_share_the_marker():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user_id = seed()
+        alerts.load_smart_alerts(user_id)  # the other poll committed its marker and alerts
+        db.session.expunge_all()
+
+        # This poll read "no marker" just before the other one committed
+        real_one_or_none, reads = Query.one_or_none, []
+
+        def racing_read(query):
+            reads.append(query)
+            return None if len(reads) == 1 else real_one_or_none(query)
+
+        tomorrow = TODAY + timedelta(days=1)
+        with mock.patch.object(Query, 'one_or_none', racing_read):
+            entries = alerts.materialize_user_alerts(user_id, tomorrow)
+        db.session.commit()
+        markers = AlertMaterialization.query.all()
+        assert [(m.user_id, m.computed_for) for m in markers] == [(user_id, tomorrow)]
+        assert MaterializedAlert.query.filter_by(user_id=user_id).count() == len(entries) == 16
+        print("✅ A poll that loses the race for the marker rebuilds under it without duplicates")
+
+
+if __name__ == "__main__":
+    test_poll_reads_bounded_completions()
+    test_cancelled_subscription_drops_removed_spaces()
+    test_racing_first_polls_share_the_marker()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQL-aggregated subscription analytics
+Seeds users, plans and subscriptions on in-memory SQLite, refreshes the
+daily rollups and checks the overview, bucketed series and recent activity
+feed against plain Python computations over the same rows, and that the
+stats endpoint only reads the rollup table.
+"""
+
+import os
+import sys
+import random
+from datetime import datetime, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask_login import login_user
+from sqlalchemy import event
+from website import rollups, subscription_analytics as analytics
+from website.models import db, Admin, User, SubscriptionPlan, UserSubscription
+from testing_support import create_test_app
+
+NOW = datetime(2025, 6, 18, 12, 0)
+
+
+def seed(users=300, seed=0):
+    rng = random.Random(seed)
+    plans = [SubscriptionPlan(plan_name=name, plan_type=name.lower(), price=price, grid_planner_size=size,
+                              free_ai_analyses=3, free_plant_analyses=3, free_soil_analyses=3)
+             for name, price, size in (('Basic', 0, '3x3'), ('Premium', 150, '6x6'))]
+    db.session.add_all(plans)
+    people = [User(email=f'u{i}@egrowtify.com', firstname=f'First{i}', lastname=f'Last{i}', contact='0',
+                   password_hash='x', subscribed=rng.random() < 0.4, is_active=rng.random() < 0.9)
+              for i in range(users)]
+    db.session.add_all(people)
+    db.session.flush()
+    for user in people:
+        for _ in range(rng.choice([0, 0, 1, 1, 2])):
+            created = NOW - timedelta(days=rng.uniform(0, 400))
+            status = rng.choice(['active', 'active', 'cancelled', 'expired'])
+            db.session.add(UserSubscription(
+                user_id=user.id, plan_id=rng.choice(plans).id, start_date=created, status=status,
+                payment_status=rng.choice(['paid', 'paid', 'pending', 'failed']),
+                total_paid=rng.choice([150, 150, 20, 40.5]), created_at=created,
+                updated_at=created + timedelta(days=rng.uniform(0, 30)) if status != 'active' else created))
+    db.session.commit()
+    return plans
+
+
+def expected_overview(plan_id=None):
+    users = User.query.all()
+    subs = [s for s in UserSubscription.query.all() if plan_id is None or s.plan_id == plan_id]
+    month_start = NOW.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last_month_start = (month_start - timedelta(days=1)).replace(day=1)
+    return {
+        'total_users': len(users),
+        'subscribed_users': sum(u.subscribed for u in users),
+        'active_subscribed_users': sum(u.subscribed and u.is_active for u in users),
+        'subscriptions': len(subs),
+        'active_subscriptions': sum(s.status == 'active' for s in subs),
+        'cancelled_subscriptions': sum(s.status == 'cancelled' for s in subs),
+        'total_revenue': float(sum(s.total_paid for s in subs if s.payment_status == 'paid')),
+        'month_revenue': float(sum(s.total_paid for s in subs if s.payment_status == 'paid' and s.created_at >= month_start)),
+        'new_subscribers_this_month': len({s.user_id for s in subs if s.created_at >= month_start}),
+        'new_subscribers_last_month': len({s.user_id for s in subs if last_month_start <= s.created_at < month_start}),
+    }
+
+
+def expected_series(bucket, periods, plan_id=None):
+    starts = analytics.bucket_starts(bucket, periods, NOW)
+    subs = [s for s in UserSubscription.query.all() if plan_id is None or s.plan_id == plan_id]
+
+    def bucket_of(moment):
+        for start in reversed(starts):
+            if moment >= start:
+                return start
+        return None
+
+    points = {start: [0, 0.0, 0] for start in starts}
+    for s in subs:
+        start = bucket_of(s.created_at)
+        if start is not None:
+            points[start][0] += 1
+            points[start][1] += float(s.total_paid) if s.payment_status == 'paid' else 0
+        if s.status == 'cancelled' and bucket_of(s.updated_at) is not None:
+            points[bucket_of(s.updated_at)][2] += 1
+    return [{'period': start.strftime('%Y-%m-%d'), 'new_subscriptions': n, 'revenue': round(r, 2), 'cancellations': c}
+            for start, (n, r, c) in points.items()]
+
+
+def test_aggregates_match_python():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        plans = seed()
+        rollups.refresh(now=NOW)
+        assert analytics.overview(now=NOW) == expected_overview()
+        assert analytics.overview(plan_id=plans[1].id, now=NOW) == expected_overview(plans[1].id)
+        print("✅ Overview figures match a Python recount, overall and per plan")
+
+        for bucket, periods in (('day', 45), ('week', 20), ('month', 14)):
+            got = analytics.series(bucket, periods, now=NOW)
+            assert len(got) == periods and got == expected_series(bucket, periods), bucket
+        assert analytics.series('month', 6, plan_id=plans[0].id, now=NOW) == expected_series('month', 6, plans[0].id)
+        assert analytics.bucket_starts('week', 2, NOW)[-1].weekday() == 0, "weeks start on Monday"
+        print("✅ Day, week and month series from the daily rollups match Python bucketing")
+
+        activities = analytics.recent_activity(limit=10)
+        newest = UserSubscription.query.order_by(UserSubscription.created_at.desc()).limit(10).all()
+        assert {a['id'].split('_')[0] for a in activities} <= {str(s.id) for s in newest}
+        assert len(activities) == 10 and activities == sorted(activities, key=lambda a: a['timestamp'], reverse=True)
+        print("✅ Recent activity built from the newest subscriptions in one joined query")
+
+
+def test_stats_endpoint_statements():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        seed(users=50)
+        admin = Admin(username='admin', email='admin@egrowtify.com', password_hash='x', full_name='Admin')
+        db.session.add(admin)
+        db.session.commit()
+        rollups.refresh()
+
+        from website.views import admin_api_subscription_stats
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with app.test_request_context('/api/admin/subscription/stats?bucket=week&periods=8'):
+            login_user(admin)
+            event.listen(db.engine, 'before_cursor_execute', count)
+            response = admin_api_subscription_stats()
+            event.remove(db.engine, 'before_cursor_execute', count)
+        data = response.get_json()
+        assert all('daily_rollups' in statement for statement in statements), statements
+        assert len(data['series']) == 8 and data['bucket'] == 'week'
+        assert data['totalRevenue'] >= data['monthlyRevenue']
+        print(f"✅ Stats endpoint answered with {len(statements)} statements, all against daily_rollups")
+
+        with app.test_request_context('/api/admin/subscription/stats?bucket=year'):
+            login_user(admin)
+            response, status = admin_api_subscription_stats()
+        assert status == 400
+
+        for bucket, periods in (('day', 367), ('week', 105), ('month', 61), ('month', 0), ('day', -3)):
+            with app.test_request_context(f'/api/admin/subscription/stats?bucket={bucket}&periods={periods}'):
+                login_user(admin)
+                response, status = admin_api_subscription_stats()
+            assert status == 400 and 'periods' in response.get_json()['error'], (bucket, periods)
+        with app.test_request_context('/api/admin/subscription/stats?bucket=day&periods=366'):
+            login_user(admin)
+            assert len(admin_api_subscription_stats().get_json()['series']) == 366
+        try:
+            analytics.series('week', 10 ** 6, now=NOW)
+            assert False, "series() accepted an unbounded period count"
+        except ValueError:
+            pass
+        print("✅ Unknown buckets and period counts beyond a bucket's bound are rejected with 400")
+
+
+if __name__ == "__main__":
+    test_aggregates_match_python()
+    test_stats_endpoint_statements()
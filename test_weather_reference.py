@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the static weather reference tables
+Checks that the shipped data file loads into read-only structures that still
+serialize to JSON, that plant lookups fall back to every plant, and that
+malformed files are rejected at load time.
+"""
+
+import os
+import sys
+import json
+import copy
+import tempfile
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from website.weather_reference import (
+    get_reference, load_reference, thaw, ReferenceDataError, DEFAULT_REFERENCE_FILE
+)
+
+
+def test_shipped_tables():
+    reference = get_reference()
+    assert reference is get_reference(), "the tables are loaded once per process"
+    assert reference.plants['tomatoes']['optimal_temp'] == {'min': 18, 'max': 29}
+    assert [z['name'] for z in reference.microclimate_zones][0] == 'Full Sun Zone'
+    assert reference.plant_keys('Garlic') == ['garlic']
+    assert reference.plant_keys('') == reference.plant_keys('okra') == list(reference.plants)
+    print(f"✅ {len(reference.plants)} plants and {len(reference.microclimate_zones)} zones loaded")
+
+
+def test_read_only_but_serializable():
+    reference = get_reference()
+    for mutate in (lambda: reference.plants.__setitem__('x', {}),
+                   lambda: reference.plants['tomatoes']['varieties'].pop('cherry'),
+                   lambda: reference.microclimate_zones[0].update(name='Mine')):
+        try:
+            mutate()
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("reference data must be read-only")
+    zone = json.loads(json.dumps(reference.microclimate_zones[0]))
+    assert zone['suitable_plants'][0] == 'Tomatoes'
+    copied = copy.deepcopy(reference.plants['herbs'])
+    copied['name'] = 'Changed'
+    assert reference.plants['herbs']['name'] != 'Changed'
+    assert thaw(reference.plants) == json.load(open(DEFAULT_REFERENCE_FILE, encoding='utf-8'))['plants']
+    print("✅ Shared tables are read-only, JSON-serializable and copy to plain dicts")
+
+
+def test_invalid_files_rejected():
+    with open(DEFAULT_REFERENCE_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+    broken = copy.deepcopy(data)
+    broken['plants']['tomatoes']['optimal_temp'] = {'min': 30, 'max': 20}
+    del broken['microclimate_zones'][1]['wind_modifier']
+    unversioned = dict(data, version=2)
+    for bad, expected in ((broken, 'tomatoes.optimal_temp'), (unversioned, 'unsupported version')):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(bad, f)
+        try:
+            load_reference(f.name)
+        except ReferenceDataError as e:
+            assert expected in str(e), e
+        else:
+            raise AssertionError("invalid reference data must not load")
+        finally:
+            os.remove(f.name)
+    print("✅ Malformed reference files are rejected at load time")
+
+
+if __name__ == "__main__":
+    test_shipped_tables()
+    test_read_only_but_serializable()
+    test_invalid_files_rejected()
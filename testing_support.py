@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the test scripts
+create_test_app() builds a throwaway Flask app on in-memory SQLite with the
+login manager and the views blueprint registered, so tests can call view
+functions inside app.test_request_context().
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from website import login_manager
+from website.models import db
+
+
+def create_test_app():
+    """Create a throwaway Flask app bound to in-memory SQLite"""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    login_manager.init_app(app)
+
+    from website.views import views
+    app.register_blueprint(views, url_prefix='/')
+    return app
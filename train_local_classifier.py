@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Train the optional local plant classifier from photos users already labelled.
+Reads grid space and plant photos with their plant names, holds out 20% to
+report accuracy and how many photos would be answered locally, then trains on
+everything and writes the model file the app picks up on its next request.
+
+Usage: python train_local_classifier.py [min_samples_per_class]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from collections import Counter
+import numpy as np
+
+from website import create_app
+from website.imaging import prepare_image
+from website.local_classifier import (
+    LocalPlantClassifier, training_samples, evaluate, model_path, MIN_CONFIDENCE
+)
+
+DEFAULT_MIN_SAMPLES = 15  # classes with fewer photos always go to Plant.id
+
+
+def load_vectors(samples):
+    vectors, labels = [], []
+    for image_path, label in samples:
+        try:
+            with open(image_path, 'rb') as f:
+                prepared = prepare_image(f.read())
+        except OSError:
+            continue
+        if prepared is not None:
+            vectors.append(prepared.features.vector)
+            labels.append(label)
+    return np.array(vectors), labels
+
+
+def train_local_classifier():
+    min_samples = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MIN_SAMPLES
+    app = create_app()
+
+    with app.app_context():
+        samples = training_samples()
+    print(f"📷 {len(samples)} labelled photos in the database")
+
+    vectors, labels = load_vectors(samples)
+    counts = Counter(labels)
+    keep = [i for i, label in enumerate(labels) if counts[label] >= min_samples]
+    if len({labels[i] for i in keep}) < 2:
+        print(f"❌ Need at least 2 plants with {min_samples}+ readable photos (have: {dict(counts.most_common(10))})")
+        sys.exit(1)
+    vectors = vectors[keep]
+    labels = [labels[i] for i in keep]
+    print(f"🌱 Training on {len(labels)} photos of {len(set(labels))} plants: "
+          + ", ".join(f"{label} ({count})" for label, count in Counter(labels).most_common()))
+
+    order = np.random.default_rng(42).permutation(len(labels))
+    split = int(len(order) * 0.8)
+    train_idx, test_idx = order[:split], order[split:]
+    model = LocalPlantClassifier.train(vectors[train_idx], [labels[i] for i in train_idx])
+    scores = evaluate(model, vectors[test_idx], [labels[i] for i in test_idx])
+    print(f"📊 Holdout ({len(test_idx)} photos): top-1 accuracy {scores['accuracy']:.1%}; "
+          f"at confidence {MIN_CONFIDENCE:.2f}, {scores['coverage']:.1%} answered locally "
+          f"with {scores['local_accuracy']:.1%} accuracy")
+
+    model = LocalPlantClassifier.train(vectors, labels)
+    path = model_path()
+    model.save(path)
+    print(f"✅ Saved local plant classifier to {path}")
+
+
+if __name__ == '__main__':
+    train_local_classifier()
@@ -95,6 +95,10 @@ def create_app():
     app.register_blueprint(views, url_prefix='/')
     app.register_blueprint(auth, url_prefix='/')
 
+    # Load and validate the static weather reference tables once; a broken data file fails startup
+    from .weather_reference import get_reference
+    get_reference()
+
     # Create database tables (only if not in production or if explicitly enabled)
     # In production, tables should be created via migrations or manual setup
     with app.app_context():
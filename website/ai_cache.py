@@ -0,0 +1,92 @@
+"""Content-addressed cache for paid image analyses (Plant.id and OpenAI vision).
+
+Results are keyed by a hash of the decoded image pixels (so re-uploads of the
+same photo match even if the file metadata differs), the analysis type, its
+prompt version and any prompt context. Entries live in the ai_result_cache
+table, with a small shared-cache layer in front.
+"""
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update
+from .models import db, AIResultCache
+from .cache import get_cache
+from .imaging import prepare_image
+import hashlib
+import os
+
+# Bump an entry when its prompt or model changes so stale answers are not reused
+PROMPT_VERSIONS = {
+    'plant_id': 'v2-1',
+    'plant_enrichment': 'gpt-4o-1',
+    'soil_analysis': 'gpt-4o-1',
+    'plant_care': 'gpt-4o-1',
+}
+MAX_AGE_DAYS = int(os.getenv('AI_RESULT_CACHE_DAYS', '90'))
+
+_recent = get_cache('ai_results', ttl=60 * 60, max_entries=200)
+
+
+def image_digest(image_bytes, prepared=None):
+    """SHA-256 of the image's normalized pixels (EXIF-rotated RGB, max 512px); raw bytes if undecodable
+
+    Pass the PreparedImage when the caller already decoded the upload.
+    """
+    prepared = prepared or prepare_image(image_bytes)
+    if prepared is None:
+        return hashlib.sha256(image_bytes).hexdigest()
+    return hashlib.sha256(prepared.fingerprint_bytes()).hexdigest()
+
+
+def _cache_key(digest, analysis_type, context):
+    version = PROMPT_VERSIONS[analysis_type]
+    return hashlib.sha256(f"{digest}:{analysis_type}:{version}:{context}".encode('utf-8')).hexdigest()
+
+
+def get_ai_result(digest, analysis_type, context=''):
+    """Stored upstream response text for this image/analysis, or None"""
+    key = _cache_key(digest, analysis_type, context)
+    result = _recent.get(key)
+    if result is not None:
+        return result
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=MAX_AGE_DAYS)
+    try:
+        # Own connection, so a failed lookup never rolls back the caller's session
+        with db.engine.connect() as connection:
+            result = connection.execute(select(AIResultCache.result).where(
+                AIResultCache.cache_key == key,
+                AIResultCache.created_at >= cutoff
+            )).scalar()
+    except Exception as e:
+        print(f"⚠️ AI result cache lookup failed: {e}")
+        return None
+    if result is not None:
+        _recent.set(key, result)
+    return result
+
+
+def store_ai_result(digest, analysis_type, result, context=''):
+    """Remember an upstream response; failures are logged, never raised"""
+    if not result:
+        return
+    key = _cache_key(digest, analysis_type, context)
+    _recent.set(key, result)
+    table = AIResultCache.__table__
+    try:
+        # Own transaction, so the caller's pending changes are neither committed nor discarded here
+        with db.engine.begin() as connection:
+            # Expired entry being refreshed
+            refreshed = connection.execute(
+                update(table).where(table.c.cache_key == key)
+                .values(result=result, created_at=datetime.now(timezone.utc))
+            ).rowcount
+            if not refreshed:
+                connection.execute(table.insert().values(
+                    cache_key=key,
+                    image_digest=digest,
+                    analysis_type=analysis_type,
+                    prompt_version=PROMPT_VERSIONS[analysis_type],
+                    result=result
+                ))
+    except Exception as e:
+        # Another worker may have stored the same result first
+        print(f"⚠️ Could not store AI result for {analysis_type}: {e}")
@@ -0,0 +1,602 @@
+from .models import db, Garden, Plant, PlantTracking, GridSpace, ActivityLog, AlertMaterialization, MaterializedAlert
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.exc import IntegrityError
+import json
+
+# Care actions in the order the alert engine emits them
+_AI_CARE_ACTIONS = (
+    ('water', 'needs_water', 'watering', 'needs watering', 'Needs Water', '💧'),
+    ('fertilize', 'needs_fertilize', 'fertilizing', 'needs fertilizer', 'Needs Fertilizer', '🌱'),
+    ('prune', 'needs_prune', 'pruning', 'needs pruning', 'Needs Pruning', '✂️'),
+)
+
+_PRIORITY_ORDER = {'high': 3, 'medium': 2, 'low': 1}
+
+# Completed actions returned with the alerts: the smart alerts page reports the
+# last 30 days, and hiding recently done alerts only needs the last day
+COMPLETED_ACTIONS_DAYS = 30
+
+
+def get_watering_recommendation(plant, days_since_watered):
+    """Generate plant-specific watering recommendations"""
+    plant_type = getattr(plant, 'type', '').lower()
+    environment = getattr(plant, 'environment', '').lower()
+
+    recommendations = []
+
+    # Base recommendations by plant type
+    if 'tomato' in plant.name.lower():
+        recommendations.append("Water at the base, avoid wetting leaves to prevent disease")
+        recommendations.append("Use 1-2 inches of water per week")
+    elif 'basil' in plant.name.lower() or 'herb' in plant_type:
+        recommendations.append("Keep soil consistently moist but not waterlogged")
+        recommendations.append("Water when top inch of soil feels dry")
+    elif 'succulent' in plant.name.lower() or 'cactus' in plant.name.lower():
+        recommendations.append("Water deeply but infrequently - let soil dry between waterings")
+        recommendations.append("Use well-draining soil")
+    else:
+        recommendations.append("Water when top 1-2 inches of soil feels dry")
+
+    # Environment-specific recommendations
+    if environment == 'indoor':
+        recommendations.append("Check for proper drainage to prevent root rot")
+    elif environment == 'outdoor':
+        recommendations.append("Water early morning for best absorption")
+
+    # Overdue recommendations
+    if days_since_watered > 7:
+        recommendations.append("⚠️ Plant may be stressed - water immediately and check for wilting")
+
+    return " | ".join(recommendations)
+
+def get_new_plant_recommendation(plant):
+    """Generate recommendations for newly planted plants"""
+    plant_type = getattr(plant, 'type', '').lower()
+
+    recommendations = []
+    recommendations.append("First watering: water thoroughly to help establish roots")
+
+    if 'tomato' in plant.name.lower():
+        recommendations.append("Add support stake now for easier training later")
+    elif 'herb' in plant_type:
+        recommendations.append("Pinch back any flowers to encourage leaf growth")
+
+    recommendations.append("Monitor for signs of transplant shock")
+
+    return " | ".join(recommendations)
+
+def get_fertilizing_recommendation(plant, days_since_fertilized):
+    """Generate plant-specific fertilizing recommendations"""
+    plant_type = getattr(plant, 'type', '').lower()
+
+    recommendations = []
+
+    if 'tomato' in plant.name.lower():
+        recommendations.append("Use balanced fertilizer (10-10-10) or tomato-specific fertilizer")
+        recommendations.append("Apply around base, avoid direct contact with stems")
+    elif 'herb' in plant_type:
+        recommendations.append("Use diluted liquid fertilizer (half strength)")
+        recommendations.append("Organic options: compost tea or fish emulsion")
+    else:
+        recommendations.append("Use balanced fertilizer according to package instructions")
+
+    if days_since_fertilized > 30:
+        recommendations.append("⚠️ Long overdue - use gentle fertilizer to avoid shock")
+
+    return " | ".join(recommendations)
+
+def get_pruning_recommendation(plant, days_since_pruned):
+    """Generate plant-specific pruning recommendations"""
+    plant_type = getattr(plant, 'type', '').lower()
+
+    recommendations = []
+
+    if 'tomato' in plant.name.lower():
+        recommendations.append("Remove suckers (small shoots between main stem and branches)")
+        recommendations.append("Prune lower leaves that touch the ground")
+    elif 'herb' in plant_type:
+        recommendations.append("Pinch back tips to encourage bushier growth")
+        recommendations.append("Remove any yellow or dead leaves")
+    else:
+        recommendations.append("Remove dead, damaged, or diseased branches")
+        recommendations.append("Prune for shape and air circulation")
+
+    return " | ".join(recommendations)
+
+def _as_date(value):
+    """Normalize a DATE/DATETIME column value to a date"""
+    if hasattr(value, 'date'):
+        return value.date()
+    return value
+
+def _parse_care_suggestions(raw):
+    """Parse the AI analysis stored on a grid space, or None if unusable"""
+    if not raw:
+        return None
+    try:
+        parsed = json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+def _newly_added_until(space, today):
+    """Plants placed today with no care history stay hidden for 10s after their first analysis.
+
+    Returns the UTC time the space's AI alerts become visible, or None if they
+    are visible straight away.
+    """
+    if space.last_watered or space.last_fertilized or space.last_pruned:
+        return None
+    if not space.planting_date or not space.last_updated:
+        return None
+    planting_date = _as_date(space.planting_date)
+    if not isinstance(planting_date, type(today)) or (today - planting_date).days != 0:
+        return None
+    try:
+        last_updated = space.last_updated
+        if isinstance(last_updated, datetime):
+            if last_updated.tzinfo is None:
+                last_updated = last_updated.replace(tzinfo=timezone.utc)
+        else:
+            last_updated = datetime.combine(last_updated, datetime.min.time()).replace(tzinfo=timezone.utc)
+        return last_updated + timedelta(seconds=10)
+    except Exception:
+        return None
+
+def _done_today(value, today):
+    if not value:
+        return False
+    value = _as_date(value)
+    return isinstance(value, type(today)) and (today - value).days == 0
+
+def _ai_space_alerts(space, plant, garden, ai_analysis, today):
+    """Alerts driven by the AI analysis stored in GridSpace.care_suggestions"""
+    flags = {key: ai_analysis.get(key, False) for _, key, _, _, _, _ in _AI_CARE_ACTIONS}
+    if not any(flags.values()):
+        return []
+
+    confidence = ai_analysis.get('confidence', 0.5)
+    reasoning = ai_analysis.get('reasoning', 'AI analysis suggests care needed')
+    suggested_actions = [
+        {'type': action, 'label': label, 'icon': icon}
+        for action, key, _, _, label, icon in _AI_CARE_ACTIONS if flags[key]
+    ]
+    last_done = {
+        'water': space.last_watered,
+        'fertilize': space.last_fertilized,
+        'prune': space.last_pruned,
+    }
+
+    alerts = []
+    for action, key, alert_type, need_text, _, _ in _AI_CARE_ACTIONS:
+        if not flags[key] or _done_today(last_done[action], today):
+            continue
+        alerts.append({
+            'id': f"ai_{action}_{space.id}",
+            'type': alert_type,
+            'plant_name': plant.name,
+            'garden_name': garden.name,
+            'message': f'Your {plant.name} {need_text} based on AI analysis',
+            'due_date': today.isoformat(),
+            'priority': 'high' if confidence > 0.7 else 'medium',
+            'status': 'pending',
+            'space_id': space.id,
+            'garden_id': garden.id,
+            'recommendation': f"AI Analysis: {reasoning}",
+            'grid_position': space.grid_position,
+            'ai_confidence': confidence,
+            'ai_suggested_actions': suggested_actions
+        })
+    return alerts
+
+def _scheduled_space_alerts(space, plant, garden, today):
+    """Schedule-based alerts for grid spaces without a usable AI analysis"""
+    alerts = []
+
+    if space.last_watered:
+        days_since_watered = (today - _as_date(space.last_watered)).days
+        watering_freq = getattr(plant, 'watering_frequency', 3) or 3
+        if days_since_watered >= watering_freq:
+            alerts.append({
+                'id': f"grid_water_{space.id}",
+                'type': 'watering',
+                'plant_name': plant.name,
+                'garden_name': garden.name,
+                'message': f'Time to water your {plant.name} in {garden.name}',
+                'due_date': (space.last_watered + timedelta(days=watering_freq)).isoformat(),
+                'priority': 'high' if days_since_watered > watering_freq + 2 else 'medium',
+                'status': 'overdue' if days_since_watered > watering_freq else 'pending',
+                'space_id': space.id,
+                'garden_id': garden.id,
+                'recommendation': get_watering_recommendation(plant, days_since_watered),
+                'grid_position': space.grid_position
+            })
+    else:
+        alerts.append({
+            'id': f"grid_water_new_{space.id}",
+            'type': 'watering',
+            'plant_name': plant.name,
+            'garden_name': garden.name,
+            'message': f'Your newly planted {plant.name} needs its first watering',
+            'due_date': today.isoformat(),
+            'priority': 'high',
+            'status': 'pending',
+            'space_id': space.id,
+            'garden_id': garden.id,
+            'recommendation': get_new_plant_recommendation(plant),
+            'grid_position': None
+        })
+
+    if space.last_fertilized:
+        days_since_fertilized = (today - _as_date(space.last_fertilized)).days
+        fertilizing_freq = getattr(plant, 'fertilizing_frequency', 14) or 14
+        if days_since_fertilized >= fertilizing_freq:
+            alerts.append({
+                'id': f"grid_fertilize_{space.id}",
+                'type': 'fertilizing',
+                'plant_name': plant.name,
+                'garden_name': garden.name,
+                'message': f'Your {plant.name} needs fertilizer',
+                'due_date': (space.last_fertilized + timedelta(days=fertilizing_freq)).isoformat(),
+                'priority': 'medium',
+                'status': 'overdue' if days_since_fertilized > fertilizing_freq else 'pending',
+                'space_id': space.id,
+                'garden_id': garden.id,
+                'recommendation': get_fertilizing_recommendation(plant, days_since_fertilized),
+                'grid_position': space.grid_position
+            })
+
+    if space.last_pruned:
+        days_since_pruned = (today - _as_date(space.last_pruned)).days
+        pruning_freq = getattr(plant, 'pruning_frequency', 30) or 30
+        if days_since_pruned >= pruning_freq:
+            alerts.append({
+                'id': f"grid_prune_{space.id}",
+                'type': 'pruning',
+                'plant_name': plant.name,
+                'garden_name': garden.name,
+                'message': f'Time to prune your {plant.name}',
+                'due_date': (space.last_pruned + timedelta(days=pruning_freq)).isoformat(),
+                'priority': 'low',
+                'status': 'overdue' if days_since_pruned > pruning_freq else 'pending',
+                'space_id': space.id,
+                'garden_id': garden.id,
+                'recommendation': get_pruning_recommendation(plant, days_since_pruned),
+                'grid_position': space.grid_position
+            })
+    return alerts
+
+def _tracking_alerts(pt, plant, garden, today):
+    """Schedule-based alerts for the legacy PlantTracking rows"""
+    has_care_history = pt.last_watered or pt.last_fertilized or pt.last_pruned
+    if pt.planting_date and not has_care_history:
+        planting_date = _as_date(pt.planting_date)
+        # Skip plants added within the last 48 hours that have no care history yet
+        if isinstance(planting_date, type(today)) and (today - planting_date).days < 2:
+            return []
+
+    alerts = []
+    schedules = (
+        ('water', 'watering', plant.watering_frequency, pt.last_watered,
+         f'Time to water your {plant.name}', None),
+        ('fertilize', 'fertilizing', plant.fertilizing_frequency, pt.last_fertilized,
+         f'Your {plant.name} needs fertilizer', 'medium'),
+        ('prune', 'pruning', plant.pruning_frequency, pt.last_pruned,
+         f'Time to prune your {plant.name}', 'low'),
+    )
+    for action, alert_type, frequency, last_done, message, priority in schedules:
+        if not frequency:
+            continue
+        days_since = (today - _as_date(last_done)).days if last_done else 999
+        if days_since < frequency:
+            continue
+        alerts.append({
+            'id': f"track_{action}_{pt.id}",
+            'type': alert_type,
+            'plant_name': plant.name,
+            'garden_name': garden.name,
+            'message': message,
+            'due_date': (last_done + timedelta(days=frequency)).isoformat() if last_done else today.isoformat(),
+            'priority': priority or ('high' if days_since > frequency + 2 else 'medium'),
+            'status': 'overdue' if days_since > frequency else 'pending'
+        })
+    return alerts
+
+def _space_entries(user_id, today, space_ids=None, refresh=False):
+    """Evaluate grid space alerts for a user (optionally only some spaces) in one query.
+
+    Each entry carries the alert plus the keys used to store and order it.
+    """
+    query = db.session.query(GridSpace, Plant, Garden).join(
+        Plant, GridSpace.plant_id == Plant.id
+    ).join(
+        Garden, GridSpace.garden_id == Garden.id
+    ).filter(
+        Garden.user_id == user_id,
+        GridSpace.care_suggestions.isnot(None)
+    )
+    if space_ids is not None:
+        query = query.filter(GridSpace.id.in_(space_ids))
+    if refresh:
+        # Reload rows the caller just modified so column values are coerced by the database
+        query = query.populate_existing()
+
+    entries = []
+    for space, plant, garden in query.order_by(GridSpace.garden_id, GridSpace.id).all():
+        ai_analysis = _parse_care_suggestions(space.care_suggestions)
+        if ai_analysis:
+            alerts = _ai_space_alerts(space, plant, garden, ai_analysis, today)
+            visible_from = _newly_added_until(space, today) if alerts else None
+        else:
+            alerts = _scheduled_space_alerts(space, plant, garden, today)
+            visible_from = None
+        for position, alert in enumerate(alerts):
+            entries.append({
+                'alert': alert,
+                'garden_id': garden.id,
+                'space_id': space.id,
+                'tracking_id': None,
+                'position': position,
+                'visible_from': visible_from
+            })
+    return entries
+
+def _tracking_entries(user_id, today, tracking_ids=None, refresh=False):
+    """Evaluate legacy PlantTracking alerts for a user in one query"""
+    query = db.session.query(PlantTracking, Plant, Garden).join(
+        Plant, PlantTracking.plant_id == Plant.id
+    ).join(
+        Garden, PlantTracking.garden_id == Garden.id
+    ).filter(
+        Garden.user_id == user_id
+    )
+    if tracking_ids is not None:
+        query = query.filter(PlantTracking.id.in_(tracking_ids))
+    if refresh:
+        query = query.populate_existing()
+
+    entries = []
+    for pt, plant, garden in query.order_by(PlantTracking.garden_id, PlantTracking.id).all():
+        for position, alert in enumerate(_tracking_alerts(pt, plant, garden, today)):
+            entries.append({
+                'alert': alert,
+                'garden_id': garden.id,
+                'space_id': None,
+                'tracking_id': pt.id,
+                'position': position,
+                'visible_from': None
+            })
+    return entries
+
+def _entry_order(entry):
+    """Evaluation order: grid spaces before trackings, then by garden, record and position"""
+    is_tracking = entry['tracking_id'] is not None
+    record_id = entry['tracking_id'] if is_tracking else entry['space_id']
+    return (is_tracking, entry['garden_id'], record_id, entry['position'])
+
+def _load_completed_actions(user_id, today):
+    """The user's care actions of the last COMPLETED_ACTIONS_DAYS, read from ix_activity_logs_user_action_date"""
+    return db.session.query(
+        ActivityLog, Plant.name, Garden.name
+    ).outerjoin(
+        Plant, ActivityLog.plant_id == Plant.id
+    ).outerjoin(
+        Garden, ActivityLog.garden_id == Garden.id
+    ).filter(
+        ActivityLog.user_id == user_id,
+        ActivityLog.action_date >= today - timedelta(days=COMPLETED_ACTIONS_DAYS)
+    ).order_by(ActivityLog.action_date.desc()).all()
+
+def _latest_completions(completed_actions):
+    """Index the most recent action_date per (space_id, action)"""
+    latest = {}
+    for action, _, _ in completed_actions:
+        if action.space_id is None:
+            continue
+        key = (action.space_id, action.action)
+        if key not in latest or action.action_date > latest[key]:
+            latest[key] = action.action_date
+    return latest
+
+def _completed_recently(alert, latest, now):
+    """True when the alert's care action was logged within the last 24 hours"""
+    space_id = alert.get('space_id')
+    if not space_id:
+        return False
+    action_date = latest.get((int(space_id), alert.get('type').replace('ing', '')))
+    if action_date is None:
+        return False
+    if not hasattr(action_date, 'hour'):
+        action_date = datetime.combine(action_date, datetime.min.time())
+    if action_date.tzinfo is None:
+        action_date = action_date.replace(tzinfo=timezone.utc)
+    return (now - action_date).total_seconds() / 3600 < 24
+
+def _finalize_alerts(entries, completed_actions, now):
+    """Turn evaluated entries into the sorted, filtered /api/smart-alerts payload"""
+    entries = sorted(entries, key=_entry_order)
+    alerts = [
+        entry['alert'] for entry in entries
+        if entry['visible_from'] is None or now > entry['visible_from']
+    ]
+
+    # Sort alerts by priority and due date
+    alerts.sort(key=lambda x: (_PRIORITY_ORDER.get(x['priority'], 0), x['due_date']), reverse=True)
+
+    # Filter out alerts whose action was completed within the last 24 hours
+    latest = _latest_completions(completed_actions)
+    alerts = [alert for alert in alerts if not _completed_recently(alert, latest, now)]
+
+    completed_data = []
+    for action, plant_name, garden_name in completed_actions:
+        completed_data.append({
+            'id': f"completed_{action.id}",
+            'type': action.action,
+            'plant_name': plant_name or 'Unknown Plant',
+            'garden_name': garden_name or 'Unknown Garden',
+            'action_date': action.action_date.isoformat(),
+            'created_at': action.created_at.isoformat() if action.created_at else action.action_date.isoformat(),
+            'status': 'completed',
+            'notes': action.notes
+        })
+    return alerts, completed_data
+
+def build_smart_alerts(user_id, today=None):
+    """Build the smart alert payload for a user with a fixed number of queries.
+
+    Planted grid spaces, legacy plant trackings and completed actions are each
+    loaded in one query (joined with their Plant/Garden rows), and all rules
+    are then evaluated in memory. Returns (alerts, completed_actions).
+    """
+    today = today or datetime.now().date()
+    now = datetime.now(timezone.utc)
+
+    entries = _space_entries(user_id, today) + _tracking_entries(user_id, today)
+    alerts, completed_data = _finalize_alerts(entries, _load_completed_actions(user_id, today), now)
+
+    print(f"📊 Generated {len(alerts)} alerts for user {user_id}")
+    return alerts, completed_data
+
+def _store_entries(user_id, entries, today):
+    for entry in entries:
+        visible_from = entry['visible_from']
+        db.session.add(MaterializedAlert(
+            user_id=user_id,
+            garden_id=entry['garden_id'],
+            space_id=entry['space_id'],
+            tracking_id=entry['tracking_id'],
+            position=entry['position'],
+            # Stored as naive UTC to match MySQL DATETIME
+            visible_from=visible_from.astimezone(timezone.utc).replace(tzinfo=None) if visible_from else None,
+            payload=json.dumps(entry['alert']),
+            computed_for=today
+        ))
+
+def _load_entry(row):
+    visible_from = row.visible_from
+    if visible_from is not None and visible_from.tzinfo is None:
+        visible_from = visible_from.replace(tzinfo=timezone.utc)
+    return {
+        'alert': json.loads(row.payload),
+        'garden_id': row.garden_id,
+        'space_id': row.space_id,
+        'tracking_id': row.tracking_id,
+        'position': row.position or 0,
+        'visible_from': visible_from
+    }
+
+def _claim_materialization(user_id, today):
+    """Lock the user's materialization marker (creating it if needed) until the caller commits.
+
+    Polls racing on a user's first load or a day rollover then rebuild one
+    after the other instead of both inserting the marker and the alert rows.
+    """
+    query = db.session.query(AlertMaterialization).filter_by(user_id=user_id).with_for_update()
+    state = query.one_or_none()
+    if state is None:
+        try:
+            with db.session.begin_nested():
+                state = AlertMaterialization(user_id=user_id, computed_for=today)
+                db.session.add(state)
+            return state
+        except IntegrityError:
+            # Another poll inserted the marker first: wait for its lock and rebuild after it
+            state = query.populate_existing().one()
+    state.computed_for = today
+    return state
+
+def materialize_user_alerts(user_id, today=None):
+    """Recompute and store every alert for a user. Returns the stored entries.
+
+    The caller is responsible for committing the session.
+    """
+    today = today or datetime.now().date()
+    _claim_materialization(user_id, today)
+    entries = _space_entries(user_id, today) + _tracking_entries(user_id, today)
+
+    MaterializedAlert.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+    _store_entries(user_id, entries, today)
+    db.session.flush()
+    return entries
+
+def load_smart_alerts(user_id, today=None):
+    """Serve the smart alert payload from the materialized alert rows.
+
+    A single indexed read returns the user's materialization day and stored
+    alerts; the rows are only recomputed when they are missing or from an
+    earlier day. Completed actions are one indexed range read over the last
+    COMPLETED_ACTIONS_DAYS. Returns (alerts, completed_actions).
+    """
+    today = today or datetime.now().date()
+    now = datetime.now(timezone.utc)
+
+    rows = db.session.query(AlertMaterialization.computed_for, MaterializedAlert).outerjoin(
+        MaterializedAlert, MaterializedAlert.user_id == AlertMaterialization.user_id
+    ).filter(AlertMaterialization.user_id == user_id).all()
+
+    if not rows or rows[0][0] != today:
+        entries = materialize_user_alerts(user_id, today)
+        db.session.commit()
+        print(f"🔄 Materialized {len(entries)} alerts for user {user_id}")
+    else:
+        entries = [_load_entry(row) for _, row in rows if row is not None]
+
+    return _finalize_alerts(entries, _load_completed_actions(user_id, today), now)
+
+def _is_materialized_for(user_id, today):
+    state = db.session.get(AlertMaterialization, user_id)
+    return state is not None and state.computed_for == today
+
+def refresh_space_alerts(user_id, space_ids, today=None):
+    """Recompute the materialized alerts of the given grid spaces only.
+
+    Call after modifying the spaces and before committing. If the user's
+    alerts are not materialized for today, nothing is done: the next poll
+    rebuilds them in full.
+    """
+    today = today or datetime.now().date()
+    space_ids = [int(space_id) for space_id in space_ids if space_id is not None]
+    if not space_ids or not _is_materialized_for(user_id, today):
+        return
+    MaterializedAlert.query.filter(
+        MaterializedAlert.user_id == user_id,
+        MaterializedAlert.space_id.in_(space_ids)
+    ).delete(synchronize_session=False)
+    _store_entries(user_id, _space_entries(user_id, today, space_ids=space_ids, refresh=True), today)
+
+def refresh_tracking_alerts(user_id, tracking_ids, today=None):
+    """Recompute the materialized alerts of the given PlantTracking rows only"""
+    today = today or datetime.now().date()
+    tracking_ids = [int(tracking_id) for tracking_id in tracking_ids if tracking_id is not None]
+    if not tracking_ids or not _is_materialized_for(user_id, today):
+        return
+    MaterializedAlert.query.filter(
+        MaterializedAlert.user_id == user_id,
+        MaterializedAlert.tracking_id.in_(tracking_ids)
+    ).delete(synchronize_session=False)
+    _store_entries(user_id, _tracking_entries(user_id, today, tracking_ids=tracking_ids, refresh=True), today)
+
+def invalidate_user_alerts(user_id):
+    """Drop a user's materialization marker so the next poll rebuilds every alert.
+
+    Used for changes that can affect many alerts at once (garden renames,
+    plant edits, deletions).
+    """
+    # 'evaluate' also drops a loaded marker from the session, so a rebuild in the same request inserts a fresh one
+    AlertMaterialization.query.filter_by(user_id=user_id).delete(synchronize_session='evaluate')
+
+def rollover_materialized_alerts(today=None):
+    """Daily job: rebuild alerts for every user materialized on an earlier day.
+
+    Returns the number of users refreshed.
+    """
+    today = today or datetime.now().date()
+    stale_user_ids = [
+        user_id for (user_id,) in db.session.query(AlertMaterialization.user_id).filter(
+            AlertMaterialization.computed_for < today
+        ).all()
+    ]
+    for user_id in stale_user_ids:
+        materialize_user_alerts(user_id, today)
+        db.session.commit()
+    return len(stale_user_ids)
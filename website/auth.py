@@ -4,43 +4,21 @@ from werkzeug.security import generate_password_hash
 from werkzeug.utils import secure_filename
 from .models import db, User, Admin, UserSubscription, ActivityLog
 from .email_service import send_email_verification
+from .cache import get_cache
+from .log_store import log_history_change
 from datetime import datetime
 import os
 import re
 
 auth = Blueprint('auth', __name__)
 
-def log_history_change(table_name, record_id, action, old_values, new_values, changed_by):
-    """Log history changes - accesses _HISTORY_LOGS from views module"""
-    try:
-        # Import at function level to avoid circular imports
-        from . import views
-        
-        field_changes = []
-        if old_values and new_values:
-            for key in new_values:
-                if key in old_values and old_values[key] != new_values[key]:
-                    field_changes.append(key)
-        elif new_values:
-            field_changes = list(new_values.keys())
-        elif old_values:
-            field_changes = list(old_values.keys())
-        
-        history_log = {
-            'id': len(views._HISTORY_LOGS) + 1,
-            'table_name': table_name,
-            'record_id': record_id,
-            'action': action,
-            'old_values': old_values,
-            'new_values': new_values,
-            'changed_by': changed_by,
-            'timestamp': datetime.now().isoformat(),
-            'field_changes': field_changes
-        }
-        views._HISTORY_LOGS.append(history_log)
-        print(f"📋 HISTORY LOG: {table_name} - {action} - Record {record_id} by {changed_by}")
-    except Exception as e:
-        print(f"Error logging history change: {str(e)}")
+# Short-lived cache for /auth/status, shared across workers when a networked backend is configured
+_AUTH_STATUS_CACHE = get_cache('auth_status', ttl=5, max_entries=5000)
+
+def clear_auth_status_cache(user_id):
+    """Drop a user's cached auth status so plan or profile changes show up immediately"""
+    _AUTH_STATUS_CACHE.delete(f"auth_status_{user_id}")
+    print(f"🔐 Cleared auth status cache for user {user_id}")
 
 @auth.route('/login', methods=['GET', 'POST'])
 def login():
@@ -76,7 +54,8 @@ def login():
                         action='LOGIN',
                         old_values={'last_login': None},
                         new_values={'last_login': datetime.now().isoformat()},
-                        changed_by=user.email or f"user_{user.id}"
+                        changed_by=user.email or f"user_{user.id}",
+                        user_id=user.id
                     )
                 except Exception as e:
                     print(f"Error logging login history: {str(e)}")
@@ -251,25 +230,16 @@ def register():
 # Frontend-friendly aliases under /auth/*
 @auth.route('/auth/status', methods=['GET'])
 def auth_status():
-    # Simple caching for auth status to prevent spam
-    import time
-    current_time = time.time()
-    
     # Check if we have cached auth status for this user
     if current_user.is_authenticated:
         user_id = current_user.id
         cache_key = f"auth_status_{user_id}"
         
         # Check cache (5 second TTL for auth status)
-        if hasattr(auth_status, '_cache') and cache_key in auth_status._cache:
-            cached_data, cache_time = auth_status._cache[cache_key]
-            if current_time - cache_time < 5:  # 5 seconds cache
-                print(f"🔐 Auth status cache hit for user {user_id}")
-                return jsonify(cached_data)
-        
-        # Initialize cache if not exists
-        if not hasattr(auth_status, '_cache'):
-            auth_status._cache = {}
+        cached_data = _AUTH_STATUS_CACHE.get(cache_key)
+        if cached_data is not None:
+            print(f"🔐 Auth status cache hit for user {user_id}")
+            return jsonify(cached_data)
         
         # Create fresh auth status data
         user = current_user
@@ -331,7 +301,7 @@ def auth_status():
             }
         
         # Cache the result
-        auth_status._cache[cache_key] = (auth_data, current_time)
+        _AUTH_STATUS_CACHE.set(cache_key, auth_data)
         print(f"🔐 Auth status cached for user {user_id}")
         return jsonify(auth_data)
     
@@ -351,6 +321,8 @@ def logout_alias():
     # Get user info before logout
     user_id = current_user.id
     user_email = current_user.email or f"user_{user_id}"
+    # Admin ids overlap user ids, so only user accounts are recorded for the log user filter
+    account_id = user_id if isinstance(current_user._get_current_object(), User) else None
     
     logout_user()
     
@@ -362,7 +334,8 @@ def logout_alias():
             action='LOGOUT',
             old_values={'session_active': True},
             new_values={'session_active': False},
-            changed_by=user_email
+            changed_by=user_email,
+            user_id=account_id
         )
     except Exception as e:
         print(f"Error logging logout history: {str(e)}")
@@ -519,6 +492,8 @@ def logout():
     # Get user info before logout
     user_id = current_user.id
     user_email = current_user.email or f"user_{user_id}"
+    # Admin ids overlap user ids, so only user accounts are recorded for the log user filter
+    account_id = user_id if isinstance(current_user._get_current_object(), User) else None
     
     logout_user()
     
@@ -530,7 +505,8 @@ def logout():
             action='LOGOUT',
             old_values={'session_active': True},
             new_values={'session_active': False},
-            changed_by=user_email
+            changed_by=user_email,
+            user_id=account_id
         )
     except Exception as e:
         print(f"Error logging logout history: {str(e)}")
@@ -0,0 +1,199 @@
+"""Shared cache for AI, weather, crop customization and auth status results.
+
+Each cache is a namespace on one backend:
+- LocalCache (default): per-process LRU with TTL expiry, an entry limit and
+  approximate memory accounting.
+- RedisCache: any Redis-compatible server, shared by every gunicorn worker.
+  Enable with CACHE_BACKEND=redis and CACHE_REDIS_URL (needs the redis package).
+
+Values must be JSON-serializable. Backend errors are logged and treated as
+misses so a cache outage never fails a request.
+"""
+from collections import OrderedDict
+import json
+import os
+import threading
+import time
+
+_KEY_PREFIX = 'egrowtify'
+_DEFAULT_MAX_BYTES = 16 * 1024 * 1024  # per namespace
+
+_caches = {}
+_caches_lock = threading.Lock()
+_redis_client = None
+
+
+class _Counters:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'sets': self.sets,
+            'evictions': self.evictions,
+            'errors': self.errors,
+        }
+
+
+class LocalCache:
+    """Thread-safe in-process LRU cache with per-entry TTL and a byte budget."""
+
+    backend = 'local'
+
+    def __init__(self, namespace, ttl, max_entries=1000, max_bytes=_DEFAULT_MAX_BYTES):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.counters = _Counters()
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters.misses += 1
+                return None
+            if entry[1] <= time.time():
+                self._remove(key)
+                self.counters.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.time() + (ttl or self.ttl), size)
+            self._bytes += size
+            self.counters.sets += 1
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.counters.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        self._bytes -= self._entries.pop(key)[2]
+
+    def stats(self):
+        with self._lock:
+            stats = self.counters.as_dict()
+            stats.update({'backend': self.backend, 'entries': len(self._entries), 'bytes': self._bytes,
+                          'max_entries': self.max_entries, 'max_bytes': self.max_bytes})
+        return stats
+
+
+class RedisCache:
+    """Cache namespace stored on a Redis-compatible server (get/set ex/delete/scan_iter)."""
+
+    backend = 'redis'
+
+    def __init__(self, namespace, ttl, client):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.client = client
+        self.counters = _Counters()
+        self._prefix = f"{_KEY_PREFIX}:{namespace}:"
+
+    def get(self, key):
+        try:
+            raw = self.client.get(self._prefix + key)
+        except Exception as e:
+            self._error('get', e)
+            return None
+        if raw is None:
+            self.counters.misses += 1
+            return None
+        self.counters.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        try:
+            self.client.set(self._prefix + key, json.dumps(value, default=str), ex=int(ttl or self.ttl))
+            self.counters.sets += 1
+        except Exception as e:
+            self._error('set', e)
+
+    def delete(self, key):
+        try:
+            self.client.delete(self._prefix + key)
+        except Exception as e:
+            self._error('delete', e)
+
+    def clear(self):
+        try:
+            keys = list(self.client.scan_iter(match=self._prefix + '*'))
+            if keys:
+                self.client.delete(*keys)
+        except Exception as e:
+            self._error('clear', e)
+
+    def _error(self, operation, error):
+        self.counters.errors += 1
+        print(f"⚠️ Cache {operation} failed for '{self.namespace}': {error}")
+
+    def stats(self):
+        stats = self.counters.as_dict()
+        stats['backend'] = self.backend
+        return stats
+
+
+def _get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        try:
+            import redis
+        except ImportError:
+            print("⚠️ CACHE_BACKEND=redis but the redis package is not installed; using local caches")
+            return None
+        _redis_client = redis.Redis.from_url(os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'),
+                                             socket_timeout=0.5, socket_connect_timeout=0.5)
+    return _redis_client
+
+
+def get_cache(namespace, ttl, max_entries=1000, max_bytes=_DEFAULT_MAX_BYTES, client=None):
+    """Return the cache for namespace, creating it on the configured backend on first use"""
+    cache = _caches.get(namespace)
+    if cache is not None:
+        return cache
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            if client is None and os.getenv('CACHE_BACKEND', 'local').lower() == 'redis':
+                client = _get_redis_client()
+            if client is not None:
+                cache = RedisCache(namespace, ttl, client)
+            else:
+                cache = LocalCache(namespace, ttl, max_entries=max_entries, max_bytes=max_bytes)
+            _caches[namespace] = cache
+    return cache
+
+
+def cache_stats():
+    """Hit/miss/eviction counters (and local memory use) for every cache namespace"""
+    return {namespace: cache.stats() for namespace, cache in list(_caches.items())}
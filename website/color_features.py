@@ -0,0 +1,171 @@
+"""Color features for the offline plant and soil heuristics.
+
+extract_features() computes every statistic the fallbacks use - channel means
+and ratios, the purple/orange masks, edge density and HSV histograms - in one
+pass over a uint8 RGB/HSV pair, reusing per-thread scratch buffers instead of
+allocating float copies of the whole image for each statistic. The result is
+a fixed-length float32 vector (see FEATURE_NAMES) that rule-based heuristics
+read by name and a local classifier can take as-is.
+"""
+import threading
+import numpy as np
+
+HUE_BINS = 16  # PIL hue 0-255 >> 4
+SAT_BINS = 8  # 0-255 >> 5
+VAL_BINS = 8
+
+SCALAR_FEATURES = (
+    'mean_red', 'mean_green', 'mean_blue',  # 0-255
+    'red_ratio', 'green_ratio', 'blue_ratio',  # mean of channel / (r+g+b)
+    'brightness',  # 0-255
+    'purple_ratio', 'orange_ratio', 'edge_density',  # fraction of pixels
+)
+FEATURE_NAMES = SCALAR_FEATURES + tuple(
+    [f'hue_{i}' for i in range(HUE_BINS)]
+    + [f'sat_{i}' for i in range(SAT_BINS)]
+    + [f'val_{i}' for i in range(VAL_BINS)]
+)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+# Orange = hue 20-45 degrees, saturation >= 0.45, value >= 0.25, expressed on PIL's uint8 HSV scale
+ORANGE_HUE = (15, 31)
+ORANGE_MIN_SAT = 115
+ORANGE_MIN_VAL = 64
+PURPLE_MIN_RED = 100  # purple = red > 100, green < 100, blue > 100
+PURPLE_MAX_GREEN = 100
+PURPLE_MIN_BLUE = 100
+EDGE_THRESHOLD = 30.0  # |d/dy| + |d/dx| of the gray image
+
+_local = threading.local()
+
+
+class ColorFeatures:
+    """A feature vector with access by name: features['green_ratio']"""
+
+    __slots__ = ('vector',)
+
+    def __init__(self, vector):
+        self.vector = vector
+
+    def __getitem__(self, name):
+        return float(self.vector[FEATURE_INDEX[name]])
+
+    def histogram(self, channel):
+        """Normalized 'hue', 'sat' or 'val' histogram"""
+        start = FEATURE_INDEX[f'{channel}_0']
+        bins = {'hue': HUE_BINS, 'sat': SAT_BINS, 'val': VAL_BINS}[channel]
+        return self.vector[start:start + bins]
+
+    def to_dict(self):
+        return {name: round(float(value), 4) for name, value in zip(FEATURE_NAMES, self.vector)}
+
+
+class _Buffers:
+    """Scratch arrays for one image shape, reused by every call on this thread"""
+
+    def __init__(self, shape):
+        self.rgb = np.empty((3,) + shape, dtype=np.uint8)  # planar copies: contiguous channels
+        self.hsv = np.empty((3,) + shape, dtype=np.uint8)
+        self.rgb_float = np.empty((3,) + shape, dtype=np.float32)
+        self.total = np.empty(shape, dtype=np.float32)
+        self.ratio = np.empty(shape, dtype=np.float32)
+        self.grad_y = np.empty(shape, dtype=np.float32)
+        self.grad_x = np.empty(shape, dtype=np.float32)
+        self.mask = np.empty(shape, dtype=bool)
+        self.mask2 = np.empty(shape, dtype=bool)
+        self.ones = np.ones(shape[0] * shape[1], dtype=np.float32)
+
+
+def _buffers(shape):
+    cached = getattr(_local, 'buffers', None)
+    if cached is None or cached.total.shape != shape:
+        cached = _Buffers(shape)
+        _local.buffers = cached
+    return cached
+
+
+def _gradient_abs(gray, out, axis):
+    """|np.gradient(gray, axis=axis)| written into out without temporaries"""
+    n = gray.shape[axis]
+    if n < 2:
+        out.fill(0)
+        return out
+    take = (lambda a, s: a[s, :]) if axis == 0 else (lambda a, s: a[:, s])
+    if n > 2:
+        interior = take(out, slice(1, -1))
+        np.subtract(take(gray, slice(2, None)), take(gray, slice(None, -2)), out=interior)
+        np.multiply(interior, 0.5, out=interior)
+    np.subtract(take(gray, slice(1, 2)), take(gray, slice(0, 1)), out=take(out, slice(0, 1)))
+    np.subtract(take(gray, slice(-1, None)), take(gray, slice(-2, -1)), out=take(out, slice(-1, None)))
+    return np.abs(out, out=out)
+
+
+def _fraction(mask):
+    return np.count_nonzero(mask) / mask.size
+
+
+def _histogram(channel, shift, bins, out, mask):
+    """Normalized histogram of channel >> shift, from counts below each bin edge (no int64 copy)"""
+    below = np.empty(bins + 1)
+    below[0], below[bins] = 0, channel.size
+    for i in range(1, bins):
+        np.less(channel, i << shift, out=mask)
+        below[i] = np.count_nonzero(mask)
+    np.subtract(below[1:], below[:-1], out=out)
+    out /= channel.size
+
+
+def extract_features(rgb, hsv):
+    """Compute the FEATURE_NAMES vector from uint8 (H, W, 3) RGB and HSV arrays of the same image"""
+    shape = np.shape(rgb)[:2]
+    buf = _buffers(shape)
+    pixels = shape[0] * shape[1]
+    vector = np.zeros(len(FEATURE_NAMES), dtype=np.float32)
+    np.copyto(buf.rgb, np.moveaxis(np.asarray(rgb), 2, 0), casting='unsafe')
+    np.copyto(buf.hsv, np.moveaxis(np.asarray(hsv), 2, 0), casting='unsafe')
+    np.copyto(buf.rgb_float, buf.rgb)
+    red, green, blue = buf.rgb
+    flat = buf.rgb_float.reshape(3, -1)
+
+    # Channel means and per-pixel ratios as dot products; total doubles as 3x the gray image
+    vector[0:3] = flat @ buf.ones / pixels
+    vector[FEATURE_INDEX['brightness']] = vector[0:3].mean()
+    np.add(buf.rgb_float[0], buf.rgb_float[1], out=buf.total)
+    buf.total += buf.rgb_float[2]
+    np.maximum(buf.total, 1.0, out=buf.ratio)
+    np.reciprocal(buf.ratio, out=buf.ratio)
+    vector[3:6] = flat @ buf.ratio.ravel() / pixels
+
+    # Purple mask on the uint8 channels
+    np.greater(red, PURPLE_MIN_RED, out=buf.mask)
+    np.less(green, PURPLE_MAX_GREEN, out=buf.mask2)
+    buf.mask &= buf.mask2
+    np.greater(blue, PURPLE_MIN_BLUE, out=buf.mask2)
+    buf.mask &= buf.mask2
+    vector[FEATURE_INDEX['purple_ratio']] = _fraction(buf.mask)
+
+    # Edge density of the gray image (mean of RGB)
+    gray = np.multiply(buf.total, np.float32(1 / 3), out=buf.ratio)
+    _gradient_abs(gray, buf.grad_y, 0)
+    _gradient_abs(gray, buf.grad_x, 1)
+    buf.grad_y += buf.grad_x
+    np.greater(buf.grad_y, EDGE_THRESHOLD, out=buf.mask)
+    vector[FEATURE_INDEX['edge_density']] = _fraction(buf.mask)
+
+    # Orange mask and histograms on the uint8 HSV channels
+    hue, sat, val = buf.hsv
+    np.greater_equal(hue, ORANGE_HUE[0], out=buf.mask)
+    np.less_equal(hue, ORANGE_HUE[1], out=buf.mask2)
+    buf.mask &= buf.mask2
+    np.greater_equal(sat, ORANGE_MIN_SAT, out=buf.mask2)
+    buf.mask &= buf.mask2
+    np.greater_equal(val, ORANGE_MIN_VAL, out=buf.mask2)
+    buf.mask &= buf.mask2
+    vector[FEATURE_INDEX['orange_ratio']] = _fraction(buf.mask)
+
+    offset = len(SCALAR_FEATURES)
+    for channel, shift, bins in ((hue, 4, HUE_BINS), (sat, 5, SAT_BINS), (val, 5, VAL_BINS)):
+        _histogram(channel, shift, bins, vector[offset:offset + bins], buf.mask)
+        offset += bins
+
+    return ColorFeatures(vector)
@@ -0,0 +1,39 @@
+"""Opaque keyset cursors shared by the paginated admin APIs.
+
+A cursor is the list of sort key values a page ended on, JSON encoded and
+wrapped in unpadded URL-safe base64. Datetimes are written as ISO 8601
+strings; callers that know which values are datetimes parse them back.
+Anything that does not decode to a list raises InvalidCursor, which the
+endpoints turn into a 400.
+"""
+from datetime import datetime
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    """A page cursor that was not handed out by the listing it was passed to"""
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot put {type(value).__name__} in a cursor")
+
+
+def encode_cursor(values):
+    """Opaque cursor for the sort key values a page ended on"""
+    raw = json.dumps(list(values), separators=(',', ':'), default=_json_value).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """The list of values encoded in cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        values = json.loads(raw)
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(values, list):
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+    return values
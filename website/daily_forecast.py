@@ -0,0 +1,68 @@
+"""Daily summaries of the OpenWeatherMap 5-day / 3-hour forecast.
+
+The forecast is a flat list of 3-hourly steps. summarize_forecast groups the
+steps into days (by the date part of dt_txt, consecutive steps only, as the
+endpoints always did) and reduces all days at once on a (days, steps) numpy
+matrix instead of per-step Python appends. weather.get_daily_forecast caches
+the result next to the forecast it came from, so it is computed once per
+location per upstream refresh and shared by every endpoint that needs daily
+figures.
+"""
+import numpy as np
+
+
+def summarize_forecast(forecast):
+    """JSON-ready daily summary of a /forecast response.
+
+    Returns {'days': [...]} with one entry per day in forecast order, holding
+    date, samples, temp_min/temp_max/temp_mean (°C), humidity_mean (%),
+    wind_mean (m/s), rain_total (mm over the day's 3-hour steps) and
+    conditions (distinct descriptions in order of first appearance).
+    """
+    items = (forecast or {}).get('list') or []
+    if not items:
+        return {'days': []}
+
+    dates = np.array([item['dt_txt'].split(' ')[0] for item in items])
+    temps = np.array([item['main']['temp'] for item in items], dtype=np.float64)
+    humidity = np.array([item['main']['humidity'] for item in items], dtype=np.float64)
+    wind = np.array([item['wind']['speed'] for item in items], dtype=np.float64)
+    rain = np.array([item['rain'].get('3h', 0) if 'rain' in item else 0 for item in items], dtype=np.float64)
+
+    starts = np.flatnonzero(np.concatenate(([True], dates[1:] != dates[:-1])))
+    counts = np.diff(np.append(starts, len(items)))
+    rows = np.repeat(np.arange(len(starts)), counts)
+    cols = np.arange(len(items)) - np.repeat(starts, counts)
+
+    def by_day(values, fill):
+        """(days, steps) matrix of values, padded with fill"""
+        matrix = np.full((len(starts), counts.max()), fill)
+        matrix[rows, cols] = values
+        return matrix
+
+    def day_sums(values):
+        # Left-to-right accumulation (zero padding is exact), so totals match a plain sum()
+        return np.add.accumulate(by_day(values, 0.0), axis=1)[:, -1]
+
+    temp_min = np.min(by_day(temps, np.inf), axis=1)
+    temp_max = np.max(by_day(temps, -np.inf), axis=1)
+    temp_mean = day_sums(temps) / counts
+    humidity_mean = day_sums(humidity) / counts
+    wind_mean = day_sums(wind) / counts
+    rain_total = day_sums(rain)
+
+    days = []
+    for d, start in enumerate(starts):
+        end = start + counts[d]
+        days.append({
+            'date': str(dates[start]),
+            'samples': int(counts[d]),
+            'temp_min': float(temp_min[d]),
+            'temp_max': float(temp_max[d]),
+            'temp_mean': float(temp_mean[d]),
+            'humidity_mean': float(humidity_mean[d]),
+            'wind_mean': float(wind_mean[d]),
+            'rain_total': float(rain_total[d]),
+            'conditions': list(dict.fromkeys(item['weather'][0]['description'] for item in items[start:end])),
+        })
+    return {'days': days}
@@ -0,0 +1,208 @@
+"""Offline, rule-based plant and soil enrichment driven by data/enrichment_rules.json.
+
+The rule file (or ENRICHMENT_RULES_FILE) holds:
+  care_patterns     care aspect -> ordered regexes over a wiki description
+  crop_rules        ordered keyword lists -> canned care/issues/yield for a crop
+  soil_classes      ordered keywords -> soil type class (default_soil_type otherwise)
+  soil_plants       soil type class -> skill level -> recommended plants
+  response_phrases  phrase groups used to read AI care responses
+
+It is parsed and compiled once per process: regexes are precompiled and each
+keyword table (crop rules, soil classes, every phrase group) becomes a
+KeywordTable. Tables the size of the shipped file are scanned keyword by
+keyword, which is the fastest lookup at that size; larger tables are looked
+up through a word index, so their cost follows the words of the text rather
+than the number of rules. Keywords keep their substring semantics ('rose'
+matches 'primrose') and the first matching rule still wins.
+"""
+import copy
+import functools
+import json
+import os
+import re
+import threading
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'enrichment_rules.json')
+
+# Keyword tables this size or larger are looked up through the word index instead of scanned
+INDEX_MIN_KEYWORDS = int(os.getenv('ENRICHMENT_INDEX_MIN_KEYWORDS', '250'))
+# Distinct words whose keyword hits each indexed table remembers
+WORD_CACHE_SIZE = int(os.getenv('ENRICHMENT_WORD_CACHE_SIZE', '20000'))
+
+_rules = None
+_rules_lock = threading.Lock()
+
+
+class KeywordTable:
+    """Which entries of an ordered list of keyword groups occur (as substrings) in a text.
+
+    A small table is scanned keyword by keyword: a few dozen C-level substring
+    tests are cheaper than any index. From INDEX_MIN_KEYWORDS keywords on, the
+    keywords are indexed by word instead. Every occurrence of a keyword lies
+    on whitespace-separated words of the text: a single-word keyword inside
+    one word, the first and last words of a phrase at the end and start of
+    two words, and the words in between as whole words. So each keyword is
+    filed under its longest word - a whole-word key when it is an inner word,
+    a contained key otherwise - and a lookup only checks the text's distinct
+    words against those keys. The hits of each word are kept in an LRU cache
+    of WORD_CACHE_SIZE words, so a word seen before costs a cache hit;
+    phrases are then confirmed against the whole text.
+    """
+
+    def __init__(self, groups):
+        self._groups = [tuple(keywords) for keywords in groups]
+        self._indexed = sum(len(keywords) for keywords in self._groups) >= INDEX_MIN_KEYWORDS
+        if not self._indexed:
+            return
+        self._contained = {}  # key -> [(group index, keyword, keyword is the key)]
+        self._whole = {}  # inner word of a longer phrase -> [(group index, phrase, False)]
+        self._unkeyed = []  # keywords with no words (blank or whitespace), checked on every text
+        for index, keywords in enumerate(self._groups):
+            for keyword in keywords:
+                words = keyword.split()
+                if len(words) > 2:
+                    self._whole.setdefault(max(words[1:-1], key=len), []).append((index, keyword, False))
+                elif words:
+                    key = max(words, key=len)
+                    self._contained.setdefault(key, []).append((index, keyword, keyword == key))
+                else:
+                    self._unkeyed.append((index, keyword, False))
+        self._word_hits = functools.lru_cache(maxsize=WORD_CACHE_SIZE)(self._hits)
+
+    def _hits(self, word):
+        contained = [entry for key, entries in self._contained.items() if key in word for entry in entries]
+        return tuple(contained + self._whole.get(word, []))
+
+    def matches(self, *texts):
+        """Indexes of the groups with a keyword in any of the (lowercased) texts"""
+        if not self._indexed:
+            return {index for index, keywords in enumerate(self._groups)
+                    if any(keyword in text for text in texts for keyword in keywords)}
+        found = set()
+        for text in texts:
+            hits = [self._unkeyed] + [self._word_hits(word) for word in set(text.split())]
+            for entries in hits:
+                for index, keyword, is_key in entries:
+                    if index not in found and (is_key or keyword in text):
+                        found.add(index)
+        return found
+
+    def first(self, *texts):
+        """Index of the first group with a keyword in any of the texts, or None"""
+        if not self._indexed:
+            for index, keywords in enumerate(self._groups):
+                for keyword in keywords:
+                    for text in texts:
+                        if keyword in text:
+                            return index
+            return None
+        found = self.matches(*texts)
+        return min(found) if found else None
+
+    def search(self, text):
+        """True if any keyword occurs in the text"""
+        if not self._indexed:
+            for keywords in self._groups:
+                for keyword in keywords:
+                    if keyword in text:
+                        return True
+            return False
+        return bool(self.matches(text))
+
+
+class RuleBook:
+    def __init__(self, data):
+        self.care_patterns = {
+            aspect: [(re.compile(rule['pattern']), rule['value']) for rule in rules]
+            for aspect, rules in data.get('care_patterns', {}).items()
+        }
+        self.crop_rules = [(tuple(k.lower() for k in rule['keywords']), rule['enrichment'])
+                           for rule in data.get('crop_rules', [])]
+        self.crop_table = KeywordTable(keywords for keywords, _ in self.crop_rules)
+        self.soil_classes = [(tuple(k.lower() for k in rule['keywords']), rule['soil_type'])
+                             for rule in data.get('soil_classes', [])]
+        self.soil_table = KeywordTable(keywords for keywords, _ in self.soil_classes)
+        self.default_soil_type = data.get('default_soil_type', 'Mixed Soil')
+        self.soil_plants = data.get('soil_plants', {})
+        self.phrases = {group: tuple(p.lower() for p in phrases)
+                        for group, phrases in data.get('response_phrases', {}).items()}
+        self.phrase_tables = {group: KeywordTable((phrase,) for phrase in phrases)
+                              for group, phrases in self.phrases.items()}
+
+    def infer_care(self, text):
+        """Care hints (sunlight/watering/soil) read from free text such as a wiki description"""
+        if not isinstance(text, str) or not text.strip():
+            return {}
+        lower = text.lower()
+        care = {}
+        for aspect, patterns in self.care_patterns.items():
+            for pattern, value in patterns:
+                if pattern.search(lower):
+                    care[aspect] = value
+                    break
+        return care
+
+    def crop_enrichment(self, name, text=''):
+        """A copy of the first crop rule whose keywords appear in name or text, or None"""
+        index = self.crop_table.first((name or '').lower(), (text or '').lower())
+        return copy.deepcopy(self.crop_rules[index][1]) if index is not None else None
+
+    def soil_type(self, text):
+        """Soil type class (e.g. 'Loam Soil') for a free-text soil description"""
+        index = self.soil_table.first((text or '').lower())
+        return self.soil_classes[index][1] if index is not None else self.default_soil_type
+
+    def recommended_plants(self, soil_type, level):
+        """Curated plants for a soil type and skill level, or None if there is no list"""
+        plants = self.soil_plants.get(soil_type, {}).get(level)
+        return copy.deepcopy(plants) if plants else None
+
+    def find_phrases(self, group, text):
+        """Phrases from response_phrases[group] contained in text, in table order"""
+        table = self.phrase_tables.get(group)
+        if table is None:
+            return []
+        found = table.matches((text or '').lower())
+        return [phrase for index, phrase in enumerate(self.phrases[group]) if index in found]
+
+    def has_phrase(self, group, text):
+        table = self.phrase_tables.get(group)
+        return table is not None and table.search((text or '').lower())
+
+def load_rules(path=None):
+    with open(path or os.getenv('ENRICHMENT_RULES_FILE', DEFAULT_RULES_FILE), encoding='utf-8') as f:
+        return RuleBook(json.load(f))
+
+
+def get_rules():
+    global _rules
+    if _rules is None:
+        with _rules_lock:
+            if _rules is None:
+                _rules = load_rules()
+    return _rules
+
+
+def infer_care(text):
+    return get_rules().infer_care(text)
+
+
+def crop_enrichment(scientific_name, display_name, text=''):
+    """Rule-based enrichment for common crops; matches the scientific name, else the display name"""
+    return get_rules().crop_enrichment(scientific_name or display_name, text)
+
+
+def classify_soil(text):
+    return get_rules().soil_type(text)
+
+
+def recommended_plants(soil_type, level):
+    return get_rules().recommended_plants(soil_type, level)
+
+
+def find_phrases(group, text):
+    return get_rules().find_phrases(group, text)
+
+
+def has_phrase(group, text):
+    return get_rules().has_phrase(group, text)
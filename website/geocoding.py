@@ -0,0 +1,110 @@
+"""City-to-coordinates lookups backed by the geocode_locations table.
+
+City coordinates never change, so each normalized city is geocoded upstream
+once and then served from a per-process dict warmed from the database.
+"""
+from sqlalchemy import select
+from .models import db, Garden, GeocodeLocation
+from . import http_client
+import re
+import time
+
+GEOCODE_URL = "http://api.openweathermap.org/geo/1.0/direct"
+_MISS_TTL_SECONDS = 60 * 60  # don't re-ask the geocoder about unknown cities for an hour
+
+_coordinates = {}  # city_key -> (lat, lon)
+_misses = {}  # city_key -> time of the failed lookup
+_table_loaded = False
+_table_failed_at = None  # time of the last failed table load
+_LOAD_RETRY_SECONDS = 5 * 60  # after a failed load, serve upstream lookups this long before retrying
+
+
+def normalize_city(city):
+    """'  Cebu City ,  PH ' -> 'cebu city,ph'"""
+    if not city:
+        return ''
+    key = ' '.join(str(city).lower().split())
+    return re.sub(r'\s*,\s*', ',', key)[:120]
+
+
+def _load_table():
+    global _table_loaded, _table_failed_at
+    if _table_loaded:
+        return
+    if _table_failed_at and time.time() - _table_failed_at < _LOAD_RETRY_SECONDS:
+        return
+    try:
+        # Own connection, so a failed SELECT never aborts the request's transaction
+        with db.engine.connect() as connection:
+            rows = connection.execute(
+                select(GeocodeLocation.city_key, GeocodeLocation.lat, GeocodeLocation.lon)).all()
+    except Exception as e:
+        # Table may not exist yet; fall back to upstream lookups and try the table again later
+        _table_failed_at = time.time()
+        print(f"⚠️ Geocode cache unavailable: {e}")
+        return
+    for city_key, lat, lon in rows:
+        _coordinates[city_key] = (lat, lon)
+    _table_loaded = True
+
+
+def _fetch(city, city_key, api_key):
+    response = http_client.get(GEOCODE_URL, params={'q': city, 'limit': 1, 'appid': api_key})
+    if response.status_code != 200:
+        return None
+    results = response.json()
+    if not results:
+        # Only remember definite misses, not upstream errors
+        _misses[city_key] = time.time()
+        return None
+
+    place = results[0]
+    coordinates = (place['lat'], place['lon'])
+    _coordinates[city_key] = coordinates
+    try:
+        # Own connection and transaction, so the caller's session is never committed or rolled back here
+        with db.engine.begin() as connection:
+            connection.execute(GeocodeLocation.__table__.insert().values(
+                city_key=city_key,
+                name=place.get('name'),
+                country=place.get('country'),
+                state=place.get('state'),
+                lat=place['lat'],
+                lon=place['lon']
+            ))
+    except Exception as e:
+        # Another worker may have stored the same city first
+        print(f"⚠️ Could not store geocode for '{city_key}': {e}")
+    return coordinates
+
+
+def lookup_coordinates(city, api_key):
+    """Return (lat, lon) for city, or None if the geocoder doesn't know it"""
+    city_key = normalize_city(city)
+    if not city_key:
+        return None
+
+    _load_table()
+    coordinates = _coordinates.get(city_key)
+    if coordinates:
+        return coordinates
+
+    missed_at = _misses.get(city_key)
+    if missed_at and time.time() - missed_at < _MISS_TTL_SECONDS:
+        return None
+
+    return _fetch(city, city_key, api_key)
+
+
+def preload_garden_cities(api_key):
+    """Geocode every distinct Garden.location_city not cached yet. Returns the number added."""
+    _load_table()
+    cities = db.session.query(Garden.location_city).filter(Garden.location_city.isnot(None)).distinct()
+    added = 0
+    for (city,) in cities:
+        city_key = normalize_city(city)
+        if not city_key or city_key in _coordinates:
+            continue
+        if _fetch(city, city_key, api_key):
+            added += 1
+    return added
@@ -0,0 +1,225 @@
+"""Shared outbound HTTP client for OpenWeatherMap, Plant.id and OpenAI.
+
+Every external call goes through one pooled requests.Session so connections
+are kept alive per host, requests are bounded by a default timeout, 429/5xx
+responses are retried with backoff, and each upstream's latency is recorded.
+"""
+from collections import deque
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import os
+import threading
+import time
+import requests
+
+# (connect, read) seconds; callers may pass their own timeout for slow upstreams
+DEFAULT_TIMEOUT = (3.05, 10)
+OPENAI_TIMEOUT = 30
+POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))
+MAX_RETRY_AFTER_SECONDS = 10
+_LATENCY_SAMPLES = 200
+
+# Hostname -> upstream name used for metrics
+_UPSTREAMS = {
+    'api.openweathermap.org': 'openweathermap',
+    'api.plant.id': 'plant.id',
+    'api.openai.com': 'openai',
+}
+
+_session = None
+_session_lock = threading.Lock()
+_openai_clients = {}
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+class _Retry(Retry):
+    """Retry policy that only replays POST bodies on 429 and caps Retry-After."""
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        # A POST that reached the upstream may have been processed (and billed);
+        # only a 429 guarantees it was not
+        if method and method.upper() == 'POST' and status_code != 429:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER_SECONDS)
+
+
+def _build_session():
+    retry = _Retry(
+        total=3,
+        connect=2,
+        read=0,
+        status=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS', 'POST']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=len(_UPSTREAMS) * 2, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'User-Agent': 'eGrowtify/1.0'})
+    return session
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def upstream_for(url):
+    host = urlsplit(url).hostname or ''
+    return _UPSTREAMS.get(host, host)
+
+
+def _record(upstream, elapsed_ms, status_code=None, retries=0, error=False):
+    with _metrics_lock:
+        stats = _metrics.get(upstream)
+        if stats is None:
+            stats = _metrics[upstream] = {
+                'requests': 0,
+                'errors': 0,
+                'retries': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'last_status': None,
+                'samples': deque(maxlen=_LATENCY_SAMPLES),
+            }
+        stats['requests'] += 1
+        stats['retries'] += retries
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        stats['samples'].append(elapsed_ms)
+        if status_code is not None:
+            stats['last_status'] = status_code
+        if error or (status_code is not None and status_code >= 400):
+            stats['errors'] += 1
+
+
+def request(method, url, upstream=None, **kwargs):
+    """Send a request through the shared session and record its latency.
+
+    Accepts the same keyword arguments as requests.request. A timeout is
+    always applied; exceptions propagate to the caller unchanged.
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    upstream = upstream or upstream_for(url)
+    started = time.perf_counter()
+    try:
+        response = get_session().request(method, url, **kwargs)
+    except requests.RequestException:
+        _record(upstream, (time.perf_counter() - started) * 1000, error=True)
+        raise
+    history = getattr(getattr(response.raw, 'retries', None), 'history', None) or ()
+    _record(upstream, (time.perf_counter() - started) * 1000, response.status_code, retries=len(history))
+    return response
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def _retry_after_seconds(response, attempt):
+    """Seconds to wait before replaying a 429: Retry-After if given (capped), else backoff"""
+    try:
+        return min(float(response.headers.get('retry-after', '')), MAX_RETRY_AFTER_SECONDS)
+    except ValueError:
+        return 0.5 * (2 ** attempt)
+
+
+def _openai_http_client():
+    """httpx client for the OpenAI SDK that feeds the same latency metrics.
+
+    The SDK's own retries are disabled (they replay POSTs after timeouts,
+    connection errors and 5xx, which may already have been billed); the
+    transport replays a request only on 429, like _Retry does for post().
+    """
+    import httpx
+
+    class RateLimitRetryTransport(httpx.HTTPTransport):
+        def handle_request(self, req):
+            for attempt in range(3):
+                response = super().handle_request(req)
+                if response.status_code != 429:
+                    return response
+                response.close()
+                req.extensions['retries'] = attempt + 1
+                time.sleep(_retry_after_seconds(response, attempt))
+            return super().handle_request(req)
+
+    def on_request(req):
+        req.extensions['started'] = time.perf_counter()
+
+    def on_response(resp):
+        started = resp.request.extensions.get('started', time.perf_counter())
+        _record('openai', (time.perf_counter() - started) * 1000, resp.status_code,
+                retries=resp.request.extensions.get('retries', 0))
+
+    return httpx.Client(
+        timeout=OPENAI_TIMEOUT,
+        transport=RateLimitRetryTransport(
+            limits=httpx.Limits(max_connections=POOL_MAXSIZE, max_keepalive_connections=POOL_MAXSIZE)
+        ),
+        event_hooks={'request': [on_request], 'response': [on_response]},
+    )
+
+
+def get_openai_client(api_key):
+    """Return a cached OpenAI SDK client for api_key with a bounded timeout and 429-only retries.
+
+    The SDK gets its own pooled httpx client, which also sidesteps the
+    'proxies' argument error newer httpx versions raise when the SDK builds one.
+    Raises if the SDK is unusable so callers can fall back to post().
+    """
+    client = _openai_clients.get(api_key)
+    if client is not None:
+        return client
+    from openai import OpenAI
+    with _session_lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            client = OpenAI(api_key=api_key, max_retries=0, http_client=_openai_http_client())
+            _openai_clients[api_key] = client
+    return client
+
+
+def get_metrics():
+    """Per-upstream request counts and latency percentiles in milliseconds"""
+    snapshot = {}
+    with _metrics_lock:
+        for upstream, stats in _metrics.items():
+            samples = sorted(stats['samples'])
+            snapshot[upstream] = {
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'retries': stats['retries'],
+                'avg_ms': round(stats['total_ms'] / stats['requests'], 1),
+                'p50_ms': round(samples[len(samples) // 2], 1) if samples else None,
+                'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1) if samples else None,
+                'max_ms': round(stats['max_ms'], 1),
+                'last_status': stats['last_status'],
+            }
+    return snapshot
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
@@ -0,0 +1,121 @@
+"""Decode-once preprocessing for uploaded plant photos.
+
+prepare_image() decodes an upload a single time (JPEGs in PIL draft mode, so
+a 12 MP phone photo is decoded at reduced scale instead of full size), applies
+the EXIF rotation and keeps a small RGB copy. Every consumer - the content
+hash for the AI result cache and the color heuristics in ai_plant_recognition -
+derives its arrays from that copy.
+
+upstream_image_b64() is the other direction: it re-encodes an upload to the
+bounded size/quality configured for each provider before it is base64-encoded
+into an OpenAI or Plant.id request.
+"""
+from PIL import Image, ImageOps
+import base64
+import io
+import os
+import numpy as np
+from .color_features import extract_features
+
+FINGERPRINT_SIZE = (512, 512)  # longest side kept after decoding
+HEURISTIC_SIZE = (224, 224)  # size the color heuristics work at
+
+# provider -> (longest side in px, JPEG quality) for images sent upstream.
+# OpenAI scales vision inputs to fit 2048px and then 768px on the short side;
+# Plant.id recommends ~1500px. Larger uploads only cost bandwidth and latency.
+UPSTREAM_LIMITS = {
+    'openai': (int(os.getenv('OPENAI_IMAGE_MAX_SIDE', '1536')), int(os.getenv('OPENAI_IMAGE_QUALITY', '85'))),
+    'plant_id': (int(os.getenv('PLANT_ID_IMAGE_MAX_SIDE', '1500')), int(os.getenv('PLANT_ID_IMAGE_QUALITY', '85'))),
+}
+
+
+class PreparedImage:
+    """An upload decoded once; RGB/HSV/gray arrays are computed on first use."""
+
+    def __init__(self, image):
+        self.image = image  # RGB, at most FINGERPRINT_SIZE
+        self._small = None
+        self._rgb = None
+        self._hsv = None
+        self._gray = None
+        self._features = None
+
+    def fingerprint_bytes(self):
+        """Size-prefixed pixel bytes used for the content hash"""
+        return f"{self.image.size}".encode('ascii') + self.image.tobytes()
+
+    def _heuristic_image(self):
+        if self._small is None:
+            self._small = self.image.resize(HEURISTIC_SIZE)
+        return self._small
+
+    @property
+    def rgb(self):
+        """float32 array (224, 224, 3)"""
+        if self._rgb is None:
+            self._rgb = np.asarray(self._heuristic_image(), dtype=np.float32)
+        return self._rgb
+
+    @property
+    def hsv(self):
+        """uint8 array (224, 224, 3) with PIL's 0-255 hue/saturation/value scale"""
+        if self._hsv is None:
+            self._hsv = np.asarray(self._heuristic_image().convert('HSV'), dtype=np.uint8)
+        return self._hsv
+
+    @property
+    def gray(self):
+        """float32 array (224, 224), mean of the RGB channels"""
+        if self._gray is None:
+            self._gray = np.mean(self.rgb, axis=2)
+        return self._gray
+
+    @property
+    def features(self):
+        """ColorFeatures of the 224px image (see color_features.FEATURE_NAMES)"""
+        if self._features is None:
+            self._features = extract_features(np.asarray(self._heuristic_image()), self.hsv)
+        return self._features
+
+
+def prepare_image(image_bytes):
+    """Decode image_bytes once into a PreparedImage, or None if it isn't a readable image"""
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        # JPEG only: let the decoder scale down by up to 8x while staying above 2x the kept size
+        img.draft('RGB', (FINGERPRINT_SIZE[0] * 2, FINGERPRINT_SIZE[1] * 2))
+        img = ImageOps.exif_transpose(img).convert('RGB')
+        img.thumbnail(FINGERPRINT_SIZE)
+        return PreparedImage(img)
+    except Exception:
+        return None
+
+
+def downscale_for_upstream(image_bytes, provider):
+    """JPEG bytes of image_bytes bounded by UPSTREAM_LIMITS[provider].
+
+    Small JPEGs are passed through untouched; anything else is decoded (in draft
+    mode for JPEGs), rotated per EXIF and re-encoded. Undecodable bytes are
+    returned as-is so the provider can report the error.
+    """
+    max_side, quality = UPSTREAM_LIMITS[provider]
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        if img.format == 'JPEG' and max(img.size) <= max_side and img.getexif().get(0x0112, 1) == 1:
+            return image_bytes
+        img.draft('RGB', (max_side, max_side))
+        img = ImageOps.exif_transpose(img).convert('RGB')
+        img.thumbnail((max_side, max_side))
+        out = io.BytesIO()
+        img.save(out, 'JPEG', quality=quality)
+        resized = out.getvalue()
+        print(f"🖼️ Resized upload for {provider}: {len(image_bytes) // 1024} KB -> {len(resized) // 1024} KB ({img.size[0]}x{img.size[1]})")
+        return resized
+    except Exception as e:
+        print(f"⚠️ Could not resize upload for {provider}, sending original: {e}")
+        return image_bytes
+
+
+def upstream_image_b64(image_bytes, provider):
+    """Base64 string of the downscaled image, ready for a JSON payload or data: URL"""
+    return base64.b64encode(downscale_for_upstream(image_bytes, provider)).decode('utf-8')
@@ -0,0 +1,220 @@
+"""Background execution of slow AI analyses, backed by the analysis_jobs table.
+
+A request creates a job row, commits, and calls submit_job(); the job then runs
+either on this process's worker pool (ANALYSIS_WORKER_MODE=thread, default) or
+is left queued for run_analysis_worker.py (ANALYSIS_WORKER_MODE=external).
+Both paths claim a job with a conditional UPDATE, so a job runs at most once.
+In thread mode, the web entry point (main.py) calls start_worker_pool() to
+resubmit the jobs left queued when the server last stopped. Other scripts that
+call create_app() leave the queue alone. Jobs interrupted mid-run are requeued
+by a single owner only: run_analysis_worker.py when it starts, or the
+sweep_stale_work.py cron job in thread mode. A restarting web worker must
+not requeue a job that another live worker is still running.
+
+Other background work (admin reports) runs through submit_task() on its own
+named pool, so a burst of long report builds cannot hold up analyses. Its
+table shares the lifecycle above through claim(), requeue_stale(),
+run_pending() and resubmit_queued(), which take the model as a parameter.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from .models import db, AnalysisJob
+import json
+import os
+import threading
+import traceback
+
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '4'))
+REPORT_WORKERS = int(os.getenv('REPORT_WORKERS', '1'))
+STALE_JOB_SECONDS = 10 * 60  # running jobs older than this are assumed lost
+
+# pool name -> number of threads
+POOL_WORKERS = {'analysis': ANALYSIS_WORKERS, 'reports': REPORT_WORKERS}
+
+_handlers = {}  # job_type -> callable(job) returning a JSON-serializable result
+_failure_handlers = {}  # job_type -> callable(job) run in the transaction that marks the job failed
+_executors = {}  # pool name -> ThreadPoolExecutor
+_executor_lock = threading.Lock()
+
+
+def register_handler(job_type, handler, on_failure=None):
+    """Run handler(job) for jobs of this type; on_failure(job) undoes side effects of a failed job
+    (e.g. refunds a credit reserved when it was queued)"""
+    _handlers[job_type] = handler
+    if on_failure:
+        _failure_handlers[job_type] = on_failure
+
+
+def _worker_mode():
+    return os.getenv('ANALYSIS_WORKER_MODE', 'thread').lower()
+
+
+def runs_in_process():
+    """True when queued work runs on this process's pools (thread mode), False with an external worker"""
+    return _worker_mode() != 'external'
+
+
+def _get_executor(pool='analysis'):
+    executor = _executors.get(pool)
+    if executor is None:
+        with _executor_lock:
+            executor = _executors.get(pool)
+            if executor is None:
+                executor = _executors[pool] = ThreadPoolExecutor(max_workers=POOL_WORKERS[pool],
+                                                                 thread_name_prefix=pool)
+    return executor
+
+
+def create_job(job_type, user_id, payload, space_id=None):
+    """Add a queued job to the session; the caller commits and then calls submit_job()"""
+    job = AnalysisJob(
+        job_type=job_type,
+        user_id=user_id,
+        space_id=space_id,
+        payload=json.dumps(payload),
+        status='queued'
+    )
+    db.session.add(job)
+    db.session.flush()
+    return job
+
+
+def submit_job(job_id):
+    """Start a committed job on the worker pool (no-op when an external worker is used)"""
+    if not runs_in_process():
+        return
+    app = current_app._get_current_object()
+    _get_executor().submit(_run_in_app, app, job_id)
+
+
+def submit_task(pool, func, *args):
+    """Run func(*args) in an app context on the named pool (no-op when an external worker is used).
+
+    For other queued work (e.g. admin reports on the 'reports' pool) whose rows
+    the external worker also polls. Returns True when the task was scheduled here.
+    """
+    if not runs_in_process():
+        return False
+    app = current_app._get_current_object()
+    _get_executor(pool).submit(_call_in_app, app, func, *args)
+    return True
+
+
+def _call_in_app(app, func, *args):
+    with app.app_context():
+        try:
+            func(*args)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            db.session.remove()
+
+
+def _run_in_app(app, job_id):
+    with app.app_context():
+        try:
+            run_job(job_id)
+        finally:
+            db.session.remove()
+
+
+def claim(model, row_id):
+    """Move a queued row of a work table (analysis_jobs, admin_reports) to running and count
+    the attempt. The UPDATE is conditional, so only one worker gets True."""
+    now = datetime.now(timezone.utc)
+    claimed = model.query.filter_by(id=row_id, status='queued').update(
+        {'status': 'running', 'started_at': now, 'attempts': model.attempts + 1},
+        synchronize_session=False
+    )
+    db.session.commit()
+    return claimed == 1
+
+
+def run_job(job_id):
+    """Claim and execute one queued job. Returns False if another worker already took it."""
+    if not claim(AnalysisJob, job_id):
+        return False
+
+    job = db.session.get(AnalysisJob, job_id)
+    handler = _handlers.get(job.job_type)
+    try:
+        if handler is None:
+            raise ValueError(f"No handler registered for job type '{job.job_type}'")
+        result = handler(job)
+        job.result = json.dumps(result)
+        job.status = 'done'
+        job.finished_at = datetime.now(timezone.utc)
+        db.session.commit()
+        print(f"✅ Analysis job {job_id} ({job.job_type}) finished")
+    except Exception as e:
+        print(f"❌ Analysis job {job_id} failed: {e}")
+        traceback.print_exc()
+        db.session.rollback()
+        job = db.session.get(AnalysisJob, job_id)
+        job.status = 'failed'
+        job.error = str(e)[:1000]
+        job.finished_at = datetime.now(timezone.utc)
+        on_failure = _failure_handlers.get(job.job_type)
+        if on_failure:
+            on_failure(job)
+        db.session.commit()
+    return True
+
+
+def requeue_stale(model, max_age_seconds):
+    """Put rows of a work table whose worker died mid-run back in the queue. Returns the number requeued."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+    requeued = model.query.filter(
+        model.status == 'running',
+        model.started_at < cutoff
+    ).update({'status': 'queued'}, synchronize_session=False)
+    db.session.commit()
+    return requeued
+
+
+def queued_ids(model, limit=None):
+    """Ids of a work table's queued rows, oldest first"""
+    query = (db.session.query(model.id)
+             .filter(model.status == 'queued')
+             .order_by(model.created_at, model.id))
+    row_ids = [row_id for (row_id,) in (query.limit(limit) if limit else query)]
+    db.session.commit()
+    return row_ids
+
+
+def run_pending(model, run, limit):
+    """Call run(row_id) on queued rows oldest first; returns how many it ran (run returned True)"""
+    return sum(1 for row_id in queued_ids(model, limit) if run(row_id))
+
+
+def resubmit_queued(model, submit, noun):
+    """Hand every queued row of a work table to submit(row_id). Returns the number submitted."""
+    row_ids = queued_ids(model)
+    for row_id in row_ids:
+        submit(row_id)
+    if row_ids:
+        print(f"🔁 Resubmitted {len(row_ids)} queued {noun}(s)")
+    return len(row_ids)
+
+
+def requeue_stale_jobs(max_age_seconds=STALE_JOB_SECONDS):
+    """Put jobs whose worker died mid-run back in the queue. Returns the number requeued."""
+    return requeue_stale(AnalysisJob, max_age_seconds)
+
+
+def run_pending_jobs(limit=50):
+    """Run queued jobs oldest first (used by the external worker). Returns the number run."""
+    return run_pending(AnalysisJob, run_job, limit)
+
+
+def start_worker_pool():
+    """Start this process's worker pool and hand it the jobs still queued.
+
+    Called by the web entry point in an app context. Running jobs are left
+    alone, even old ones (see requeue_stale_jobs). Returns the number of jobs submitted.
+    """
+    if not runs_in_process():
+        return 0
+    _get_executor()
+    return resubmit_queued(AnalysisJob, submit_job, 'analysis job')
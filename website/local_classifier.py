@@ -0,0 +1,179 @@
+"""Optional CPU-only plant classifier that answers common crops before Plant.id.
+
+A softmax regression over the color feature vector (color_features.py),
+trained by train_local_classifier.py on photos users uploaded for plants they
+had already named. identify() returns a Plant.id-shaped response when the top
+class clears LOCAL_CLASSIFIER_MIN_CONFIDENCE and the photo lies within that
+class's training spread (softmax is confidently wrong on photos unlike any
+class), and None otherwise, so ambiguous photos are still sent upstream.
+Without a trained model file nothing changes.
+
+Settings: LOCAL_CLASSIFIER_PATH (default uploads/models/local_plant_classifier.npz),
+LOCAL_CLASSIFIER_MIN_CONFIDENCE (default 0.85), LOCAL_CLASSIFIER_ENABLED (default true).
+"""
+from datetime import datetime, timezone
+import os
+import threading
+import numpy as np
+
+DEFAULT_MODEL_PATH = os.path.join(os.getcwd(), 'uploads', 'models', 'local_plant_classifier.npz')
+MIN_CONFIDENCE = float(os.getenv('LOCAL_CLASSIFIER_MIN_CONFIDENCE', '0.85'))
+
+_model = None
+_model_mtime = None
+_model_lock = threading.Lock()
+
+
+class LocalPlantClassifier:
+    """Standardized features -> linear scores -> softmax over the trained labels"""
+
+    def __init__(self, labels, mean, std, weights, bias, centroids, radii, trained_at='', samples=0):
+        self.labels = [str(label) for label in labels]
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.centroids = np.asarray(centroids, dtype=np.float32)  # per class, standardized
+        self.radii = np.asarray(radii, dtype=np.float32)  # 95th percentile distance to the centroid
+        self.trained_at = str(trained_at)
+        self.samples = int(samples)
+
+    def predict_proba(self, vectors):
+        """Class probabilities for a (n, features) array"""
+        x = (np.atleast_2d(vectors) - self.mean) / self.std
+        scores = x @ self.weights + self.bias
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict(self, vector):
+        """(label, probability, familiar) for the most likely class; familiar is False
+        when the photo is further from that class's training photos than 95% of them"""
+        proba = self.predict_proba(vector)[0]
+        best = int(np.argmax(proba))
+        distance = np.linalg.norm((np.asarray(vector) - self.mean) / self.std - self.centroids[best])
+        return self.labels[best], float(proba[best]), bool(distance <= self.radii[best])
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, labels=np.array(self.labels), mean=self.mean, std=self.std,
+                     weights=self.weights, bias=self.bias, centroids=self.centroids, radii=self.radii,
+                     trained_at=np.array(self.trained_at), samples=np.array(self.samples))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['labels'], data['mean'], data['std'], data['weights'], data['bias'],
+                       data['centroids'], data['radii'], data['trained_at'][()], data['samples'][()])
+
+    @classmethod
+    def train(cls, vectors, labels, epochs=400, learning_rate=0.5, l2=1e-3):
+        """Fit by full-batch gradient descent; vectors is (n, features), labels a list of names"""
+        x = np.asarray(vectors, dtype=np.float32)
+        classes = sorted(set(labels))
+        index = {label: i for i, label in enumerate(classes)}
+        y = np.zeros((len(labels), len(classes)), dtype=np.float32)
+        targets = np.array([index[label] for label in labels])
+        y[np.arange(len(labels)), targets] = 1.0
+
+        mean = x.mean(axis=0)
+        std = x.std(axis=0)
+        std[std < 1e-6] = 1.0
+        x = (x - mean) / std
+        weights = np.zeros((x.shape[1], len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        for _ in range(epochs):
+            scores = x @ weights + bias
+            scores -= scores.max(axis=1, keepdims=True)
+            proba = np.exp(scores)
+            proba /= proba.sum(axis=1, keepdims=True)
+            error = (proba - y) / len(x)
+            weights -= learning_rate * (x.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+        centroids = np.array([x[targets == i].mean(axis=0) for i in range(len(classes))])
+        radii = np.array([np.percentile(np.linalg.norm(x[targets == i] - centroids[i], axis=1), 95)
+                          for i in range(len(classes))])
+        return cls(classes, mean, std, weights, bias, centroids, radii,
+                   datetime.now(timezone.utc).isoformat(timespec='seconds'), len(labels))
+
+
+def evaluate(model, vectors, labels, min_confidence=MIN_CONFIDENCE):
+    """Accuracy over all samples, plus coverage and accuracy of the ones answered locally"""
+    predictions = [model.predict(vector) for vector in vectors]
+    correct = np.array([label == expected for (label, _, _), expected in zip(predictions, labels)], dtype=bool)
+    answered = np.array([familiar and probability >= min_confidence
+                         for _, probability, familiar in predictions], dtype=bool)
+    return {
+        'accuracy': float(correct.mean()) if len(correct) else 0.0,
+        'coverage': float(answered.mean()) if len(answered) else 0.0,
+        'local_accuracy': float(correct[answered].mean()) if answered.any() else 0.0,
+    }
+
+
+def training_samples():
+    """(image_path, label) pairs for photos whose plant the user had already named.
+
+    Grid space photos (the images AIUsageTracking.image_path points to) are
+    labelled by the space's plant; plant photos by the plant itself.
+    """
+    from .models import GridSpace, Plant
+    samples = {}
+    rows = (GridSpace.query.join(Plant, GridSpace.plant_id == Plant.id)
+            .filter(GridSpace.image_path.isnot(None))
+            .with_entities(GridSpace.image_path, Plant.name))
+    for image_path, name in rows:
+        samples[image_path] = name
+    for image_path, name in Plant.query.filter(Plant.image_path.isnot(None)).with_entities(Plant.image_path, Plant.name):
+        samples.setdefault(image_path, name)
+    return [(path, normalize_label(name)) for path, name in samples.items() if name and name.strip()]
+
+
+def normalize_label(name):
+    return ' '.join(name.split()).title()
+
+
+def model_path():
+    return os.getenv('LOCAL_CLASSIFIER_PATH', DEFAULT_MODEL_PATH)
+
+
+def get_model():
+    """The trained model, reloaded when the file changes; None if disabled or not trained yet"""
+    global _model, _model_mtime
+    if os.getenv('LOCAL_CLASSIFIER_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        return None
+    path = model_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if mtime != _model_mtime:
+        with _model_lock:
+            if mtime != _model_mtime:
+                try:
+                    _model = LocalPlantClassifier.load(path)
+                    print(f"🌱 Loaded local plant classifier ({len(_model.labels)} classes, {_model.samples} samples, trained {_model.trained_at})")
+                except Exception as e:
+                    print(f"⚠️ Could not load local plant classifier from {path}: {e}")
+                    _model = None
+                _model_mtime = mtime
+    return _model
+
+
+def identify(prepared, min_confidence=None):
+    """Plant.id-shaped result for a PreparedImage the local model is sure about, else None"""
+    model = get_model()
+    if model is None or prepared is None:
+        return None
+    label, probability, familiar = model.predict(prepared.features.vector)
+    if not familiar or probability < (MIN_CONFIDENCE if min_confidence is None else min_confidence):
+        return None
+    return {
+        'source': 'local_classifier',
+        'suggestions': [{
+            'plant_name': label,
+            'probability': probability,
+            'plant_details': {'common_names': [label]}
+        }]
+    }
@@ -0,0 +1,323 @@
+"""Durable admin activity, subscription and history logs, backed by the audit_logs table.
+
+log_activity / log_subscription_activity / log_history_change only append the
+entry to an in-process buffer, so logging never adds a database round trip to
+the request. A background flusher writes the buffer with one multi-row INSERT
+every LOG_FLUSH_INTERVAL seconds, or as soon as LOG_FLUSH_BATCH entries are
+waiting; it also flushes at interpreter exit. Readers call query_logs /
+count_logs, which flush first and then run indexed time-range queries;
+page_logs / iter_logs / count_matching add user, action and status filters
+and keyset (cursor) pagination for the admin log APIs and their NDJSON
+exports. History entries carry the user_id of the user account that made
+the change; changes made by admins have none.
+
+Set LOG_STORE_MODE=sync to write each entry immediately instead (scripts,
+tests). If the database is unavailable, entries stay buffered (at most
+LOG_BUFFER_MAX, oldest dropped first) and are retried on the next flush.
+"""
+from datetime import datetime, timedelta, timezone
+from flask import current_app, has_app_context, has_request_context, request
+from sqlalchemy import and_, func, or_, select
+from .models import db, AuditLog
+from .cursors import InvalidCursor, encode_cursor, decode_cursor
+import atexit
+import json
+import os
+import threading
+import traceback
+
+LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', '2'))
+LOG_FLUSH_BATCH = int(os.getenv('LOG_FLUSH_BATCH', '200'))
+LOG_BUFFER_MAX = int(os.getenv('LOG_BUFFER_MAX', '50000'))
+KINDS = ('activity', 'subscription', 'history')
+
+_buffer = []  # rows waiting to be inserted, oldest first
+_buffer_lock = threading.Lock()
+_flush_lock = threading.Lock()  # one flush at a time per process
+_wake = threading.Event()
+_app = None
+_flusher = None
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _sync_mode():
+    return os.getenv('LOG_STORE_MODE', 'async').lower() == 'sync'
+
+
+def _start_flusher(app):
+    global _app, _flusher
+    _app = app
+    if _flusher is None:
+        _flusher = threading.Thread(target=_flush_loop, name='log-flusher', daemon=True)
+        _flusher.start()
+        atexit.register(flush)
+
+
+def _flush_loop():
+    while True:
+        _wake.wait(LOG_FLUSH_INTERVAL)
+        _wake.clear()
+        try:
+            flush()
+        except Exception:
+            traceback.print_exc()
+
+
+def append(kind, entry, user_id=None, status=None):
+    """Buffer one log entry; it reaches the database on the next flush"""
+    row = {
+        'kind': kind,
+        'user_id': user_id,
+        'action': str(entry.get('action') or '')[:50],
+        'status': status,
+        'created_at': _utcnow(),
+        'payload': json.dumps(entry, default=str),
+    }
+    with _buffer_lock:
+        _buffer.append(row)
+        if len(_buffer) > LOG_BUFFER_MAX:
+            del _buffer[:len(_buffer) - LOG_BUFFER_MAX]
+            print(f"⚠️ Log buffer full, dropped oldest entries (keeping {LOG_BUFFER_MAX})")
+        pending = len(_buffer)
+
+    if has_app_context():
+        app = current_app._get_current_object()
+        if _sync_mode():
+            flush(app)
+            return
+        if _flusher is None or _app is not app:
+            _start_flusher(app)
+    if pending >= LOG_FLUSH_BATCH:
+        _wake.set()
+
+
+def flush(app=None):
+    """Write every buffered entry in one batch. Returns the number written."""
+    app = app or (current_app._get_current_object() if has_app_context() else _app)
+    if app is None:
+        return 0
+    with _flush_lock:
+        with _buffer_lock:
+            rows = _buffer[:]
+            del _buffer[:]
+        if not rows:
+            return 0
+        try:
+            with app.app_context():
+                # Core insert on its own connection, so a request's session is never committed or rolled back here
+                with db.engine.begin() as connection:
+                    connection.execute(AuditLog.__table__.insert(), rows)
+            return len(rows)
+        except Exception as e:
+            print(f"❌ Failed to write {len(rows)} log entries, will retry: {e}")
+            with _buffer_lock:
+                _buffer[:0] = rows
+                if len(_buffer) > LOG_BUFFER_MAX:
+                    del _buffer[:len(_buffer) - LOG_BUFFER_MAX]
+            return 0
+
+
+def _encode_log_cursor(created_at, log_id):
+    return encode_cursor([created_at, log_id])
+
+
+def _decode_log_cursor(cursor):
+    try:
+        created_at, log_id = decode_cursor(cursor)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except InvalidCursor:
+        raise
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def parse_time(value):
+    """Naive UTC datetime from an ISO 8601 date or datetime string (None passes through)"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _conditions(kind, since=None, until=None, user_id=None, action=None, status=None):
+    table = AuditLog.__table__
+    conditions = [table.c.kind == kind]
+    if user_id is not None:
+        conditions.append(table.c.user_id == user_id)
+    if action:
+        conditions.append(table.c.action == action)
+    if status:
+        conditions.append(table.c.status == status)
+    if since is not None:
+        conditions.append(table.c.created_at >= since)
+    if until is not None:
+        conditions.append(table.c.created_at < until)
+    return conditions
+
+
+def _select(kind, since=None, until=None, user_id=None, action=None, status=None, after=None):
+    """Newest-first select of (id, created_at, payload) for one kind and its filters.
+
+    Every filter combination leads with kind and ends with created_at, so it
+    is served by one of the audit_logs indexes; paging continues strictly
+    after the (created_at, id) of the previous page's last row instead of
+    using OFFSET.
+    """
+    table = AuditLog.__table__
+    query = select(table.c.id, table.c.created_at, table.c.payload).where(
+        *_conditions(kind, since, until, user_id, action, status))
+    if after is not None:
+        created_at, log_id = after
+        query = query.where(or_(table.c.created_at < created_at,
+                                and_(table.c.created_at == created_at, table.c.id < log_id)))
+    return query.order_by(table.c.created_at.desc(), table.c.id.desc())
+
+
+def _entry(log_id, created_at, payload):
+    entry = json.loads(payload)
+    entry['id'] = log_id
+    entry['timestamp'] = created_at.replace(tzinfo=timezone.utc).isoformat()
+    return entry
+
+
+def page_logs(kind, since=None, until=None, user_id=None, action=None, status=None, cursor=None, limit=100):
+    """One page of entries, newest first, and the cursor of the next page (None on the last page).
+
+    since/until are naive UTC datetimes (since <= time < until); user_id,
+    action and status match the indexed columns exactly. Raises InvalidCursor
+    for a cursor this function did not hand out.
+    """
+    flush()
+    after = _decode_log_cursor(cursor) if cursor else None
+    rows = db.session.execute(
+        _select(kind, since, until, user_id, action, status, after).limit(limit + 1)
+    ).all()
+    next_cursor = _encode_log_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return [_entry(*row) for row in rows[:limit]], next_cursor
+
+
+def iter_logs(kind, since=None, until=None, user_id=None, action=None, status=None, batch=1000):
+    """Every matching entry, newest first, fetched one keyset page at a time (for streaming exports)"""
+    flush()
+    after = None
+    while True:
+        rows = db.session.execute(
+            _select(kind, since, until, user_id, action, status, after).limit(batch)
+        ).all()
+        for row in rows:
+            yield _entry(*row)
+        if len(rows) < batch:
+            return
+        after = (rows[-1].created_at, rows[-1].id)
+
+
+def count_matching(kind, since=None, until=None, user_id=None, action=None, status=None):
+    """Number of entries page_logs would return over all pages for the same filters"""
+    flush()
+    return db.session.execute(
+        select(func.count()).select_from(AuditLog.__table__).where(
+            *_conditions(kind, since, until, user_id, action, status))
+    ).scalar()
+
+
+def query_logs(kind, since=None, until=None, limit=1000):
+    """Entries of one kind with since <= time < until (UTC), newest first"""
+    return page_logs(kind, since=since, until=until, limit=limit)[0]
+
+
+def count_logs(since=None):
+    """{kind: count} plus {'subscription:<status>': count} for entries since a UTC time, in one query"""
+    flush()
+    query = db.session.query(AuditLog.kind, AuditLog.status, func.count(AuditLog.id))
+    if since is not None:
+        query = query.filter(AuditLog.created_at >= since)
+    counts = {kind: 0 for kind in KINDS}
+    for kind, status, count in query.group_by(AuditLog.kind, AuditLog.status):
+        counts[kind] = counts.get(kind, 0) + count
+        if kind == 'subscription' and status:
+            counts[f'subscription:{status}'] = counts.get(f'subscription:{status}', 0) + count
+    return counts
+
+
+def range_start(date_range, now=None):
+    """UTC start of an admin report date range ('1d', '7d', '30d', '90d'; default 7 days)"""
+    days = {'1d': 1, '7d': 7, '30d': 30, '90d': 90}.get(date_range, 7)
+    return (now or _utcnow()) - timedelta(days=days)
+
+
+def log_activity(user_id, user_name, action, description, ip_address=None, user_agent=None, status='success'):
+    """Log user activity"""
+    try:
+        if has_request_context():
+            ip_address = ip_address or request.remote_addr
+            user_agent = user_agent or request.headers.get('User-Agent', '')
+        activity = {
+            'user_id': user_id,
+            'user_name': user_name,
+            'action': action,
+            'description': description,
+            'ip_address': ip_address,
+            'user_agent': user_agent or '',
+            'status': status
+        }
+        append('activity', activity, user_id=user_id, status=status)
+        print(f"📝 ACTIVITY LOG: {user_name} ({user_id}) - {action}: {description}")
+    except Exception as e:
+        print(f"Error logging activity: {str(e)}")
+
+
+def log_subscription_activity(user_id, user_name, action, plan_name, amount, currency, payment_method, status, subscription_id=None):
+    """Log subscription-related activity"""
+    try:
+        now = datetime.now(timezone.utc)
+        subscription_log = {
+            'user_id': user_id,
+            'user_name': user_name,
+            'action': action,
+            'plan_name': plan_name,
+            'amount': amount,
+            'currency': currency,
+            'payment_method': payment_method,
+            'status': status,
+            'start_date': now.isoformat(),
+            'end_date': (now + timedelta(days=30)).isoformat() if status == 'active' else None,
+            'subscription_id': subscription_id
+        }
+        append('subscription', subscription_log, user_id=user_id, status=status)
+        print(f"💳 SUBSCRIPTION LOG: {user_name} ({user_id}) - {action}: {plan_name} - {currency} {amount}")
+    except Exception as e:
+        print(f"Error logging subscription activity: {str(e)}")
+
+
+def log_history_change(table_name, record_id, action, old_values, new_values, changed_by, user_id=None):
+    """Log database changes (user_id: the user account that made the change, for the user filter)"""
+    try:
+        # Determine which fields changed
+        field_changes = []
+        if old_values and new_values:
+            for key in new_values:
+                if key in old_values and old_values[key] != new_values[key]:
+                    field_changes.append(key)
+        elif new_values:
+            field_changes = list(new_values.keys())
+        elif old_values:
+            field_changes = list(old_values.keys())
+
+        history_log = {
+            'table_name': table_name,
+            'record_id': record_id,
+            'action': action,
+            'old_values': old_values,
+            'new_values': new_values,
+            'changed_by': changed_by,
+            'field_changes': field_changes
+        }
+        append('history', history_log, user_id=user_id)
+        print(f"📋 HISTORY LOG: {table_name} - {action} - Record {record_id} by {changed_by}")
+    except Exception as e:
+        print(f"Error logging history change: {str(e)}")
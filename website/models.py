@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import event, inspect
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timezone, timedelta
+import json
 import secrets
 import uuid
 
@@ -9,6 +11,11 @@ db = SQLAlchemy()
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # keyset pagination of the admin user listings (see user_directory.SORTS)
+        db.Index('ix_users_created_id', 'created_at', 'id'),
+        db.Index('ix_users_name_id', 'lastname', 'firstname', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -27,7 +34,8 @@ class User(UserMixin, db.Model):
     email_verified = db.Column(db.Boolean, default=False)  # Email verification status
     email_verification_token = db.Column(db.String(100), unique=True)  # Verification token
     email_verification_expires = db.Column(db.DateTime)  # Token expiration
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # NOT NULL: the admin listings page by (created_at, id), and NULL never compares
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
     @property
@@ -141,6 +149,10 @@ class PlantTracking(db.Model):
 
 class GridSpace(db.Model):
     __tablename__ = 'grid_spaces'
+    __table_args__ = (
+        db.Index('ix_grid_spaces_garden_active', 'GARDEN_ID', 'IS_ACTIVE'),
+        db.Index('ix_grid_spaces_plant_image_updated', 'PLANT_ID', 'IMAGE_PATH', 'LAST_UPDATED'),
+    )
     id = db.Column('SPACE_ID', db.Integer, primary_key=True)
     garden_id = db.Column('GARDEN_ID', db.Integer, db.ForeignKey('garden.GARDEN_ID', ondelete='CASCADE'), nullable=False)
     grid_position = db.Column('GRID_POSITION', db.String(10), nullable=False)  # Format: "row,column" (e.g., "1,1", "2,3")
@@ -220,6 +232,9 @@ class Feedback(db.Model):
 
 class LearningPathContent(db.Model):
     __tablename__ = 'learning_path_content'
+    __table_args__ = (
+        db.Index('ix_learning_path_content_difficulty_type_active', 'path_difficulty', 'content_type', 'is_active'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     path_difficulty = db.Column(db.String(20), nullable=False)  # 'Beginner', 'Intermediate', 'Expert'
@@ -299,6 +314,11 @@ class SubscriptionPlan(db.Model):
 
 class UserSubscription(db.Model):
     __tablename__ = 'user_subscriptions'
+    __table_args__ = (
+        db.Index('ix_user_subscriptions_user_status', 'user_id', 'status'),
+        db.Index('ix_user_subscriptions_paid_at', 'paid_at'),
+        db.Index('ix_user_subscriptions_cancelled_at', 'cancelled_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
@@ -310,6 +330,10 @@ class UserSubscription(db.Model):
     total_paid = db.Column(db.Numeric(10, 2), default=0.00)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    # When the payment settled / the subscription was cancelled; set by _stamp_subscription_events and,
+    # unlike updated_at, not moved by later edits, so the daily rollups can key events on them
+    paid_at = db.Column(db.DateTime, nullable=True)
+    cancelled_at = db.Column(db.DateTime, nullable=True)
     
     # Relationships
     user = db.relationship('User', backref='subscriptions')
@@ -331,9 +355,35 @@ class UserSubscription(db.Model):
     def __repr__(self):
         return f'<UserSubscription {self.id}: User {self.user_id} - Plan {self.plan_id}>'
 
+
+@event.listens_for(UserSubscription, 'before_insert')
+def _stamp_new_subscription(mapper, connection, target):
+    """A subscription created paid or cancelled settled / was cancelled when it was written"""
+    written = target.updated_at or target.created_at or datetime.now(timezone.utc)
+    if target.payment_status == 'paid' and target.paid_at is None:
+        target.paid_at = target.created_at or written
+    if target.status == 'cancelled' and target.cancelled_at is None:
+        target.cancelled_at = written
+
+
+@event.listens_for(UserSubscription, 'before_update')
+def _stamp_subscription_events(mapper, connection, target):
+    """Record when payment_status turns 'paid' and status turns 'cancelled' (unless set explicitly)"""
+    state = inspect(target)
+    now = datetime.now(timezone.utc)
+    if 'paid' in state.attrs.payment_status.history.added and not state.attrs.paid_at.history.added:
+        target.paid_at = now
+    if 'cancelled' in state.attrs.status.history.added and not state.attrs.cancelled_at.history.added:
+        target.cancelled_at = now
+
+
 class ActivityLog(db.Model):
     """Track completed plant care actions for reports and analytics"""
     __tablename__ = 'activity_logs'
+    __table_args__ = (
+        db.Index('ix_activity_logs_user_space_created', 'user_id', 'space_id', 'created_at'),
+        db.Index('ix_activity_logs_user_action_date', 'user_id', 'action_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -411,6 +461,9 @@ class AIUsageTracking(db.Model):
 class Notification(db.Model):
     """Admin announcements and notifications for users"""
     __tablename__ = 'admin_notifications'
+    __table_args__ = (
+        db.Index('ix_admin_notifications_active_expires_priority', 'is_active', 'expires_at', 'priority'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -541,4 +594,205 @@ class UserSharedConcept(db.Model):
         return data
     
     def __repr__(self):
-        return f'<UserSharedConcept {self.id}: {self.title}>'
\ No newline at end of file
+        return f'<UserSharedConcept {self.id}: {self.title}>'
+
+
+class AlertMaterialization(db.Model):
+    """Marks the day a user's smart alerts were last fully materialized."""
+    __tablename__ = 'alert_materializations'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    computed_for = db.Column(db.Date, nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f'<AlertMaterialization user={self.user_id} computed_for={self.computed_for}>'
+
+class MaterializedAlert(db.Model):
+    """Precomputed smart alert payload for one grid space or plant tracking care action."""
+    __tablename__ = 'materialized_alerts'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    garden_id = db.Column(db.Integer, nullable=False)
+    space_id = db.Column(db.Integer, nullable=True)  # set for grid space alerts
+    tracking_id = db.Column(db.Integer, nullable=True)  # set for legacy PlantTracking alerts
+    position = db.Column(db.Integer, default=0)  # order of the alert within its space/tracking
+    visible_from = db.Column(db.DateTime, nullable=True)  # hidden until this UTC time (newly analyzed plants)
+    payload = db.Column(db.Text, nullable=False)  # alert JSON as returned by /api/smart-alerts
+    computed_for = db.Column(db.Date, nullable=False)
+    
+    def __repr__(self):
+        return f'<MaterializedAlert {self.id}: User {self.user_id} - space {self.space_id} tracking {self.tracking_id}>'
+
+class GeocodeLocation(db.Model):
+    """Cached OpenWeatherMap geocoding result for a normalized city query."""
+    __tablename__ = 'geocode_locations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    city_key = db.Column(db.String(120), unique=True, nullable=False, index=True)  # normalized query, e.g. 'cebu city,ph'
+    name = db.Column(db.String(100))  # name returned by the geocoder
+    country = db.Column(db.String(10))
+    state = db.Column(db.String(100))
+    lat = db.Column(db.Float, nullable=False)
+    lon = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f'<GeocodeLocation {self.city_key}: {self.lat}, {self.lon}>'
+
+class AnalysisJob(db.Model):
+    """Queued AI analysis run outside the request that created it."""
+    __tablename__ = 'analysis_jobs'
+    __table_args__ = (
+        db.Index('ix_analysis_jobs_status_created', 'status', 'created_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    job_type = db.Column(db.String(50), nullable=False)  # 'plant_image'
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'running', 'done', 'failed'
+    space_id = db.Column(db.Integer, nullable=True)  # grid space being analyzed
+    payload = db.Column(db.Text)  # JSON input for the job handler
+    result = db.Column(db.Text)  # JSON returned by the job handler
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'space_id': self.space_id,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<AnalysisJob {self.id}: {self.job_type} {self.status}>'
+
+class AIResultCache(db.Model):
+    """Upstream AI response stored by image content hash, analysis type and prompt version."""
+    __tablename__ = 'ai_result_cache'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), unique=True, nullable=False, index=True)  # sha256 of digest/type/version/context
+    image_digest = db.Column(db.String(64), nullable=False, index=True)
+    analysis_type = db.Column(db.String(50), nullable=False)  # 'plant_id', 'plant_enrichment', 'soil_analysis', 'plant_care'
+    prompt_version = db.Column(db.String(20), nullable=False)
+    result = db.Column(db.Text(16777215), nullable=False)  # raw upstream response text (MEDIUMTEXT on MySQL)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f'<AIResultCache {self.analysis_type} {self.image_digest[:12]}>'
+
+class AuditLog(db.Model):
+    """Append-only admin activity, subscription and history log entry (written in batches by log_store)."""
+    __tablename__ = 'audit_logs'
+    __table_args__ = (
+        db.Index('ix_audit_logs_kind_created', 'kind', 'created_at'),
+        db.Index('ix_audit_logs_kind_user_created', 'kind', 'user_id', 'created_at'),
+        db.Index('ix_audit_logs_kind_action_created', 'kind', 'action', 'created_at'),
+        db.Index('ix_audit_logs_kind_status_created', 'kind', 'status', 'created_at'),
+    )
+    
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # 'activity', 'subscription', 'history'
+    user_id = db.Column(db.Integer, nullable=True)  # acting/affected user; no FK so logs outlive accounts
+    action = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)  # UTC
+    payload = db.Column(db.Text, nullable=False)  # JSON of the logged entry
+    
+    def to_dict(self):
+        entry = json.loads(self.payload)
+        entry['id'] = self.id
+        entry['timestamp'] = self.created_at.replace(tzinfo=timezone.utc).isoformat()
+        return entry
+    
+    def __repr__(self):
+        return f'<AuditLog {self.id}: {self.kind} {self.action}>'
+
+class DailyRollup(db.Model):
+    """Per-day aggregate for the admin dashboards (maintained by rollups.refresh, never written by requests)."""
+    __tablename__ = 'daily_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('metric', 'day', 'dimension', name='uq_daily_rollups_metric_day_dimension'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)  # UTC calendar day
+    metric = db.Column(db.String(40), nullable=False)  # e.g. 'signups', 'ai_analyses', 'users'
+    dimension = db.Column(db.String(40), nullable=False, default='')  # e.g. usage_type, action, plan_id:status
+    value = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)  # UTC time of the refresh that wrote the row
+    
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'metric': self.metric,
+            'dimension': self.dimension,
+            'value': float(self.value),
+            'updated_at': self.updated_at.replace(tzinfo=timezone.utc).isoformat()
+        }
+    
+    def __repr__(self):
+        return f'<DailyRollup {self.day} {self.metric}[{self.dimension}]={self.value}>'
+
+class AdminReport(db.Model):
+    """Report file built in the background for the admin panel (see reports.py)."""
+    __tablename__ = 'admin_reports'
+    __table_args__ = (
+        db.Index('ix_admin_reports_status_created', 'status', 'created_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    report_type = db.Column(db.String(30), nullable=False)  # 'users', 'subscriptions', 'ai-usage', 'care-activity'
+    file_format = db.Column(db.String(10), nullable=False, default='csv')  # 'csv' or 'xlsx'
+    date_range = db.Column(db.String(10), nullable=False, default='30d')
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'running', 'done', 'failed'
+    requested_by = db.Column(db.Integer, nullable=True)  # admin id; no FK so reports outlive the account
+    file_name = db.Column(db.String(255), nullable=True)  # under the reports directory once done
+    size_bytes = db.Column(db.BigInteger, nullable=True)
+    row_count = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': f"{self.report_type.replace('-', ' ').title()} Report",
+            'description': f"Generated report for {self.report_type} covering {self.date_range}",
+            'type': self.report_type,
+            'format': self.file_format,
+            'date_range': self.date_range,
+            'status': self.status,
+            'row_count': self.row_count,
+            'size_bytes': self.size_bytes,
+            'size': _format_size(self.size_bytes) if self.size_bytes is not None else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<AdminReport {self.id}: {self.report_type} {self.status}>'
+
+
+def _format_size(size_bytes):
+    """Human-readable file size, e.g. '2.3 MB'"""
+    size = float(size_bytes)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
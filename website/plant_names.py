@@ -0,0 +1,133 @@
+"""Load-once index for turning Plant.id names into the names our users know.
+
+The tables live in data/plant_names.json (or PLANT_NAMES_FILE) so entries can
+be added without code changes:
+  common_names      exact scientific/local/common name -> display name
+  simple_names      words that simplify compound names ("garden strawberry" ->
+                    "Strawberry"); earlier entries win when several match
+  crop_synonyms     substrings that mark a suggestion as a common crop
+  forced_names      display name -> substrings that always map to it
+  fallback_keywords display name -> substrings used when nothing else matched
+
+Each keyword list is compiled into a single alternation regex, so resolving a
+name is one scan per string instead of one re.search per table entry.
+"""
+import json
+import os
+import re
+import threading
+
+DEFAULT_NAMES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'plant_names.json')
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _alternation(words, word_boundary=False):
+    """One regex matching any of words (longest first, so 'pea' never shadows 'peach')"""
+    pattern = '|'.join(re.escape(w) for w in sorted(set(words), key=len, reverse=True))
+    return re.compile(rf'\b(?:{pattern})\b' if word_boundary else f'(?:{pattern})')
+
+
+class PlantNameIndex:
+    def __init__(self, data):
+        self.common_names = {k.lower(): v for k, v in data.get('common_names', {}).items()}
+        simple_names = [w.lower() for w in data.get('simple_names', [])]
+        self._simple_priority = {w: i for i, w in enumerate(simple_names)}
+        self._simple_re = _alternation(simple_names, word_boundary=True)
+        self._crop_re = _alternation(w.lower() for words in data.get('crop_synonyms', {}).values() for w in words)
+        self._forced = self._keyword_table(data.get('forced_names', {}))
+        self._fallback = self._keyword_table(data.get('fallback_keywords', {}))
+
+    @staticmethod
+    def _keyword_table(table):
+        owner = {w.lower(): name for name, words in table.items() for w in words}
+        return (_alternation(owner), owner) if owner else (None, owner)
+
+    def simple_name(self, text):
+        """Title-cased highest-priority simple name appearing as a whole word in text, or None"""
+        if not text:
+            return None
+        matches = {m.group(0) for m in self._simple_re.finditer(text.lower())}
+        if not matches:
+            return None
+        return min(matches, key=self._simple_priority.__getitem__).title()
+
+    def is_crop(self, *texts):
+        """True if any text (or list of texts) mentions a common crop synonym"""
+        for text in texts:
+            for t in ([text] if isinstance(text, str) else text or []):
+                if t and self._crop_re.search(t.lower()):
+                    return True
+        return False
+
+    @staticmethod
+    def _keyword_lookup(table, text):
+        regex, owner = table
+        if regex is None or not text:
+            return None
+        match = regex.search(text.lower())
+        return owner[match.group(0)] if match else None
+
+    def forced_name(self, text):
+        """Display name forced by a known-problem keyword in text, or None"""
+        return self._keyword_lookup(self._forced, text)
+
+    def best_common_name(self, plant_name, scientific_name, common_names):
+        """The name to show for a Plant.id suggestion (Philippine-friendly)"""
+        common_names = [c for c in common_names or [] if c]
+        for candidate in [scientific_name, plant_name] + common_names:
+            if candidate and candidate.lower() in self.common_names:
+                return self.common_names[candidate.lower()]
+
+        # Compound common names first, then the plant name ("garden strawberry" -> "Strawberry")
+        for text in common_names + [plant_name]:
+            simple = self.simple_name(text)
+            if simple:
+                return simple
+
+        all_text = f"{plant_name or ''} {scientific_name or ''} {' '.join(common_names)}"
+        fallback = self._keyword_lookup(self._fallback, all_text)
+        if fallback:
+            return fallback
+
+        # Prefer a short, non-scientific-looking common name, then the plant name
+        if common_names:
+            short = [c for c in common_names if not any(ch.isdigit() for ch in c) and len(c.split()) <= 2]
+            return short[0] if short else common_names[0]
+        if plant_name and len(plant_name.split()) > 1:
+            for word in plant_name.split():
+                if len(word) > 3 and not any(ch.isdigit() for ch in word):
+                    return word.title()
+        return plant_name or 'Unknown'
+
+
+def load_index(path=None):
+    with open(path or os.getenv('PLANT_NAMES_FILE', DEFAULT_NAMES_FILE), encoding='utf-8') as f:
+        return PlantNameIndex(json.load(f))
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_index()
+    return _index
+
+
+def best_common_name(plant_name, scientific_name, common_names):
+    return get_index().best_common_name(plant_name, scientific_name, common_names)
+
+
+def simplify_name(display_name):
+    """Collapse a compound name to its simple fruit/vegetable name when it contains one"""
+    return get_index().simple_name(display_name) or display_name
+
+
+def is_crop_match(plant_name, scientific_name, common_names):
+    return get_index().is_crop(plant_name, scientific_name, common_names)
+
+
+def forced_name(*texts):
+    return get_index().forced_name(' '.join(t for t in texts if t))
@@ -0,0 +1,245 @@
+"""Admin report files (CSV / XLSX) built in the background.
+
+An admin request creates an admin_reports row and hands it to the small
+'reports' pool (jobs.submit_task, REPORT_WORKERS threads, separate from the
+AI analysis pool), or leaves it queued for run_analysis_worker.py when
+ANALYSIS_WORKER_MODE=external. Reports share the analysis jobs' lifecycle
+helpers in jobs.py: a report is claimed with a conditional UPDATE
+(jobs.claim), so it is built at most once, and in thread mode the web entry
+point calls start_report_pool() to pick up reports left queued. As with
+analysis jobs, interrupted builds are requeued only by run_analysis_worker.py
+or sweep_stale_work.py.
+
+Building never loads a table into memory: rows come from one Core SELECT on
+its own connection with stream_results / yield_per (a server-side cursor on
+MySQL and PostgreSQL) and are written to the file as they arrive. Each build
+attempt writes its own temporary file and renames it into REPORTS_DIR when
+complete, so a download never sees a partial report; an attempt that was
+requeued as stale and claimed again by another worker discards its file.
+"""
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from sqlalchemy import select
+from .models import db, AdminReport, User, UserSubscription, SubscriptionPlan, AIUsageTracking, ActivityLog, Plant
+from .jobs import submit_task, runs_in_process, claim, requeue_stale, run_pending, resubmit_queued
+import csv
+import os
+import traceback
+
+REPORT_BATCH_ROWS = int(os.getenv('REPORT_BATCH_ROWS', '1000'))
+STALE_REPORT_SECONDS = 30 * 60  # running reports older than this are assumed lost
+FORMATS = ('csv', 'xlsx')
+DATE_RANGES = {'1d': 1, '7d': 7, '30d': 30, '90d': 90, '1y': 365, 'all': None}
+
+
+def reports_dir():
+    return os.getenv('REPORTS_DIR') or os.path.join(os.getcwd(), 'uploads', 'reports')
+
+
+def _select(columns):
+    return select(*[column for _, column in columns])
+
+
+def _users_report():
+    columns = [
+        ('ID', User.id), ('Email', User.email), ('First name', User.firstname), ('Last name', User.lastname),
+        ('Role', User.role), ('Active', User.is_active), ('Email verified', User.email_verified),
+        ('Subscribed', User.subscribed), ('Learning level', User.learning_level), ('Created at', User.created_at),
+    ]
+    return columns, User.created_at, _select(columns).order_by(User.id)
+
+
+def _subscriptions_report():
+    columns = [
+        ('ID', UserSubscription.id), ('User ID', UserSubscription.user_id), ('User email', User.email),
+        ('Plan', SubscriptionPlan.plan_name), ('Status', UserSubscription.status),
+        ('Payment status', UserSubscription.payment_status), ('Total paid', UserSubscription.total_paid),
+        ('Currency', SubscriptionPlan.currency), ('Start date', UserSubscription.start_date),
+        ('End date', UserSubscription.end_date), ('Created at', UserSubscription.created_at),
+    ]
+    query = _select(columns).select_from(UserSubscription) \
+        .join(User, User.id == UserSubscription.user_id) \
+        .join(SubscriptionPlan, SubscriptionPlan.id == UserSubscription.plan_id)
+    return columns, UserSubscription.created_at, query.order_by(UserSubscription.id)
+
+
+def _ai_usage_report():
+    columns = [
+        ('ID', AIUsageTracking.id), ('User ID', AIUsageTracking.user_id), ('User email', User.email),
+        ('Type', AIUsageTracking.usage_type), ('Free', AIUsageTracking.is_free_usage),
+        ('Cost', AIUsageTracking.cost), ('Created at', AIUsageTracking.created_at),
+    ]
+    query = _select(columns).select_from(AIUsageTracking).join(User, User.id == AIUsageTracking.user_id)
+    return columns, AIUsageTracking.created_at, query.order_by(AIUsageTracking.id)
+
+
+def _care_activity_report():
+    columns = [
+        ('ID', ActivityLog.id), ('User ID', ActivityLog.user_id), ('User email', User.email),
+        ('Garden ID', ActivityLog.garden_id), ('Space ID', ActivityLog.space_id), ('Plant', Plant.name),
+        ('Action', ActivityLog.action), ('Action date', ActivityLog.action_date), ('Notes', ActivityLog.notes),
+        ('Created at', ActivityLog.created_at),
+    ]
+    query = _select(columns).select_from(ActivityLog) \
+        .join(User, User.id == ActivityLog.user_id) \
+        .outerjoin(Plant, Plant.id == ActivityLog.plant_id)
+    return columns, ActivityLog.created_at, query.order_by(ActivityLog.id)
+
+
+# report type -> () -> ([(header, column)], date column, ordered SELECT)
+REPORTS = {
+    'users': _users_report,
+    'subscriptions': _subscriptions_report,
+    'ai-usage': _ai_usage_report,
+    'care-activity': _care_activity_report,
+}
+
+
+def report_query(report_type, date_range, now=None):
+    """(headers, SELECT) for a report type over a date range ('all' for no lower bound)"""
+    columns, date_column, query = REPORTS[report_type]()
+    days = DATE_RANGES[date_range]
+    if days is not None:
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        query = query.where(date_column >= now - timedelta(days=days))
+    return [header for header, _ in columns], query
+
+
+def _cell(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _stream_rows(query):
+    """Result rows one batch at a time from a server-side cursor on a dedicated connection"""
+    with db.engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=REPORT_BATCH_ROWS).execute(query)
+        for batch in result.partitions():
+            for row in batch:
+                yield [_cell(value) for value in row]
+
+
+def _write_csv(path, headers, rows):
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _write_xlsx(path, headers, rows):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("XLSX reports need the openpyxl package; install it or request format 'csv'")
+    # write_only workbooks stream rows to disk instead of keeping the sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Report')
+    sheet.append(headers)
+    count = 0
+    for row in rows:
+        sheet.append(row)
+        count += 1
+    workbook.save(path)
+    return count
+
+
+def create_report(report_type, file_format, date_range, requested_by):
+    """Add a queued report to the session; the caller commits and then calls submit_report()"""
+    if report_type not in REPORTS:
+        raise ValueError(f"Unknown report type '{report_type}' (expected one of: {', '.join(REPORTS)})")
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}' (expected one of: {', '.join(FORMATS)})")
+    if date_range not in DATE_RANGES:
+        raise ValueError(f"Unknown date range '{date_range}' (expected one of: {', '.join(DATE_RANGES)})")
+    report = AdminReport(report_type=report_type, file_format=file_format, date_range=date_range,
+                         requested_by=requested_by, status='queued')
+    db.session.add(report)
+    db.session.flush()
+    return report
+
+
+def submit_report(report_id):
+    """Start a committed report on the reports pool (no-op when an external worker is used)"""
+    submit_task('reports', build_report, report_id)
+
+
+def _finish(report_id, attempt, **values):
+    """Update the report only if this attempt still owns it: a build requeued as stale and
+    claimed again has a higher attempt count, and the older build must not overwrite it"""
+    return AdminReport.query.filter_by(id=report_id, status='running', attempts=attempt).update(
+        dict(values, finished_at=datetime.now(timezone.utc)), synchronize_session=False) == 1
+
+
+def build_report(report_id, now=None):
+    """Claim and build one queued report. Returns False if another worker already took it."""
+    if not claim(AdminReport, report_id):
+        return False
+
+    report = db.session.get(AdminReport, report_id)
+    attempt = report.attempts
+    directory = reports_dir()
+    file_name = f"report_{report.id}_{report.report_type}_{report.date_range}.{report.file_format}"
+    # One temporary file per attempt, so a build requeued while still running never shares it
+    temp_path = os.path.join(directory, f".{file_name}.{attempt}.part")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        headers, query = report_query(report.report_type, report.date_range, now)
+        db.session.commit()  # release the session's connection while the file is written
+        writer = _write_xlsx if report.file_format == 'xlsx' else _write_csv
+        row_count = writer(temp_path, headers, _stream_rows(query))
+
+        # The row stays locked by the update until the file is in place and the commit lands
+        if not _finish(report_id, attempt, file_name=file_name, row_count=row_count,
+                       size_bytes=os.path.getsize(temp_path), status='done'):
+            db.session.rollback()
+            os.remove(temp_path)
+            print(f"⚠️ Report {report_id} attempt {attempt} was superseded; discarded its file")
+            return True
+        os.replace(temp_path, os.path.join(directory, file_name))
+        db.session.commit()
+        print(f"✅ Report {report_id} ({report.report_type}, {report.file_format}) written: {row_count} rows")
+    except Exception as e:
+        print(f"❌ Report {report_id} failed: {e}")
+        traceback.print_exc()
+        db.session.rollback()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        _finish(report_id, attempt, status='failed', error=str(e)[:1000])
+        db.session.commit()
+    return True
+
+
+def report_path(report):
+    """Absolute path of a finished report's file, or None if it is not (or no longer) on disk"""
+    if report.status != 'done' or not report.file_name:
+        return None
+    path = os.path.join(reports_dir(), report.file_name)
+    return path if os.path.exists(path) else None
+
+
+def requeue_stale_reports(max_age_seconds=STALE_REPORT_SECONDS):
+    """Put reports whose worker died mid-build back in the queue. Returns the number requeued."""
+    return requeue_stale(AdminReport, max_age_seconds)
+
+
+def run_pending_reports(limit=5):
+    """Build queued reports oldest first (used by the external worker). Returns the number built."""
+    return run_pending(AdminReport, build_report, limit)
+
+
+def start_report_pool():
+    """Hand the reports still queued to this process's reports pool.
+
+    Called by the web entry point in an app context. It does nothing when
+    an external worker is used. Returns the number of reports submitted.
+    """
+    if not runs_in_process():
+        return 0
+    return resubmit_queued(AdminReport, submit_report, 'report')
@@ -0,0 +1,294 @@
+"""Per-day aggregates for the admin dashboards, stored in the daily_rollups table.
+
+refresh() maintains two kinds of rows:
+
+* Event metrics: what happened on each UTC day (signups, active users, AI
+  analyses by type, care actions by action, feedback received, subscription
+  sign-ups / revenue / cancellations by plan, admin log entries). Each refresh
+  only regroups the days since the previous refresh (plus ROLLUP_LOOKBACK_DAYS
+  for late writes such as buffered log entries); older days are final. The
+  first refresh backfills every day. Events are keyed on columns that are set
+  once (created_at, UserSubscription.paid_at / cancelled_at), never on
+  updated_at, so an event cannot move to a later day and be counted twice;
+  revenue lands on the day the payment settled.
+* Monthly metrics: distinct subscribers per calendar month (all plans and per
+  plan), on the month's first day. A month is regrouped whole while the
+  refresh window reaches into it.
+* Snapshot metrics: current totals (users, admins, feedback by status,
+  subscriptions by plan and status), written on today's row, so past days
+  keep the last value seen that day.
+
+Refreshes are serialized across processes by a database lock (an advisory
+lock on PostgreSQL, GET_LOCK on MySQL), held until the new rows commit.
+
+Dashboard endpoints read the small rollup table through snapshot() /
+totals() / daily() instead of recounting the source tables per request.
+Schedule refresh_rollups.py (e.g. every 5 minutes via cron); as a safety net
+the readers refresh inline when the newest rollup is older than
+ROLLUP_MAX_AGE seconds.
+"""
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import and_, case, cast, delete, distinct, func, literal, select, text, union
+from .models import (
+    db, DailyRollup, User, Admin, AIUsageTracking, ActivityLog, Feedback, UserSubscription, AuditLog
+)
+import os
+import threading
+import zlib
+
+ROLLUP_MAX_AGE = float(os.getenv('ROLLUP_MAX_AGE', '900'))
+ROLLUP_LOOKBACK_DAYS = int(os.getenv('ROLLUP_LOOKBACK_DAYS', '1'))
+ROLLUP_LOCK_NAME = 'egrowtify_rollups_refresh'
+ROLLUP_LOCK_TIMEOUT = int(os.getenv('ROLLUP_LOCK_TIMEOUT', '60'))  # seconds to wait for a running refresh (MySQL)
+
+# Metrics whose values are counts (everything else is money)
+COUNT_METRICS = {
+    'signups', 'active_users', 'ai_analyses', 'care_actions', 'feedback', 'new_subscriptions',
+    'cancellations', 'audit_logs', 'subscription_logs', 'users', 'admins', 'feedback_status', 'subscriptions',
+    'month_subscribers',
+}
+SNAPSHOT_METRICS = ('users', 'admins', 'feedback_status', 'subscriptions')
+MONTHLY_METRICS = ('month_subscribers',)
+
+_local_refresh_lock = threading.Lock()  # databases without a named lock (SQLite) only serialize this process
+_fresh_until = None  # UTC time until which this process trusts the newest refresh it has seen
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _as_date(value):
+    """DATE() comes back as a date (MySQL, PostgreSQL) or an ISO string (SQLite)"""
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _day_start(day):
+    return datetime(day.year, day.month, day.day)
+
+
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _month_of(column, dialect):
+    """First day of the UTC calendar month of a datetime column"""
+    if dialect == 'postgresql':
+        return func.date(func.date_trunc('month', column))
+    if dialect in ('mysql', 'mariadb'):
+        return func.date(func.date_format(column, '%Y-%m-01'))
+    return func.date(column, 'start of month')
+
+
+def _grouped(metric, column, value, dimension=None, where=(), day=None):
+    """(day, dimension, value) per UTC day (or the given day expression) of a datetime column"""
+    day = func.date(column) if day is None else day
+    dim = func.coalesce(dimension, '') if dimension is not None else literal('')
+    query = select(day.label('day'), dim.label('dimension'), value.label('value')).where(column.isnot(None), *where)
+    return metric, column, query.group_by(day, dim) if dimension is not None else query.group_by(day)
+
+
+def _event_queries(dialect):
+    """Every event and monthly metric as a grouped query, keyed by the column its day comes from"""
+    paid = UserSubscription.payment_status == 'paid'
+    plan = cast(UserSubscription.plan_id, db.String)
+    month = _month_of(UserSubscription.created_at, dialect)
+    subscribers = func.count(distinct(UserSubscription.user_id))
+    return [
+        _grouped('signups', User.created_at, func.count(User.id)),
+        _grouped('ai_analyses', AIUsageTracking.created_at, func.count(AIUsageTracking.id), AIUsageTracking.usage_type),
+        _grouped('ai_revenue', AIUsageTracking.created_at, func.coalesce(func.sum(AIUsageTracking.cost), 0),
+                 AIUsageTracking.usage_type, where=[AIUsageTracking.is_free_usage == False]),
+        _grouped('care_actions', ActivityLog.created_at, func.count(ActivityLog.id), ActivityLog.action),
+        _grouped('feedback', Feedback.created_at, func.count(Feedback.id)),
+        _grouped('new_subscriptions', UserSubscription.created_at,
+                 func.count(distinct(UserSubscription.user_id)), plan),
+        _grouped('subscription_revenue', UserSubscription.paid_at,
+                 func.coalesce(func.sum(UserSubscription.total_paid), 0), plan, where=[paid]),
+        _grouped('cancellations', UserSubscription.cancelled_at, func.count(UserSubscription.id), plan),
+        _grouped('month_subscribers', UserSubscription.created_at, subscribers, day=month),
+        _grouped('month_subscribers', UserSubscription.created_at, subscribers, plan, day=month),
+        _grouped('audit_logs', AuditLog.created_at, func.count(AuditLog.id), AuditLog.kind),
+        _grouped('subscription_logs', AuditLog.created_at, func.count(AuditLog.id), AuditLog.status,
+                 where=[AuditLog.kind == 'subscription']),
+    ]
+
+
+def _active_users_query(since):
+    """Distinct users per day with a care action, an AI analysis or a logged activity"""
+    sources = [
+        (ActivityLog.created_at, ActivityLog.user_id, []),
+        (AIUsageTracking.created_at, AIUsageTracking.user_id, []),
+        (AuditLog.created_at, AuditLog.user_id, [AuditLog.kind == 'activity', AuditLog.user_id.isnot(None)]),
+    ]
+    parts = []
+    for created_at, user_id, where in sources:
+        if since is not None:
+            where = where + [created_at >= since]
+        parts.append(select(func.date(created_at).label('day'), user_id.label('user_id')).where(*where))
+    seen = union(*parts).subquery()
+    return select(seen.c.day, literal('').label('dimension'), func.count(distinct(seen.c.user_id)).label('value')) \
+        .group_by(seen.c.day)
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _snapshot_rows(connection):
+    """(metric, dimension, value) of the current totals"""
+    users = connection.execute(select(
+        func.count(User.id),
+        _count_if(User.is_active == True),
+        _count_if(User.subscribed == True),
+        _count_if(and_(User.subscribed == True, User.is_active == True)),
+    )).one()
+    counts = {('users', name): count for name, count in zip(('total', 'active', 'subscribed', 'active_subscribed'), users)}
+    counts[('admins', 'total')] = connection.execute(select(func.count(Admin.id))).scalar()
+    for status, count in connection.execute(select(Feedback.status, func.count(Feedback.id)).group_by(Feedback.status)):
+        key = ('feedback_status', status or '')
+        counts[key] = counts.get(key, 0) + count
+    for plan_id, status, count in connection.execute(
+            select(UserSubscription.plan_id, UserSubscription.status, func.count(UserSubscription.id))
+            .group_by(UserSubscription.plan_id, UserSubscription.status)):
+        key = ('subscriptions', f"{plan_id}:{status or ''}")
+        counts[key] = counts.get(key, 0) + count
+    return [(metric, dimension, count) for (metric, dimension), count in counts.items()]
+
+
+@contextmanager
+def _refresh_lock(connection):
+    """Hold the cross-process refresh lock on connection (outside its transactions) while the block runs"""
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        params = {'key': zlib.crc32(ROLLUP_LOCK_NAME.encode())}
+        lock, unlock = text("SELECT pg_advisory_lock(:key)"), text("SELECT pg_advisory_unlock(:key)")
+    elif dialect in ('mysql', 'mariadb'):
+        params = {'name': ROLLUP_LOCK_NAME, 'timeout': ROLLUP_LOCK_TIMEOUT}
+        lock, unlock = text("SELECT GET_LOCK(:name, :timeout)"), text("SELECT RELEASE_LOCK(:name)")
+    else:
+        with _local_refresh_lock:
+            yield
+        return
+
+    acquired = connection.execute(lock, params).scalar()
+    if dialect != 'postgresql' and acquired != 1:
+        connection.rollback()
+        raise RuntimeError(f"Timed out after {ROLLUP_LOCK_TIMEOUT}s waiting for another rollup refresh")
+    connection.commit()  # the lock belongs to the session; the refresh runs in its own transaction
+    try:
+        yield
+    finally:
+        connection.execute(unlock, params)
+        connection.commit()
+
+
+def refresh(now=None):
+    """Regroup the days since the last refresh and rewrite today's snapshot. Returns the rows written."""
+    global _fresh_until
+    now = now or _utcnow()
+    today = now.date()
+    table = DailyRollup.__table__
+
+    with db.engine.connect() as connection, _refresh_lock(connection), connection.begin():
+        refreshed_at = _utcnow()
+        last_day = connection.execute(select(func.max(table.c.day))).scalar()
+        start_day = _as_date(last_day) - timedelta(days=ROLLUP_LOOKBACK_DAYS) if last_day else None
+        since = _day_start(start_day) if start_day else None
+        month_since = _day_start(_month_start(start_day)) if start_day else None
+
+        rows = []
+        for metric, column, query in _event_queries(connection.dialect.name):
+            bound = month_since if metric in MONTHLY_METRICS else since
+            if bound is not None:
+                query = query.where(column >= bound)
+            for day, dimension, value in connection.execute(query):
+                rows.append({'day': _as_date(day), 'metric': metric, 'dimension': str(dimension)[:40], 'value': value})
+        for day, dimension, value in connection.execute(_active_users_query(since)):
+            rows.append({'day': _as_date(day), 'metric': 'active_users', 'dimension': dimension, 'value': value})
+        for metric, dimension, value in _snapshot_rows(connection):
+            rows.append({'day': today, 'metric': metric, 'dimension': str(dimension)[:40], 'value': value})
+        for row in rows:
+            row['updated_at'] = refreshed_at
+
+        # Replace the regrouped window and today's snapshot in the same transaction
+        stale = delete(table).where(table.c.metric.notin_(SNAPSHOT_METRICS + MONTHLY_METRICS))
+        stale_months = delete(table).where(table.c.metric.in_(MONTHLY_METRICS))
+        if start_day is not None:
+            stale = stale.where(table.c.day >= start_day)
+            stale_months = stale_months.where(table.c.day >= _month_start(start_day))
+        connection.execute(stale)
+        connection.execute(stale_months)
+        connection.execute(delete(table).where(table.c.metric.in_(SNAPSHOT_METRICS), table.c.day == today))
+        if rows:
+            connection.execute(table.insert(), rows)
+
+    _fresh_until = refreshed_at + timedelta(seconds=ROLLUP_MAX_AGE)
+    print(f"📊 Rolled up {len(rows)} dashboard aggregates from {start_day or 'the beginning'} to {today}")
+    return len(rows)
+
+
+def last_refreshed():
+    """UTC time of the newest rollup write, or None before the first refresh"""
+    return db.session.execute(select(func.max(DailyRollup.updated_at))).scalar()
+
+
+def ensure_fresh():
+    """Refresh inline if the scheduled job has not run within ROLLUP_MAX_AGE seconds.
+
+    The newest refresh time is remembered per process, so readers only query
+    it again once that refresh is about to go stale.
+    """
+    global _fresh_until
+    if _fresh_until is not None and _utcnow() < _fresh_until:
+        return
+    refreshed = last_refreshed()
+    if refreshed is None or (_utcnow() - refreshed).total_seconds() > ROLLUP_MAX_AGE:
+        refresh()
+    else:
+        _fresh_until = refreshed + timedelta(seconds=ROLLUP_MAX_AGE)
+
+
+def _number(metric, value):
+    return int(value) if metric in COUNT_METRICS else float(value)
+
+
+def snapshot():
+    """{metric: {dimension: value}} of the newest snapshot totals"""
+    ensure_fresh()
+    latest = select(func.max(DailyRollup.day)).where(DailyRollup.metric.in_(SNAPSHOT_METRICS)).scalar_subquery()
+    rows = db.session.execute(
+        select(DailyRollup.metric, DailyRollup.dimension, DailyRollup.value)
+        .where(DailyRollup.metric.in_(SNAPSHOT_METRICS), DailyRollup.day == latest)
+    )
+    result = {metric: {} for metric in SNAPSHOT_METRICS}
+    for metric, dimension, value in rows:
+        result[metric][dimension] = _number(metric, value)
+    return result
+
+
+def totals(metrics, since=None, until=None):
+    """{metric: {dimension: sum}} of event metrics over the days since <= day < until"""
+    ensure_fresh()
+    query = select(DailyRollup.metric, DailyRollup.dimension, func.sum(DailyRollup.value)) \
+        .where(DailyRollup.metric.in_(metrics))
+    if since is not None:
+        query = query.where(DailyRollup.day >= since)
+    if until is not None:
+        query = query.where(DailyRollup.day < until)
+    result = {metric: {} for metric in metrics}
+    for metric, dimension, value in db.session.execute(query.group_by(DailyRollup.metric, DailyRollup.dimension)):
+        result[metric][dimension] = _number(metric, value)
+    return result
+
+
+def daily(metrics, since=None):
+    """[(day, metric, dimension, value)] of event metrics, oldest day first"""
+    ensure_fresh()
+    query = select(DailyRollup.day, DailyRollup.metric, DailyRollup.dimension, DailyRollup.value) \
+        .where(DailyRollup.metric.in_(metrics))
+    if since is not None:
+        query = query.where(DailyRollup.day >= since)
+    return [(_as_date(day), metric, dimension, _number(metric, value))
+            for day, metric, dimension, value in db.session.execute(query.order_by(DailyRollup.day))]
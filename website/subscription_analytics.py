@@ -0,0 +1,212 @@
+"""Admin subscription analytics read from the daily rollups.
+
+overview() returns the headline figures (subscriber counts, revenue from
+UserSubscription.total_paid, churn, new subscribers) from the rollup
+snapshot and per-day totals maintained by rollups.refresh, instead of one
+COUNT query per metric. series() returns chart data: new subscriptions,
+paid revenue and cancellations per day / week / month, folded from the
+per-day rollups and padded so every bucket in the range is present.
+recent_activity() builds the admin activity feed from one joined query.
+
+All datetimes are naive UTC, like the columns they are compared with.
+"""
+from datetime import datetime, timedelta, timezone
+from .models import db, User, UserSubscription, SubscriptionPlan
+from . import rollups
+
+BUCKETS = ('day', 'week', 'month')
+DEFAULT_PERIODS = {'day': 30, 'week': 12, 'month': 12}
+MAX_PERIODS = {'day': 366, 'week': 104, 'month': 60}  # bounds the buckets padded and folded per request
+SERIES_METRICS = ('new_subscriptions', 'subscription_revenue', 'cancellations')
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _month_start(moment):
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _for_plan(values, plan_id):
+    """Sum of rollup values whose dimension is the plan (or all plans when plan_id is None)"""
+    if plan_id is None:
+        return sum(values.values())
+    return sum(value for dimension, value in values.items() if dimension.split(':')[0] == str(plan_id))
+
+
+def overview(plan_id=None, now=None):
+    """Headline subscription figures, optionally for one plan.
+
+    User-level figures (total_users, subscribed_users, active_subscribed_users)
+    always cover every user; subscription-level figures are limited to plan_id
+    when given. New subscribers are the distinct users who started a
+    subscription in the month. Returns plain numbers; the endpoints round and
+    rename them.
+    """
+    now = now or _utcnow()
+    month_start = _month_start(now).date()
+    last_month_start = _month_start(_month_start(now) - timedelta(days=1)).date()
+
+    current = rollups.snapshot()
+    users = current['users']
+    subscriptions = {dimension: count for dimension, count in current['subscriptions'].items()
+                     if plan_id is None or dimension.split(':')[0] == str(plan_id)}
+    all_time = rollups.totals(['subscription_revenue'])
+    recent = rollups.daily(['subscription_revenue', 'month_subscribers'], since=last_month_start)
+
+    def recent_sum(metric, since, until=None):
+        return sum(value for day, name, dimension, value in recent
+                   if name == metric and day >= since and (until is None or day < until)
+                   and (plan_id is None or dimension == str(plan_id)))
+
+    def subscribers(month):
+        # month_subscribers has one row for all plans (dimension '') and one per plan
+        wanted = '' if plan_id is None else str(plan_id)
+        return sum(value for day, name, dimension, value in recent
+                   if name == 'month_subscribers' and day == month and dimension == wanted)
+
+    return {
+        'total_users': users.get('total', 0),
+        'subscribed_users': users.get('subscribed', 0),
+        'active_subscribed_users': users.get('active_subscribed', 0),
+        'subscriptions': sum(subscriptions.values()),
+        'active_subscriptions': sum(v for d, v in subscriptions.items() if d.endswith(':active')),
+        'cancelled_subscriptions': sum(v for d, v in subscriptions.items() if d.endswith(':cancelled')),
+        'total_revenue': float(_for_plan(all_time['subscription_revenue'], plan_id)),
+        'month_revenue': float(recent_sum('subscription_revenue', month_start)),
+        'new_subscribers_this_month': subscribers(month_start),
+        'new_subscribers_last_month': subscribers(last_month_start),
+    }
+
+
+def _bucket_start(moment, bucket):
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == 'day':
+        return day
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    return _month_start(day)
+
+
+def bucket_starts(bucket, periods, now=None):
+    """Start of each of the last `periods` buckets up to and including the current one, oldest first"""
+    current = _bucket_start(now or _utcnow(), bucket)
+    starts = [current]
+    while len(starts) < periods:
+        starts.append(_bucket_start(starts[-1] - timedelta(days=1), bucket))
+    return starts[::-1]
+
+
+def series(bucket='month', periods=None, plan_id=None, now=None):
+    """Per-bucket new subscriptions, paid revenue and cancellations, oldest bucket first.
+
+    New subscriptions are bucketed by created_at, revenue by paid_at (when the
+    payment settled) and cancellations by cancelled_at. periods may be at most
+    MAX_PERIODS[bucket].
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+    if periods is not None and not 1 <= periods <= MAX_PERIODS[bucket]:
+        raise ValueError(f"periods must be between 1 and {MAX_PERIODS[bucket]} for {bucket} buckets")
+    periods = periods or DEFAULT_PERIODS[bucket]
+    starts = bucket_starts(bucket, periods, now)
+
+    points = {start.date(): {'period': start.strftime('%Y-%m-%d'), 'new_subscriptions': 0,
+                             'revenue': 0.0, 'cancellations': 0}
+              for start in starts}
+    fields = {'new_subscriptions': 'new_subscriptions', 'subscription_revenue': 'revenue',
+              'cancellations': 'cancellations'}
+    for day, metric, dimension, value in rollups.daily(SERIES_METRICS, since=starts[0].date()):
+        if plan_id is not None and dimension != str(plan_id):
+            continue
+        point = points.get(_bucket_start(datetime(day.year, day.month, day.day), bucket).date())
+        if point is None:
+            continue
+        point[fields[metric]] += value
+    for point in points.values():
+        point['revenue'] = round(point['revenue'], 2)
+    return list(points.values())
+
+
+def _iso_utc(moment):
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.isoformat()
+
+
+def recent_activity(limit=10, plan_id=None):
+    """Creation, cancellation and payment-failure events of the `limit` newest subscriptions, newest first"""
+    query = db.session.query(
+        UserSubscription.id, UserSubscription.status, UserSubscription.payment_status,
+        UserSubscription.created_at, UserSubscription.updated_at,
+        User.firstname, User.lastname, User.email, SubscriptionPlan.plan_name,
+    ).join(User, User.id == UserSubscription.user_id) \
+     .join(SubscriptionPlan, SubscriptionPlan.id == UserSubscription.plan_id)
+    if plan_id is not None:
+        query = query.filter(UserSubscription.plan_id == plan_id)
+    rows = query.order_by(UserSubscription.created_at.desc()).limit(limit).all()
+
+    activities = []
+    for sub in rows:
+        user_name = f"{sub.firstname} {sub.lastname}"
+        changed_later = sub.updated_at and sub.updated_at != sub.created_at
+
+        if sub.created_at:
+            activities.append({
+                'id': f"{sub.id}_created",
+                'type': 'subscription_created',
+                'message': f'New {sub.plan_name} subscription activated',
+                'user': user_name,
+                'user_email': sub.email,
+                'plan_name': sub.plan_name,
+                'status': 'active',
+                'payment_status': sub.payment_status,
+                'timestamp': _iso_utc(sub.created_at),
+                'icon_type': 'crown',
+                'color': 'text-yellow-600'
+            })
+
+        if sub.status == 'cancelled' and changed_later:
+            activities.append({
+                'id': f"{sub.id}_cancelled",
+                'type': 'subscription_cancelled',
+                'message': f'{sub.plan_name} subscription cancelled',
+                'user': user_name,
+                'user_email': sub.email,
+                'plan_name': sub.plan_name,
+                'status': 'cancelled',
+                'payment_status': sub.payment_status,
+                'timestamp': _iso_utc(sub.updated_at),
+                'icon_type': 'xcircle',
+                'color': 'text-red-600'
+            })
+
+        if sub.payment_status == 'failed' and changed_later:
+            activities.append({
+                'id': f"{sub.id}_failed",
+                'type': 'payment_failed',
+                'message': f'Payment failed for {sub.plan_name} subscription',
+                'user': user_name,
+                'user_email': sub.email,
+                'plan_name': sub.plan_name,
+                'status': sub.status,
+                'payment_status': 'failed',
+                'timestamp': _iso_utc(sub.updated_at),
+                'icon_type': 'alert',
+                'color': 'text-orange-600'
+            })
+
+    activities.sort(key=lambda x: x['timestamp'], reverse=True)
+    return activities[:limit]
+
+
+def percent(part, whole):
+    return (part / whole * 100) if whole else 0
+
+
+def growth_rate(current, previous):
+    """Period-over-period change in percent (100 when growing from zero)"""
+    if previous:
+        return (current - previous) / previous * 100
+    return 100.0 if current else 0.0
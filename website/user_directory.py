@@ -0,0 +1,145 @@
+"""Paginated account listings for the admin user and subscriber pages.
+
+page_users() selects only the columns an endpoint returns (no ORM objects),
+applies search and filters in the database, and pages by keyset: each page
+continues strictly after the sort key of the previous page's last row, so
+fetching page 500 costs the same as page 1. Every sort ends with users.id to
+make the order total, and is served by an index (primary key, unique email,
+ix_users_created_id, ix_users_name_id).
+
+Admin accounts live in their own small table; list_admins() returns them in
+the same shape so the user management page can show both.
+"""
+from datetime import datetime
+from sqlalchemy import and_, or_, select
+from .models import db, User, Admin
+from .cursors import InvalidCursor, encode_cursor, decode_cursor
+
+# sort name -> columns of the keyset, before the users.id tiebreaker. All are NOT NULL:
+# _after() compares against the cursor values, and a NULL would drop the row from every page.
+SORTS = {
+    'created_at': (User.created_at,),
+    'email': (User.email,),
+    'name': (User.lastname, User.firstname),
+    'id': (),
+}
+ORDERS = ('asc', 'desc')
+
+
+def _encode_user_cursor(sort, order, values):
+    return encode_cursor([sort, order, values])
+
+
+def _decode_user_cursor(cursor, sort, order):
+    """Sort key values from a cursor handed out for the same sort and order"""
+    try:
+        cursor_sort, cursor_order, values = decode_cursor(cursor)
+        columns = SORTS[sort] + (User.id,)
+        if (cursor_sort, cursor_order) != (sort, order) or len(values) != len(columns):
+            raise ValueError("cursor belongs to a different sort")
+        return [datetime.fromisoformat(value) if column.key == 'created_at' else value
+                for column, value in zip(columns, values)]
+    except InvalidCursor:
+        raise
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def _after(columns, values, order):
+    """Rows strictly after (values) in lexicographic (columns) order.
+
+    The redundant bound on the leading column lets every database turn the
+    condition into an index range seek instead of filtering from the start.
+    """
+    conditions = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        beyond = column > value if order == 'asc' else column < value
+        conditions.append(and_(*[c == v for c, v in zip(columns[:i], values[:i])], beyond))
+    leading = columns[0] >= values[0] if order == 'asc' else columns[0] <= values[0]
+    return and_(leading, or_(*conditions))
+
+
+def _like(term):
+    escaped = term.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def _search(columns, q):
+    """Every whitespace-separated term must appear (case-insensitively) in one of the columns"""
+    return [or_(*[column.ilike(_like(term), escape='\\') for column in columns]) for term in q.split()]
+
+
+def page_users(columns, q=None, role=None, active=None, subscribed=None,
+               sort='created_at', order='desc', cursor=None, limit=100):
+    """One page of users as dicts of the given columns (plus full_name), and the next page's cursor.
+
+    columns are User attributes; id is always included and the sort columns
+    are always selected. Raises ValueError for an unknown sort or order and InvalidCursor for a
+    cursor that was not handed out for this sort and order.
+    """
+    if sort not in SORTS:
+        raise ValueError(f"Unknown sort '{sort}' (expected one of: {', '.join(SORTS)})")
+    if order not in ORDERS:
+        raise ValueError(f"Unknown order '{order}' (expected asc or desc)")
+    keyset = SORTS[sort] + (User.id,)
+    selected = list({column.key: column for column in (User.id, *columns, *keyset)}.values())
+
+    query = select(*selected)
+    if q:
+        query = query.where(*_search((User.email, User.firstname, User.lastname), q))
+    if role:
+        query = query.where(User.role == role)
+    if active is not None:
+        query = query.where(User.is_active == active)
+    if subscribed is not None:
+        query = query.where(User.subscribed == subscribed)
+    if cursor:
+        query = query.where(_after(keyset, _decode_user_cursor(cursor, sort, order), order))
+    query = query.order_by(*[column.asc() if order == 'asc' else column.desc() for column in keyset])
+
+    rows = db.session.execute(query.limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]._mapping
+        next_cursor = _encode_user_cursor(sort, order, [last[column.key] for column in keyset])
+    return [_user_dict(row._mapping, columns) for row in rows[:limit]], next_cursor
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _user_dict(row, columns):
+    user = {'id': row['id']}
+    for column in columns:
+        user[column.key] = _iso(row[column.key]) if column.key.endswith('_at') else row[column.key]
+    if 'firstname' in user and 'lastname' in user:
+        user['full_name'] = f"{user['firstname']} {user['lastname']}"
+    return user
+
+
+def list_admins(q=None, active=None):
+    """Every admin account (a small table) matching the search, in the user listing's shape"""
+    query = select(Admin.id, Admin.email, Admin.username, Admin.full_name, Admin.is_active,
+                   Admin.is_super_admin, Admin.created_at)
+    if q:
+        query = query.where(*_search((Admin.email, Admin.username, Admin.full_name), q))
+    if active is not None:
+        query = query.where(Admin.is_active == active)
+    return [{
+        "id": admin.id,
+        "email": admin.email,
+        "username": admin.username,
+        "firstname": None,  # Admins don't have firstname/lastname, they have full_name
+        "lastname": None,
+        "full_name": admin.full_name,
+        "contact": None,  # Admins don't have contact
+        "role": "admin",  # Mark as admin role
+        "is_active": admin.is_active,
+        "email_verified": True,  # Admins are always verified
+        "subscribed": False,  # Admins don't have subscriptions
+        "learning_level": None,  # Admins don't have learning level
+        "created_at": _iso(admin.created_at),
+        "updated_at": None,
+        "is_super_admin": admin.is_super_admin  # Include super admin status
+    } for admin in db.session.execute(query.order_by(Admin.id))]
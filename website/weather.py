@@ -0,0 +1,144 @@
+"""Shared OpenWeatherMap data layer for the weather endpoints.
+
+Current conditions and the 5-day/3-hour forecast are cached per location with
+a TTL, and concurrent misses for the same location are coalesced so only one
+request per location is in flight upstream (single-flight). Every weather
+endpoint reads through here, so one fetch serves all of them for a city.
+Each forecast fetch is also summarized into daily figures (see daily_forecast)
+and cached alongside it, so no request re-aggregates the 3-hourly steps.
+"""
+from .geocoding import lookup_coordinates
+from .cache import get_cache
+from .daily_forecast import summarize_forecast
+from . import http_client
+import threading
+
+CURRENT_URL = "https://api.openweathermap.org/data/2.5/weather"
+FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
+CURRENT_TTL_SECONDS = 10 * 60  # 10 minutes
+FORECAST_TTL_SECONDS = 30 * 60  # forecast steps are 3 hours apart
+_WAIT_TIMEOUT_SECONDS = 30  # longest a coalesced request waits for the leader
+
+_cache = get_cache('weather', ttl=CURRENT_TTL_SECONDS, max_entries=500)
+_pending = {}  # cache key -> _Flight for the fetch in progress in this process
+_lock = threading.Lock()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _location_key(kind, lat, lon):
+    # ~1 km grid, so aliases of the same city share one entry
+    return f"{kind}:{round(float(lat), 2)}:{round(float(lon), 2)}"
+
+
+def _single_flight(key, ttl, fetch):
+    """Return (status_code, data) for key from cache, a fetch in progress, or a new fetch"""
+    cached = _cache.get(key)
+    if cached is not None:
+        return 200, cached
+
+    with _lock:
+        flight = _pending.get(key)
+        leader = flight is None
+        if leader:
+            flight = _pending[key] = _Flight()
+
+    if not leader:
+        if not flight.done.wait(_WAIT_TIMEOUT_SECONDS):
+            return 504, None
+        if flight.error:
+            raise flight.error
+        return flight.result
+
+    try:
+        # A previous leader may have filled the cache since our first lookup
+        cached = _cache.get(key)
+        if cached is not None:
+            flight.result = (200, cached)
+            return flight.result
+        flight.result = fetch()
+        if flight.result[0] == 200:
+            _cache.set(key, flight.result[1], ttl=ttl)
+        return flight.result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _lock:
+            _pending.pop(key, None)
+        flight.done.set()
+
+
+def _fetch(url, lat, lon, api_key):
+    def fetch():
+        response = http_client.get(url, params={'lat': lat, 'lon': lon, 'appid': api_key, 'units': 'metric'})
+        if response.status_code != 200:
+            return response.status_code, None
+        return 200, response.json()
+    return fetch
+
+
+def get_current_weather(lat, lon, api_key):
+    """(status_code, OpenWeatherMap /weather JSON) for a location; data is None unless 200.
+
+    The returned dict is shared with other requests and must not be modified.
+    """
+    key = _location_key('current', lat, lon)
+    return _single_flight(key, CURRENT_TTL_SECONDS, _fetch(CURRENT_URL, lat, lon, api_key))
+
+
+def _fetch_forecast(lat, lon, api_key):
+    fetch = _fetch(FORECAST_URL, lat, lon, api_key)
+
+    def fetch_and_summarize():
+        status, data = fetch()
+        if status == 200:
+            # Refresh the daily summary together with the forecast it is built from
+            _cache.set(_location_key('daily', lat, lon), summarize_forecast(data), ttl=FORECAST_TTL_SECONDS)
+        return status, data
+    return fetch_and_summarize
+
+
+def get_forecast(lat, lon, api_key):
+    """(status_code, OpenWeatherMap /forecast JSON) for a location; data is None unless 200.
+
+    The returned dict is shared with other requests and must not be modified.
+    """
+    key = _location_key('forecast', lat, lon)
+    return _single_flight(key, FORECAST_TTL_SECONDS, _fetch_forecast(lat, lon, api_key))
+
+
+def get_daily_forecast(lat, lon, api_key):
+    """(status_code, daily forecast summary) for a location; data is None unless 200.
+
+    See daily_forecast.summarize_forecast for the shape. The summary is built
+    once per forecast fetch; it is only recomputed here if it was evicted
+    while the forecast itself is still cached. Must not be modified.
+    """
+    key = _location_key('daily', lat, lon)
+
+    def summarize():
+        status, data = get_forecast(lat, lon, api_key)
+        if status != 200:
+            return status, None
+        # A fresh forecast fetch has just stored its summary
+        summary = _cache.get(key)
+        return 200, summary if summary is not None else summarize_forecast(data)
+    return _single_flight(key, FORECAST_TTL_SECONDS, summarize)
+
+
+def get_city_weather(city, api_key):
+    """(status_code, current weather JSON) for a city name; 404 if it can't be geocoded"""
+    coordinates = lookup_coordinates(city, api_key)
+    if not coordinates:
+        return 404, None
+    return get_current_weather(coordinates[0], coordinates[1], api_key)
+
+
+def clear_cache():
+    _cache.clear()
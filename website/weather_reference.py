@@ -0,0 +1,163 @@
+"""Static reference tables for the weather tolerance and microclimate endpoints.
+
+data/weather_tolerance.json (or WEATHER_TOLERANCE_FILE) is versioned and holds:
+  plants              plant key -> optimal/tolerance temperature (°C) and humidity (%)
+                      ranges, wind tolerance (km/h), stress thresholds, varieties and
+                      aliases (substrings of garden plant names that use this profile)
+  microclimate_zones  ordered garden zones with temperature/humidity/wind modifiers
+                      relative to the ambient weather
+
+The file is loaded and validated once per process (create_app loads it at
+startup, so a broken file fails fast) into read-only structures that the
+endpoints share, instead of rebuilding the dict literals on every request.
+"""
+import json
+import os
+import threading
+from numbers import Number
+
+import numpy as np
+
+DEFAULT_REFERENCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'weather_tolerance.json')
+SUPPORTED_VERSION = 1
+
+_RANGE_KEYS = ('optimal_temp', 'tolerance_temp', 'optimal_humidity', 'tolerance_humidity')
+_THRESHOLD_KEYS = ('wind_tolerance', 'heat_stress_temp', 'cold_damage_temp', 'humidity_disease_risk')
+# Columns of WeatherReference.thresholds, one row per plant in file order
+THRESHOLD_COLUMNS = ('optimal_temp_min', 'optimal_temp_max', 'cold_damage_temp', 'heat_stress_temp',
+                     'optimal_humidity_min', 'optimal_humidity_max', 'humidity_disease_risk', 'wind_tolerance')
+_ZONE_KEYS = ('name', 'description', 'temperature_modifier', 'humidity_modifier', 'wind_modifier',
+              'suitable_plants', 'care_tips', 'seasonal_considerations')
+
+_reference = None
+_reference_lock = threading.Lock()
+
+
+class ReferenceDataError(ValueError):
+    pass
+
+
+class FrozenDict(dict):
+    """A dict that refuses changes; still a dict, so jsonify serializes it as-is"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('weather reference data is read-only')
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """A plain, mutable copy of frozen reference data"""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def _check_range(problems, where, value):
+    if not (isinstance(value, dict) and isinstance(value.get('min'), Number) and isinstance(value.get('max'), Number)):
+        problems.append(f"{where} must have numeric min and max")
+    elif value['min'] > value['max']:
+        problems.append(f"{where} min is above max")
+
+
+def validate(data):
+    """Raise ReferenceDataError listing every problem in a parsed reference file"""
+    problems = []
+    if data.get('version') != SUPPORTED_VERSION:
+        problems.append(f"unsupported version {data.get('version')!r} (expected {SUPPORTED_VERSION})")
+
+    plants = data.get('plants')
+    if not isinstance(plants, dict) or not plants:
+        problems.append("plants must be a non-empty object")
+        plants = {}
+    for key, plant in plants.items():
+        if key != key.lower():
+            problems.append(f"plant key {key!r} must be lowercase")
+        if not isinstance(plant.get('name'), str):
+            problems.append(f"{key}.name must be a string")
+        for range_key in _RANGE_KEYS:
+            _check_range(problems, f"{key}.{range_key}", plant.get(range_key))
+        for threshold in _THRESHOLD_KEYS:
+            if not isinstance(plant.get(threshold), Number):
+                problems.append(f"{key}.{threshold} must be a number")
+        if not isinstance(plant.get('varieties'), dict):
+            problems.append(f"{key}.varieties must be an object")
+        aliases = plant.get('aliases', [])
+        if not (isinstance(aliases, list) and all(isinstance(a, str) and a for a in aliases)):
+            problems.append(f"{key}.aliases must be a list of non-empty strings")
+
+    zones = data.get('microclimate_zones')
+    if not isinstance(zones, list) or not zones:
+        problems.append("microclimate_zones must be a non-empty list")
+        zones = []
+    for i, zone in enumerate(zones):
+        missing = [k for k in _ZONE_KEYS if k not in zone]
+        if missing:
+            problems.append(f"microclimate_zones[{i}] is missing {', '.join(missing)}")
+        elif zone['wind_modifier'] < 0:
+            problems.append(f"microclimate_zones[{i}].wind_modifier must not be negative")
+
+    if problems:
+        raise ReferenceDataError('Invalid weather reference data: ' + '; '.join(problems))
+
+
+class WeatherReference:
+    def __init__(self, data):
+        validate(data)
+        self.version = data['version']
+        self.plants = freeze(data['plants'])
+        self.microclimate_zones = freeze(data['microclimate_zones'])
+        self.plant_index = FrozenDict((key, i) for i, key in enumerate(self.plants))
+        self.thresholds = np.array([
+            [p['optimal_temp']['min'], p['optimal_temp']['max'], p['cold_damage_temp'], p['heat_stress_temp'],
+             p['optimal_humidity']['min'], p['optimal_humidity']['max'], p['humidity_disease_risk'],
+             p['wind_tolerance']]
+            for p in self.plants.values()
+        ], dtype=np.float64)
+        self.thresholds.flags.writeable = False
+        # Longest alias first, so 'cherry tomato' style names pick the most specific profile
+        self._aliases = sorted(((a.lower(), key) for key, p in self.plants.items() for a in p.get('aliases', ())),
+                               key=lambda pair: len(pair[0]), reverse=True)
+
+    def plant_keys(self, plant_name=''):
+        """The requested plant's key if it is known, otherwise every plant key"""
+        key = (plant_name or '').lower()
+        return [key] if key in self.plants else list(self.plants)
+
+    def profile_key(self, plant_name):
+        """The tolerance profile for a garden plant name ('Cherry Tomato' -> 'tomatoes'), or None"""
+        name = (plant_name or '').strip().lower()
+        if name in self.plants:
+            return name
+        for alias, key in self._aliases:
+            if alias in name:
+                return key
+        return None
+
+
+def load_reference(path=None):
+    with open(path or os.getenv('WEATHER_TOLERANCE_FILE', DEFAULT_REFERENCE_FILE), encoding='utf-8') as f:
+        return WeatherReference(json.load(f))
+
+
+def get_reference():
+    global _reference
+    if _reference is None:
+        with _reference_lock:
+            if _reference is None:
+                _reference = load_reference()
+    return _reference
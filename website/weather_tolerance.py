@@ -0,0 +1,102 @@
+"""Weather tolerance checks for many plants in one vectorized pass.
+
+Each row pairs a tolerance profile (a plant key from weather_reference) with
+the weather it is exposed to. The threshold comparisons for all rows run as
+numpy array operations against WeatherReference.thresholds; only the warning
+and recommendation text is assembled per row. The single-plant endpoint and
+the garden batch endpoint both go through assess(), so they always agree.
+"""
+import numpy as np
+
+from .weather_reference import get_reference
+
+_GOOD, _POOR, _CRITICAL = 0, 1, 2
+_STATUS = {_GOOD: ('Good', 'green'), _POOR: ('Poor', 'yellow'), _CRITICAL: ('Critical', 'red')}
+
+
+def _contains(conditions, word):
+    return np.array([word in (c or '').lower() for c in conditions], dtype=bool)
+
+
+def assess(plant_keys, temperatures, humidities, winds, conditions):
+    """Warnings, recommendations and status for each (plant key, weather) row.
+
+    Weather arguments are sequences aligned with plant_keys, or single values
+    shared by every row. Returns one dict per row with warnings,
+    recommendations, status and status_color.
+    """
+    reference = get_reference()
+    n = len(plant_keys)
+    if n == 0:
+        return []
+
+    def column(values):
+        return list(values) if isinstance(values, (list, tuple, np.ndarray)) else [values] * n
+
+    # Keep the raw values for the messages (30 stays "30", not "30.0")
+    temps, hums, wind_speeds, conds = column(temperatures), column(humidities), column(winds), column(conditions)
+    t = np.asarray(temps, dtype=np.float64)
+    h = np.asarray(hums, dtype=np.float64)
+    w = np.asarray(wind_speeds, dtype=np.float64)
+    opt_t_min, opt_t_max, cold_damage, heat_stress, opt_h_min, opt_h_max, disease_risk, wind_tolerance = \
+        reference.thresholds[[reference.plant_index[key] for key in plant_keys]].T
+
+    too_cold = t < opt_t_min
+    too_hot = ~too_cold & (t > opt_t_max)
+    cold_risk = too_cold & (t < cold_damage)
+    heat_risk = too_hot & (t > heat_stress)
+    dry = h < opt_h_min
+    humid = ~dry & (h > opt_h_max)
+    disease = humid & (h > disease_risk)
+    windy = w > wind_tolerance
+    rain = _contains(conds, 'rain')
+    storm = _contains(conds, 'storm')
+
+    status = np.full(n, _GOOD, dtype=np.int8)
+    status[too_cold | too_hot | disease | storm] = _POOR
+    status[cold_risk | heat_risk] = _CRITICAL
+
+    results = []
+    for i, key in enumerate(plant_keys):
+        plant = reference.plants[key]
+        optimal_temp, optimal_humidity = plant['optimal_temp'], plant['optimal_humidity']
+        warnings = []
+        recommendations = []
+
+        if too_cold[i]:
+            warnings.append(f"Temperature too low ({temps[i]}°C). Optimal: {optimal_temp['min']}-{optimal_temp['max']}°C")
+            if cold_risk[i]:
+                warnings.append(f"⚠️ COLD DAMAGE RISK! Temperature below {plant['cold_damage_temp']}°C")
+            recommendations.append("Protect with row covers or bring indoors")
+        elif too_hot[i]:
+            warnings.append(f"Temperature too high ({temps[i]}°C). Optimal: {optimal_temp['min']}-{optimal_temp['max']}°C")
+            if heat_risk[i]:
+                warnings.append(f"🌡️ HEAT STRESS RISK! Temperature above {plant['heat_stress_temp']}°C")
+            recommendations.append("Provide shade and increase watering frequency")
+
+        if dry[i]:
+            warnings.append(f"Humidity too low ({hums[i]}%). Optimal: {optimal_humidity['min']}-{optimal_humidity['max']}%")
+            recommendations.append("Increase watering frequency and consider misting")
+        elif humid[i]:
+            warnings.append(f"Humidity too high ({hums[i]}%). Optimal: {optimal_humidity['min']}-{optimal_humidity['max']}%")
+            if disease[i]:
+                warnings.append("🦠 DISEASE RISK! High humidity promotes fungal diseases")
+            recommendations.append("Improve air circulation and avoid overhead watering")
+
+        if windy[i]:
+            warnings.append(f"Wind too strong ({wind_speeds[i]} km/h). Tolerance: {plant['wind_tolerance']} km/h")
+            recommendations.append("Provide wind protection or stake plants")
+
+        if rain[i]:
+            recommendations.append("Rain provides natural watering - reduce irrigation")
+        if storm[i]:
+            warnings.append("🌪️ STORM CONDITIONS - Protect plants from damage")
+
+        label, color = _STATUS[int(status[i])]
+        results.append({
+            'warnings': warnings,
+            'recommendations': recommendations,
+            'status': label,
+            'status_color': color,
+        })
+    return results